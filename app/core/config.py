@@ -0,0 +1,177 @@
+import os
+from dotenv import load_dotenv
+
+# .env 파일에서 환경변수 로드
+load_dotenv()
+
+# ============================================================================
+# 경로 설정
+# ============================================================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+RECIPE_EMBEDDINGS_FILE = os.getenv(
+    "RECIPE_EMBEDDINGS_FILE", os.path.join(DATA_DIR, "recipe_embeddings.json")
+)
+INGREDIENT_EMBEDDINGS_FILE = os.getenv(
+    "INGREDIENT_EMBEDDINGS_FILE", os.path.join(DATA_DIR, "ingredient_embeddings.json")
+)
+
+# scripts/build_vector_store.py가 생성하는 메모리 매핑 벡터 저장소 (.npy + .docs.json)
+# 있으면 API 서버가 임베딩 JSON 대신 이 파일로 ID -> 벡터를 조회합니다
+RECIPE_VECTORS_FILE = os.getenv(
+    "RECIPE_VECTORS_FILE", os.path.join(DATA_DIR, "recipe_vectors.npy")
+)
+INGREDIENT_VECTORS_FILE = os.getenv(
+    "INGREDIENT_VECTORS_FILE", os.path.join(DATA_DIR, "ingredient_vectors.npy")
+)
+
+# scripts/build_neighbor_graph.py가 생성하는 최근접 이웃 그래프
+RECIPE_NEIGHBORS_FILE = os.getenv(
+    "RECIPE_NEIGHBORS_FILE", os.path.join(DATA_DIR, "recipe_neighbors.npz")
+)
+INGREDIENT_NEIGHBORS_FILE = os.getenv(
+    "INGREDIENT_NEIGHBORS_FILE", os.path.join(DATA_DIR, "ingredient_neighbors.npz")
+)
+
+# scripts/build_affinity_matrix.py가 생성하는 재료 x 레시피 친화도 행렬
+AFFINITY_MATRIX_FILE = os.getenv(
+    "AFFINITY_MATRIX_FILE", os.path.join(DATA_DIR, "ingredient_recipe_affinity.npz")
+)
+
+# scripts/check_embedding_quality.py의 보고서와 이전 버전 비교용 프로필
+QUALITY_DIR = os.getenv("QUALITY_DIR", os.path.join(DATA_DIR, "quality"))
+
+# ============================================================================
+# 임베딩 설정
+# ============================================================================
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# OpenAI 호환 엔드포인트 (예: benchmarks/fake_embedding_server.py의 http://localhost:8100/v1)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "1536"))
+
+# 한 번의 API 호출에 넣을 최대 입력 수
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+# 최대 재시도 횟수
+EMBEDDING_MAX_RETRIES = 3
+# 재시도 간 딜레이 (초)
+EMBEDDING_RETRY_DELAY = 5
+
+# ============================================================================
+# 검색 백엔드 설정
+# ============================================================================
+
+# local: 프로세스 내 NumPy 행렬 검색 / opensearch: 원격 OpenSearch k-NN 검색
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "local")
+
+OPENSEARCH_HOST = os.getenv("OPENSEARCH_HOST", "localhost")
+OPENSEARCH_PORT = int(os.getenv("OPENSEARCH_PORT", "9201"))
+# 여러 노드로 나눠 보낼 때 "host1:9200,host2:9200" (지정하지 않으면 위 호스트 하나)
+OPENSEARCH_HOSTS = os.getenv("OPENSEARCH_HOSTS", f"{OPENSEARCH_HOST}:{OPENSEARCH_PORT}")
+OPENSEARCH_USE_SSL = os.getenv("OPENSEARCH_USE_SSL", "false").lower() == "true"
+OPENSEARCH_USERNAME = os.getenv("OPENSEARCH_USERNAME")
+OPENSEARCH_PASSWORD = os.getenv("OPENSEARCH_PASSWORD")
+
+# 클라이언트 프로필 (app/services/opensearch_client.py)
+# bulk: 대량 색인용 / search: 저지연 검색용
+OPENSEARCH_BULK_TIMEOUT = int(os.getenv("OPENSEARCH_BULK_TIMEOUT", "300"))
+OPENSEARCH_BULK_POOL_SIZE = int(os.getenv("OPENSEARCH_BULK_POOL_SIZE", "8"))
+OPENSEARCH_SEARCH_TIMEOUT = float(os.getenv("OPENSEARCH_SEARCH_TIMEOUT", "5"))
+# FastAPI 스레드 풀(기본 40)이 동시에 검색해도 연결을 새로 맺지 않도록
+OPENSEARCH_SEARCH_POOL_SIZE = int(os.getenv("OPENSEARCH_SEARCH_POOL_SIZE", "40"))
+# 검색 요청도 gzip으로 보낼지 (질의 벡터 본문 약 30 KB, 원격 클러스터에서 유리)
+OPENSEARCH_SEARCH_COMPRESS = os.getenv("OPENSEARCH_SEARCH_COMPRESS", "false").lower() == "true"
+# 요청 본문 gzip 수준 (1: 빠름 ~ 9: opensearch-py 기본)
+OPENSEARCH_COMPRESS_LEVEL = int(os.getenv("OPENSEARCH_COMPRESS_LEVEL", "1"))
+
+RECIPE_INDEX = "recipes"
+INGREDIENT_INDEX = "ingredients"
+
+# 색인된 인덱스 스냅샷 (새 환경은 JSON 재업로드 대신 복원). 경로는 컨테이너 안의 path.repo
+# docker-compose.yml이 ./snapshots를 이 경로에 마운트합니다
+SNAPSHOT_REPOSITORY = os.getenv("SNAPSHOT_REPOSITORY", "recipe_snapshots")
+SNAPSHOT_REPOSITORY_PATH = os.getenv("SNAPSHOT_REPOSITORY_PATH", "/usr/share/opensearch/snapshots")
+
+# 재료 동의어 사전 (표준 재료명 → 별칭). 레시피 ingredients 필드의 색인 시점 동의어로 사용
+INGREDIENT_ALIASES_FILE = os.getenv(
+    "INGREDIENT_ALIASES_FILE", os.path.join(BASE_DIR, "scripts", "data", "ingredient_aliases_nested.json")
+)
+# false면 레시피 인덱스에 동의어 분석기를 넣지 않음 (이전 매핑)
+INGREDIENT_SYNONYMS_ENABLED = os.getenv("INGREDIENT_SYNONYMS_ENABLED", "true").lower() == "true"
+# 재료 ID 표 (id, 표준명, 별칭). ingredient_ids가 없는 레시피 입력/임베딩 파일의 재료명을 ID로 바꿀 때 사용
+INGREDIENT_TABLE_FILE = os.getenv(
+    "INGREDIENT_TABLE_FILE", os.path.join(BASE_DIR, "scripts", "data", "ingredient_embedding_input.json")
+)
+
+# opensearch 백엔드 헤지: 최근 성공 지연의 HEDGE_QUANTILE 분위수(상하한 ms) 안에 답이 없으면 로컬 엔진으로 같은 질의
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "200"))
+HEDGE_INITIAL_DEADLINE_MS = float(os.getenv("HEDGE_INITIAL_DEADLINE_MS", "200"))
+HEDGE_MIN_DEADLINE_MS = float(os.getenv("HEDGE_MIN_DEADLINE_MS", "20"))
+HEDGE_MAX_DEADLINE_MS = float(os.getenv("HEDGE_MAX_DEADLINE_MS", "1000"))
+HEDGE_POOL_SIZE = int(os.getenv("HEDGE_POOL_SIZE", "16"))
+# 연속 실패(오류 또는 마감 초과) 횟수가 넘으면 BREAKER_RESET_SECONDS 동안 모든 요청을 로컬에서 처리
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+# k-NN 워밍업: 시작 시 그래프를 네이티브 메모리에 올리고, 합성 질의 p95가 기준 아래로 내려오면 준비 완료
+KNN_WARMUP_ENABLED = os.getenv("KNN_WARMUP_ENABLED", "true").lower() == "true"
+KNN_READY_P95_MS = float(os.getenv("KNN_READY_P95_MS", "50"))
+KNN_WARMUP_QUERIES = int(os.getenv("KNN_WARMUP_QUERIES", "20"))
+KNN_WARMUP_MAX_ROUNDS = int(os.getenv("KNN_WARMUP_MAX_ROUNDS", "10"))
+KNN_WARMUP_RETRY_SECONDS = float(os.getenv("KNN_WARMUP_RETRY_SECONDS", "10"))
+
+# 재료 자동완성: local(프로세스 내 접두어 트라이) / opensearch(재료 인덱스 completion suggester)
+AUTOCOMPLETE_BACKEND = os.getenv("AUTOCOMPLETE_BACKEND", "local")
+# 백엔드별 (접두어, 개수) 결과 LRU 캐시 크기
+AUTOCOMPLETE_CACHE_SIZE = int(os.getenv("AUTOCOMPLETE_CACHE_SIZE", "4096"))
+
+# 배치 추천 요청 한 번에 허용하는 최대 요청 수
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+
+# ============================================================================
+# 임베딩 제공자 설정
+# ============================================================================
+
+# openai: OpenAI 임베딩 API / local: 로컬 경로의 다국어 모델 (sentence-transformers 또는 ONNX)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+
+# 인덱스별 제공자 (지정하지 않으면 EMBEDDING_PROVIDER)
+# 재료명 질의 벡터로 레시피를 검색하므로 추천 API를 쓰려면 두 인덱스가 같은 제공자여야 합니다. (추천 서비스 생성 시 check_query_embedding_space로 확인)
+INDEX_EMBEDDING_PROVIDERS = {
+    RECIPE_INDEX: os.getenv("RECIPE_EMBEDDING_PROVIDER", EMBEDDING_PROVIDER),
+    INGREDIENT_INDEX: os.getenv("INGREDIENT_EMBEDDING_PROVIDER", EMBEDDING_PROVIDER),
+}
+
+# 로컬 모델 경로: model.onnx + tokenizer.json이 있으면 ONNX Runtime, 아니면 sentence-transformers로 로드
+LOCAL_EMBEDDING_MODEL_PATH = os.getenv(
+    "LOCAL_EMBEDDING_MODEL_PATH", os.path.join(BASE_DIR, "models", "paraphrase-multilingual-MiniLM-L12-v2")
+)
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32"))
+# 배치를 동시에 추론할 스레드 수 (추론 라이브러리가 GIL을 놓으므로 스레드로 충분)
+LOCAL_EMBEDDING_THREADS = int(os.getenv("LOCAL_EMBEDDING_THREADS", str(os.cpu_count() or 1)))
+
+# ============================================================================
+# 계측 설정
+# ============================================================================
+
+# false면 구간 타이머가 기록하지 않음 (span 자체는 그대로 동작)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Prometheus 지표 이름 접두사 (예: recipe_ai_opensearch_search_seconds)
+METRICS_PREFIX = os.getenv("METRICS_PREFIX", "recipe_ai")
+
+# true면 구간마다 OpenTelemetry span을 OTLP로 내보냄 (opentelemetry-sdk, exporter 필요)
+OTEL_ENABLED = os.getenv("OTEL_ENABLED", "false").lower() == "true"
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "recipe-ai")
+
+# ============================================================================
+# 직렬화 설정
+# ============================================================================
+
+# JSON 백엔드 (auto: orjson이 설치되어 있으면 사용 / json: 표준 json 강제)
+# OpenSearch 클라이언트, 임베딩 파일 입출력, API 응답에 함께 적용
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
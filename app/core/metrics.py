@@ -0,0 +1,272 @@
+import bisect
+import functools
+import logging
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# 경량 계측: 구간(span) 타이머 + 메모리 제한 히스토그램
+# ============================================================================
+# 히스토그램은 고정 버킷 경계별 개수만 보관하므로 관측 횟수와 무관하게 메모리가 일정합니다.
+# 같은 기록이 Prometheus /metrics 응답과 실행 종료 시 요약 표에 쓰이고,
+# OTEL_ENABLED=true이면 구간마다 OpenTelemetry span도 함께 만듭니다.
+
+# 지연 시간 버킷 경계 (초). 0.5 ms ~ 60 s
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """고정 버킷 히스토그램. 분위수는 버킷 안에서 선형 보간한 추정치입니다."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(estimate, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+
+class MetricsRegistry:
+    """이름 + 라벨 조합별 히스토그램과 카운터를 보관합니다 (스레드 안전)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+
+    @staticmethod
+    def _key(labels: dict) -> LabelKey:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    # ========================================================================
+    # 출력
+    # ========================================================================
+
+    def render_prometheus(self, prefix: str = config.METRICS_PREFIX) -> str:
+        """Prometheus 텍스트 노출 형식 (히스토그램은 *_seconds, 카운터는 *_total)."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self.histograms.items()):
+                metric = _metric_name(prefix, name, "seconds")
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(histogram.buckets + (math.inf,), histogram.counts):
+                        cumulative += bucket_count
+                        le = "+Inf" if bound == math.inf else repr(bound)
+                        lines.append(f"{metric}_bucket{_labels(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{metric}_sum{_labels(key)} {histogram.sum!r}")
+                    lines.append(f"{metric}_count{_labels(key)} {histogram.count}")
+            for name, series in sorted(self.counters.items()):
+                metric = _metric_name(prefix, name, "total")
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{metric}{_labels(key)} {value!r}")
+        return "\n".join(lines) + "\n"
+
+    def summary_rows(self) -> List[dict]:
+        rows = []
+        with self._lock:
+            for name, series in sorted(self.histograms.items()):
+                for key, histogram in sorted(series.items()):
+                    rows.append({
+                        "name": name,
+                        "labels": ",".join(f"{k}={v}" for k, v in key),
+                        "count": histogram.count,
+                        "total_s": histogram.sum,
+                        "mean_ms": histogram.sum / histogram.count * 1000,
+                        "p50_ms": histogram.quantile(0.50) * 1000,
+                        "p95_ms": histogram.quantile(0.95) * 1000,
+                        "p99_ms": histogram.quantile(0.99) * 1000,
+                        "max_ms": histogram.max * 1000,
+                    })
+        return rows
+
+    def summary_table(self) -> str:
+        """구간별 호출 수 / 총 시간 / 지연 분위수 표."""
+        rows = self.summary_rows()
+        with self._lock:
+            counters = [(name, key, value) for name, series in sorted(self.counters.items())
+                        for key, value in sorted(series.items())]
+        if not rows and not counters:
+            return "   (기록된 구간 없음)"
+        lines = [f"   {'구간':<24}{'라벨':<44}{'횟수':>8}{'총(s)':>9}{'평균':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'최대':>9}"]
+        for row in rows:
+            lines.append(
+                f"   {row['name']:<24}{row['labels'][:43]:<44}{row['count']:>8}{row['total_s']:>9.2f}"
+                f"{row['mean_ms']:>9.1f}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}"
+            )
+        for name, key, value in counters:
+            labels = ",".join(f"{k}={v}" for k, v in key)
+            lines.append(f"   {name:<24}{labels[:43]:<44}{value:>8g}")
+        return "\n".join(lines)
+
+
+def _metric_name(prefix: str, name: str, suffix: str) -> str:
+    name = re.sub(r"[^a-zA-Z0-9_]", "_", f"{prefix}_{name}" if prefix else name)
+    return name if name.endswith(f"_{suffix}") else f"{name}_{suffix}"
+
+
+def _labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in key) + "}"
+
+
+registry = MetricsRegistry()
+
+
+# ============================================================================
+# OpenTelemetry (선택)
+# ============================================================================
+# opentelemetry-sdk와 OTLP exporter가 설치되어 있고 OTEL_ENABLED=true일 때만 사용합니다.
+# 엔드포인트 등은 OTEL_EXPORTER_OTLP_* 표준 환경변수를 따릅니다.
+
+_tracer = None
+_tracer_checked = False
+
+
+def _get_tracer():
+    global _tracer, _tracer_checked
+    if _tracer_checked:
+        return _tracer
+    _tracer_checked = True
+    if not config.OTEL_ENABLED:
+        return None
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_ENABLED=true이지만 opentelemetry-sdk / OTLP exporter가 설치되어 있지 않습니다")
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": config.OTEL_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer(__name__)
+    return _tracer
+
+
+# ============================================================================
+# 공개 API
+# ============================================================================
+
+@contextmanager
+def span(name: str, **labels) -> Iterator[None]:
+    """
+    구간 실행 시간을 name 히스토그램에 기록합니다 (예외로 끝나도 기록, status=error 라벨).
+        with span("opensearch_bulk", index="recipes"):
+            helpers.bulk(...)
+    """
+    tracer = _get_tracer()
+    otel_span = tracer.start_as_current_span(name, attributes=labels) if tracer else None
+    if otel_span is not None:
+        otel_span.__enter__()
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        if config.METRICS_ENABLED:
+            registry.observe(name, elapsed, **(labels if status == "ok" else dict(labels, status=status)))
+        if otel_span is not None:
+            otel_span.__exit__(None, None, None)
+
+
+def timed(name: Optional[str] = None, **labels):
+    """함수 실행 시간을 기록하는 데코레이터. name을 생략하면 함수 이름을 사용합니다."""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe(name: str, seconds: float, **labels):
+    """이미 잰 시간을 기록합니다 (예: 외부에서 받은 took 값)."""
+    if config.METRICS_ENABLED:
+        registry.observe(name, seconds, **labels)
+
+
+def increment(name: str, value: float = 1, **labels):
+    if config.METRICS_ENABLED:
+        registry.increment(name, value, **labels)
+
+
+def render_prometheus() -> str:
+    return registry.render_prometheus()
+
+
+def print_summary(title: str = "구간별 소요 시간"):
+    """실행 종료 시 구간별 요약 표를 출력합니다."""
+    print(f"\n⏱️ {title}")
+    print(registry.summary_table())
@@ -0,0 +1,125 @@
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import IO, Any, Iterable
+
+import numpy as np
+from opensearchpy.exceptions import SerializationError
+from opensearchpy.serializer import JSONSerializer
+
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ============================================================================
+# JSON 직렬화 백엔드
+# ============================================================================
+# 임베딩 문서는 1536개 float 배열이라 JSON 변환 비용 대부분이 벡터에서 나옵니다.
+# orjson이 있으면 ndarray를 네이티브로 직렬화하고(tolist 변환 없음), 없으면 표준 json으로 동작합니다.
+# JSON_BACKEND=json으로 표준 json을 강제할 수 있습니다.
+# 주의: orjson은 NaN/Infinity를 null로 씁니다 (임베딩 검증에서 잘못된 벡터로 걸러짐).
+
+if config.JSON_BACKEND == "orjson" and orjson is None:
+    logger.warning("JSON_BACKEND=orjson이지만 orjson이 설치되어 있지 않아 표준 json을 사용합니다")
+
+BACKEND = "orjson" if orjson is not None and config.JSON_BACKEND != "json" else "json"
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# 어떤 예외든 JSON 파싱 실패로 잡을 수 있도록 (orjson.JSONDecodeError도 이 클래스를 상속)
+JSONDecodeError = json.JSONDecodeError
+
+
+def _default(obj: Any) -> Any:
+    """두 백엔드가 기본으로 처리하지 못하는 타입 (NumPy 스칼라/비연속 배열, Decimal, 날짜)."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"JSON으로 변환할 수 없는 타입: {type(obj).__name__}")
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """UTF-8 JSON 바이트로 직렬화합니다. indent=True이면 2칸 들여쓰기."""
+    if BACKEND == "orjson":
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+    return json.dumps(obj, default=_default, ensure_ascii=False, indent=2 if indent else None,
+                      separators=None if indent else (",", ":")).encode("utf-8")
+
+
+def dumps_str(obj: Any, indent: bool = False) -> str:
+    return dumps(obj, indent).decode("utf-8")
+
+
+def loads(data) -> Any:
+    """str / bytes JSON을 파싱합니다."""
+    if BACKEND == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# ============================================================================
+# 파일 입출력 (파일은 바이너리 모드로 열어야 함)
+# ============================================================================
+
+def dump(obj: Any, f: IO[bytes], indent: bool = False):
+    f.write(dumps(obj, indent))
+
+
+def dump_lines(records: Iterable[Any], f: IO[bytes]) -> int:
+    """NDJSON: 한 줄에 레코드 하나씩 기록하고 건수를 반환합니다."""
+    count = 0
+    for record in records:
+        f.write(dumps(record))
+        f.write(b"\n")
+        count += 1
+    return count
+
+
+def load(f: IO) -> Any:
+    return loads(f.read())
+
+
+# ============================================================================
+# opensearch-py 직렬화기
+# ============================================================================
+
+class FastJSONSerializer(JSONSerializer):
+    """
+    OpenSearch 클라이언트용 직렬화기 (OpenSearch(serializer=FastJSONSerializer())).
+    요청 본문(bulk 줄 포함)과 응답 파싱을 위 백엔드로 처리합니다.
+    bulk 헬퍼가 결과에 .encode()를 호출하므로 str을 반환합니다.
+    """
+
+    def dumps(self, data: Any) -> Any:
+        if isinstance(data, str):
+            return data
+        try:
+            if BACKEND == "orjson":
+                return orjson.dumps(data, default=self._default, option=_ORJSON_OPTIONS).decode("utf-8")
+            return super().dumps(data)
+        except (ValueError, TypeError) as e:
+            raise SerializationError(data, e)
+
+    def _default(self, data: Any) -> Any:
+        try:
+            return _default(data)
+        except TypeError:
+            return self.default(data)
+
+    def loads(self, s: Any) -> Any:
+        try:
+            return loads(s)
+        except (ValueError, TypeError) as e:
+            raise SerializationError(s, e)
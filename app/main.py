@@ -0,0 +1,238 @@
+import os
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.core import config
+from app.core.metrics import observe, render_prometheus
+from app.core.serialization import dumps
+from app.models.schemas import (
+    AutocompleteResponse,
+    AutocompleteSuggestion,
+    BatchRecommendationRequest,
+    BatchRecommendationResponse,
+    RecommendationRequest,
+    RecommendationResponse,
+)
+from app.services.affinity_matrix import AffinityMatrix
+from app.services.autocomplete import AutocompleteService, PrefixTrie, build_entries, load_alias_documents
+from app.services.embedding_providers import check_query_embedding_space
+from app.services.hedging import HedgedBackend
+from app.services.knn_warmup import KnnReadiness
+from app.services.neighbor_graph import NeighborGraph
+from app.services.opensearch_client import get_client
+from app.services.recommendation_service import RecommendationService
+from app.services.vector_store import VectorStore
+
+
+class FastJSONResponse(JSONResponse):
+    """응답 본문을 공용 직렬화기(orjson 우선)로 인코딩합니다."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+readiness = KnnReadiness()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    opensearch 백엔드면 k-NN 그래프를 백그라운드에서 워밍업하고, 합성 질의 p95가 기준 아래로
+    내려온 뒤에 /ready가 200을 반환합니다 (재시작 직후 첫 사용자 질의가 그래프 로딩을 떠안지 않도록).
+    """
+    if config.SEARCH_BACKEND == "opensearch" and config.KNN_WARMUP_ENABLED:
+        readiness.start(get_opensearch_client(), [config.RECIPE_INDEX, config.INGREDIENT_INDEX])
+    else:
+        readiness.mark_ready()
+    yield
+
+
+app = FastAPI(title="Recipe AI Server", default_response_class=FastJSONResponse, lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """엔드포인트별 응답 시간을 기록합니다 (라벨은 경로 템플릿이라 recipe_id별로 늘어나지 않음)."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        observe("http_request", time.perf_counter() - start, method=request.method,
+                route=getattr(route, "path", "unmatched"), status=status)
+
+
+def get_opensearch_client():
+    """추천/헬스체크에서 함께 쓰는 저지연 검색 프로필 클라이언트."""
+    return get_client("search")
+
+
+@lru_cache(maxsize=1)
+def get_recommendation_service() -> RecommendationService:
+    """임베딩 파일을 한 번만 읽어 추천 서비스를 생성합니다."""
+    if not os.path.exists(config.RECIPE_EMBEDDINGS_FILE) and not os.path.exists(config.RECIPE_VECTORS_FILE):
+        raise HTTPException(status_code=503, detail="레시피 임베딩 파일이 없습니다")
+
+    # 메모리 매핑 벡터 저장소가 최신이면 JSON 파싱 없이 엽니다
+    recipe_store = VectorStore.open(config.RECIPE_EMBEDDINGS_FILE, 'recipe_id', config.RECIPE_VECTORS_FILE)
+    ingredient_store = None
+    if os.path.exists(config.INGREDIENT_EMBEDDINGS_FILE) or os.path.exists(config.INGREDIENT_VECTORS_FILE):
+        ingredient_store = VectorStore.open(
+            config.INGREDIENT_EMBEDDINGS_FILE, 'ingredient_id', config.INGREDIENT_VECTORS_FILE
+        )
+
+    recipe_neighbors = None
+    if os.path.exists(config.RECIPE_NEIGHBORS_FILE):
+        recipe_neighbors = NeighborGraph.load(config.RECIPE_NEIGHBORS_FILE)
+
+    affinity = None
+    if os.path.exists(config.AFFINITY_MATRIX_FILE):
+        affinity = AffinityMatrix.load(config.AFFINITY_MATRIX_FILE)
+
+    # 미등록 재료명은 재료 인덱스 제공자로 임베딩해 레시피 행렬과 비교하므로 같은 공간인지 먼저 확인
+    try:
+        space = check_query_embedding_space(
+            config.RECIPE_EMBEDDINGS_FILE,
+            config.INGREDIENT_EMBEDDINGS_FILE if ingredient_store is not None else None,
+        )
+        if space["dimension"] != recipe_store.dimension:
+            raise ValueError(f"레시피 벡터 차원({recipe_store.dimension})이 "
+                             f"임베딩 메타데이터 차원({space['dimension']})과 다릅니다")
+    except (ValueError, OSError) as e:
+        # OSError: 로컬 임베딩 모델 경로가 없음 (EMBEDDING_PROVIDER=local)
+        raise HTTPException(status_code=503, detail=f"임베딩 설정 불일치: {e}")
+
+    opensearch_client = get_opensearch_client() if config.SEARCH_BACKEND == "opensearch" else None
+    # 레시피 행렬은 항상 메모리에 있으므로 OpenSearch가 느리거나 내려가면 로컬 검색으로 대신 응답
+    hedge = HedgedBackend() if opensearch_client is not None and config.HEDGE_ENABLED else None
+    return RecommendationService(
+        recipe_store,
+        ingredient_store,
+        backend=config.SEARCH_BACKEND,
+        opensearch_client=opensearch_client,
+        recipe_neighbors=recipe_neighbors,
+        affinity=affinity,
+        hedge=hedge,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_autocomplete_service() -> AutocompleteService:
+    """
+    추천 서비스의 재료/레시피 저장소로 자동완성 트라이를 만듭니다 (인기도 = 재료가 나오는 레시피 수).
+    재료 임베딩이 없으면 동의어 사전의 재료명으로 만듭니다 (ingredient_id 없음).
+    """
+    service = get_recommendation_service()
+    if service.ingredient_store is not None:
+        ingredients = service.ingredient_store.docs
+    elif os.path.exists(config.INGREDIENT_ALIASES_FILE):
+        ingredients = load_alias_documents(config.INGREDIENT_ALIASES_FILE)
+    else:
+        raise HTTPException(status_code=503, detail="자동완성에 사용할 재료 데이터가 없습니다")
+
+    opensearch_client = get_opensearch_client() if config.AUTOCOMPLETE_BACKEND == "opensearch" else None
+    trie = PrefixTrie(build_entries(ingredients, service.recipe_store.docs))
+    return AutocompleteService(trie, opensearch_client=opensearch_client)
+
+
+@app.get("/health")
+def health():
+    """서버 및 OpenSearch 연결 상태를 반환합니다."""
+    try:
+        connected = bool(get_opensearch_client().ping())
+    except Exception:
+        connected = False
+    status = {
+        "status": "ok",
+        "search_backend": config.SEARCH_BACKEND,
+        "ready": readiness.ready,
+        "opensearch": {"connected": connected},
+    }
+    # 추천 서비스가 이미 만들어졌을 때만 (헬스체크가 임베딩 파일 로드를 유발하지 않도록)
+    if get_recommendation_service.cache_info().currsize:
+        hedge = get_recommendation_service().hedge
+        if hedge is not None:
+            status["circuit_breaker"] = hedge.status()
+    return status
+
+
+@app.get("/ready")
+def ready():
+    """k-NN 워밍업이 끝나 p95가 기준 아래일 때만 200 (로드밸런서/오케스트레이터 준비 상태 확인용)."""
+    return FastJSONResponse(readiness.status(), status_code=200 if readiness.ready else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus 형식의 구간별 지연 히스토그램과 카운터."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/recommendations", response_model=RecommendationResponse)
+def recommend(request: RecommendationRequest):
+    """재료 목록으로 레시피를 추천합니다."""
+    return get_recommendation_service().recommend(request)
+
+
+@app.post("/recommendations/batch", response_model=BatchRecommendationResponse)
+def recommend_batch(batch: BatchRecommendationRequest):
+    """
+    여러 추천 요청을 한 번에 처리합니다.
+    결과는 입력 순서와 같은 순서로 반환됩니다.
+    """
+    start_time = time.time()
+    if len(batch.requests) > config.MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"최대 {config.MAX_BATCH_SIZE}개 요청까지 처리할 수 있습니다")
+
+    results = get_recommendation_service().recommend_batch(batch.requests)
+    return BatchRecommendationResponse(results=results, processing_time=time.time() - start_time)
+
+
+@app.get("/recipes/{recipe_id}/similar", response_model=RecommendationResponse)
+def similar_recipes(recipe_id: str, limit: int = Query(default=10, ge=1, le=50)):
+    """비슷한 레시피를 반환합니다 ("이런 레시피는 어때요?")."""
+    response = get_recommendation_service().similar_recipes(recipe_id, limit)
+    if response is None:
+        raise HTTPException(status_code=404, detail=f"레시피를 찾을 수 없습니다: {recipe_id}")
+    return response
+
+
+@app.get("/ingredients/autocomplete", response_model=AutocompleteResponse)
+def autocomplete_ingredients(q: str = Query(..., min_length=1, max_length=50),
+                             limit: int = Query(default=10, ge=1, le=20),
+                             backend: str = Query(default=config.AUTOCOMPLETE_BACKEND, pattern="^(local|opensearch)$")):
+    """
+    입력 중인 재료명/별칭의 자동완성 후보를 반환합니다.
+    local은 완성되지 않은 음절("다" → "닭고기")도 자모 단위로 이어서 찾습니다.
+    """
+    start_time = time.time()
+    service = get_autocomplete_service()
+    if backend == "opensearch" and service.opensearch_client is None:
+        service.opensearch_client = get_opensearch_client()
+    suggestions = service.complete(q, limit=limit, backend=backend)
+    return AutocompleteResponse(
+        query=q,
+        suggestions=[AutocompleteSuggestion(ingredient_id=s["ingredient_id"], name=s["name"],
+                                            matched=s["matched"], score=s["weight"]) for s in suggestions],
+        backend=backend,
+        processing_time=time.time() - start_time,
+    )
+
+
+@app.get("/ingredients/{ingredient_id}/recipes", response_model=RecommendationResponse)
+def ingredient_recipes(ingredient_id: str, limit: int = Query(default=10, ge=1, le=50)):
+    """
+    재료 하나로 만들 수 있는 레시피를 반환합니다.
+    재료 ID(또는 재료명)만 받고 벡터는 서버의 저장소에서 조회합니다.
+    """
+    response = get_recommendation_service().recipes_for_ingredient(ingredient_id, limit)
+    if response is None:
+        raise HTTPException(status_code=404, detail=f"재료를 찾을 수 없습니다: {ingredient_id}")
+    return response
@@ -17,7 +17,8 @@ class RecognizedIngredient(BaseModel):
 
 # 레시피 추천 관련 스키마
 class RecommendationRequest(BaseModel):
-    ingredients: List[str]
+    # 빈 목록이면 질의 벡터가 0이 되어 점수 0.0의 임의 레시피가 반환되므로 거부 (422)
+    ingredients: List[str] = Field(..., min_length=1)
     limit: int = Field(default=10, ge=1, le=50)
     user_id: Optional[str]
 
@@ -34,6 +35,30 @@ class RecommendationResponse(BaseModel):
     recipes: List[RecipeScore]
     total_matches: int
     processing_time: float
+    user_id: Optional[str] = None
+    # 실제로 응답한 검색 경로 (opensearch / local / affinity / neighbors)
+    backend: Optional[str] = None
+
+# 배치 추천 관련 스키마 (야간 사전 계산 등 여러 사용자를 한 번에 처리)
+class BatchRecommendationRequest(BaseModel):
+    requests: List[RecommendationRequest] = Field(..., min_length=1)
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[RecommendationResponse]
+    processing_time: float
+
+# 재료 자동완성 관련 스키마
+class AutocompleteSuggestion(BaseModel):
+    ingredient_id: Optional[str]
+    name: str
+    matched: str
+    score: float
+
+class AutocompleteResponse(BaseModel):
+    query: str
+    suggestions: List[AutocompleteSuggestion]
+    backend: str
+    processing_time: float
 
 # 날씨 기반 추천 관련 스키마
 class WeatherData(BaseModel):
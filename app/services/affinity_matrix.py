@@ -0,0 +1,155 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.vector_store import VectorStore
+
+# 재료가 레시피의 processed_ingredients에 실제로 들어있을 때 더하는 가중치
+DEFAULT_MEMBERSHIP_WEIGHT = 0.5
+# 재료당 보관할 레시피 수
+DEFAULT_TOP_N = 200
+DEFAULT_BLOCK_SIZE = 128
+
+
+def split_ingredients(ingredients_text: Optional[str]) -> List[str]:
+    """GROUP_CONCAT으로 만들어진 'a, b, c' 형태의 재료 문자열을 목록으로 변환합니다."""
+    if not ingredients_text:
+        return []
+    return [name.strip() for name in ingredients_text.split(',') if name.strip()]
+
+
+class AffinityMatrix:
+    """
+    재료 x 레시피 친화도 행렬 (CSR, 재료당 상위 N개 레시피).
+
+    친화도 = (1 - w) * cos(재료, 레시피) + w * [재료가 레시피에 포함됨]
+    여러 재료 추천은 해당 행들의 희소 합 후 상위 k개 선택으로 끝납니다.
+    """
+
+    def __init__(
+        self,
+        ingredient_names: Sequence[str],
+        recipe_ids: Sequence[str],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        values: np.ndarray,
+        aliases: Optional[Dict[str, int]] = None,
+    ):
+        self.ingredient_names = np.asarray(ingredient_names, dtype=str)
+        self.recipe_ids = np.asarray(recipe_ids, dtype=str)
+        self.indptr = np.asarray(indptr, dtype=np.int32)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.values = np.asarray(values, dtype=np.float32)
+        self.name_to_row: Dict[str, int] = dict(aliases or {})
+        for row, name in enumerate(self.ingredient_names.tolist()):
+            self.name_to_row[name] = row
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.ingredient_names), len(self.recipe_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.values.nbytes
+
+    @classmethod
+    def build(
+        cls,
+        ingredient_store: VectorStore,
+        recipe_store: VectorStore,
+        top_n: int = DEFAULT_TOP_N,
+        membership_weight: float = DEFAULT_MEMBERSHIP_WEIGHT,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> "AffinityMatrix":
+        """두 임베딩 저장소와 레시피 재료 목록으로 친화도 행렬을 만듭니다."""
+        n_ingredients, n_recipes = len(ingredient_store), len(recipe_store)
+        top_n = min(top_n, n_recipes)
+        names = [doc['name'] for doc in ingredient_store.docs]
+        name_to_row = {name: row for row, name in enumerate(names)}
+
+        # 재료명 -> 해당 재료를 포함한 레시피 행 (역색인)
+        members: List[List[int]] = [[] for _ in range(n_ingredients)]
+        for recipe_row, doc in enumerate(recipe_store.docs):
+            for name in split_ingredients(doc.get('ingredients')):
+                row = name_to_row.get(name)
+                if row is not None:
+                    members[row].append(recipe_row)
+
+        indices = np.empty((n_ingredients, top_n), dtype=np.int32)
+        values = np.empty((n_ingredients, top_n), dtype=np.float32)
+
+        for start in range(0, n_ingredients, block_size):
+            end = min(start + block_size, n_ingredients)
+            block = (1.0 - membership_weight) * (ingredient_store.matrix[start:end] @ recipe_store.matrix.T)
+            for offset, row in enumerate(range(start, end)):
+                if members[row]:
+                    block[offset, members[row]] += membership_weight
+
+            top = np.argpartition(-block, top_n - 1, axis=1)[:, :top_n]
+            top_values = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_values, axis=1)
+            indices[start:end] = np.take_along_axis(top, order, axis=1)
+            values[start:end] = np.take_along_axis(top_values, order, axis=1)
+
+        indptr = np.arange(0, (n_ingredients + 1) * top_n, top_n, dtype=np.int32)
+
+        aliases: Dict[str, int] = {}
+        for row, doc in enumerate(ingredient_store.docs):
+            doc_aliases = doc.get('aliases', [])
+            if isinstance(doc_aliases, str):
+                doc_aliases = doc_aliases.split()
+            for alias in doc_aliases:
+                aliases.setdefault(alias, row)
+
+        return cls(names, recipe_store.ids, indptr, indices.ravel(), values.ravel(), aliases)
+
+    def resolve(self, names: Sequence[str]) -> Optional[List[int]]:
+        """재료명(또는 동의어)을 행 번호로 변환합니다. 하나라도 없으면 None."""
+        rows = [self.name_to_row.get(name) for name in names]
+        return None if any(row is None for row in rows) else rows
+
+    def recommend(self, rows: Sequence[int], k: int) -> List[Tuple[int, float]]:
+        """재료 행들의 희소 합에서 상위 k개 (레시피 행 번호, 점수)를 반환합니다."""
+        scores = np.zeros(len(self.recipe_ids), dtype=np.float32)
+        for row in rows:
+            start, end = self.indptr[row], self.indptr[row + 1]
+            np.add.at(scores, self.indices[start:end], self.values[start:end])
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) == 0:
+            return []
+        k = min(k, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(row), float(scores[row])) for row in top]
+
+    # ========================================================================
+    # 저장 / 로드
+    # ========================================================================
+
+    def save(self, path: str):
+        """npz 파일로 저장합니다."""
+        alias_names = list(self.name_to_row.keys())
+        np.savez(
+            path,
+            ingredient_names=self.ingredient_names,
+            recipe_ids=self.recipe_ids,
+            indptr=self.indptr,
+            indices=self.indices,
+            values=self.values,
+            alias_names=np.asarray(alias_names, dtype=str),
+            alias_rows=np.asarray([self.name_to_row[name] for name in alias_names], dtype=np.int32),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "AffinityMatrix":
+        with np.load(path, allow_pickle=False) as data:
+            aliases = dict(zip(data['alias_names'].tolist(), data['alias_rows'].tolist()))
+            return cls(
+                data['ingredient_names'],
+                data['recipe_ids'],
+                data['indptr'],
+                data['indices'],
+                data['values'],
+                aliases,
+            )
@@ -0,0 +1,232 @@
+import logging
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from app.core import config
+from app.core.metrics import increment, span
+from app.core.serialization import load
+from app.services.affinity_matrix import split_ingredients
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# 한글 자모 분해
+# ============================================================================
+# 입력 중인 글자는 음절이 완성되지 않은 상태("다" → "닭")로 들어오므로
+# 키와 질의를 모두 자모 단위로 풀어 접두어를 비교합니다. 겹받침/이중모음도 낱자로 나눠
+# "달"(ㄷㅏㄹ)이 "닭고기"(ㄷㅏㄹㄱㄱㅗㄱㅣ)의 접두어가 되게 합니다.
+
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ",
+              "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"]
+_JONGSEONG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+              "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 단독으로 입력된 겹자모 (호환 자모)
+_COMPOUND_JAMO = {"ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+                  "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ", "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ",
+                  "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ"}
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+
+def to_jamo(text: str) -> str:
+    """완성형 한글 음절을 자모 열로 풉니다. 한글이 아닌 문자는 그대로 둡니다."""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHOSEONG[code // 588])
+            out.append(_JUNGSEONG[(code % 588) // 28])
+            out.append(_JONGSEONG[code % 28])
+        else:
+            out.append(_COMPOUND_JAMO.get(ch, ch))
+    return "".join(out)
+
+
+# ============================================================================
+# 접두어 트라이 (프로세스 내 백엔드)
+# ============================================================================
+
+class PrefixTrie:
+    """
+    재료명/별칭 자모 키의 접두어 트라이.
+    노드마다 그 아래 완성 후보 상위 top_k개를 미리 정렬해 두므로
+    조회 비용은 입력 길이에만 비례합니다 (후보 수와 무관).
+    """
+
+    def __init__(self, entries: Sequence[dict], top_k: int = 32):
+        """entries: {"ingredient_id", "name", "matched", "weight"} 목록. 같은 재료의 별칭은 조회 시 하나로 합칩니다."""
+        self.entries = list(entries)
+        self.top_k = top_k
+        self.root: Dict = {}
+
+        # 인기(weight) 높은 순, 짧은 표기 순
+        order = sorted(range(len(self.entries)), key=lambda i: (
+            -self.entries[i]["weight"], len(self.entries[i]["matched"]), self.entries[i]["matched"]))
+        for i in order:
+            matched = self.entries[i]["matched"]
+            for key in {to_jamo(matched), to_jamo(matched.replace(" ", ""))}:
+                self._insert(key, i)
+
+    def _insert(self, key: str, entry: int):
+        node = self.root
+        for ch in key:
+            node = node.setdefault(ch, {})
+            top = node.setdefault("", [])
+            # 정렬된 순서로 넣으므로 앞에서부터 top_k개만 유지하면 됨
+            if len(top) < self.top_k and entry not in top:
+                top.append(entry)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[dict]:
+        prefix = normalize(prefix)
+        node = self.root
+        for ch in to_jamo(prefix):
+            node = node.get(ch)
+            if node is None:
+                return []
+
+        # 음절 그대로 이어지는 후보("닭" → 닭가슴살)를 자모로만 이어지는 후보("닭" → 달걀)보다 앞에
+        candidates = node.get("", [])
+        compact = prefix.replace(" ", "")
+        exact = [i for i in candidates if self.entries[i]["matched"].replace(" ", "").startswith(compact)]
+        if len(exact) < len(candidates):
+            exact_set = set(exact)
+            candidates = exact + [i for i in candidates if i not in exact_set]
+
+        results, seen = [], set()
+        for entry in candidates:
+            suggestion = self.entries[entry]
+            group = suggestion["ingredient_id"] or suggestion["name"]
+            if group in seen:
+                continue
+            seen.add(group)
+            results.append(suggestion)
+            if len(results) >= limit:
+                break
+        return results
+
+
+def build_entries(ingredients: Iterable[dict], recipe_docs: Iterable[dict] = ()) -> List[dict]:
+    """
+    재료 문서(name, aliases, ingredient_id)에서 표준명과 별칭을 모두 후보로 만듭니다.
+    weight는 레시피 ingredients에 그 재료명이 나오는 횟수입니다 (인기 재료 우선).
+    """
+    usage = Counter(name for doc in recipe_docs for name in split_ingredients(doc.get("ingredients")))
+    entries = []
+    for doc in ingredients:
+        name = doc.get("name")
+        if not name:
+            continue
+        aliases = doc.get("aliases") or []
+        if isinstance(aliases, str):
+            aliases = aliases.split()
+        weight = usage.get(name, 0)
+        terms = []
+        for term in [name] + list(aliases):
+            term = normalize(term)
+            if term and term not in terms:
+                terms.append(term)
+        for term in terms:
+            entries.append({
+                "ingredient_id": str(doc["ingredient_id"]) if doc.get("ingredient_id") is not None else None,
+                "name": name,
+                "matched": term,
+                "weight": weight,
+            })
+    return entries
+
+
+def load_alias_documents(path: str = config.INGREDIENT_ALIASES_FILE) -> List[dict]:
+    """재료 임베딩이 없을 때 동의어 사전으로 재료 목록을 만듭니다 (ingredient_id 없음)."""
+    with open(path, "rb") as f:
+        nested = load(f)
+    return [{"name": name, "aliases": aliases} for names in nested.values() for name, aliases in names.items()]
+
+
+# ============================================================================
+# OpenSearch 백엔드 (completion suggester)
+# ============================================================================
+
+def suggest_input(name: Optional[str], aliases) -> dict:
+    """재료 문서 name_suggest 필드 값 (표준명 + 별칭, 정규화·중복 제거)."""
+    if isinstance(aliases, str):
+        aliases = aliases.split()
+    terms = []
+    for term in [name] + list(aliases or []):
+        term = normalize(term) if term else ""
+        if term and term not in terms:
+            terms.append(term)
+    return {"input": terms}
+
+
+def completion_suggest_body(prefix: str, limit: int = 10) -> dict:
+    """ingredient_mapping의 name_suggest(completion) 필드 질의 본문."""
+    return {
+        "_source": ["ingredient_id", "name"],
+        "suggest": {
+            "ingredient": {
+                "prefix": normalize(prefix),
+                "completion": {"field": "name_suggest", "size": limit, "skip_duplicates": True},
+            }
+        },
+    }
+
+
+def parse_completion_response(response: dict) -> List[dict]:
+    results = []
+    for option in response.get("suggest", {}).get("ingredient", [{}])[0].get("options", []):
+        source = option.get("_source", {})
+        results.append({
+            "ingredient_id": str(source.get("ingredient_id", option.get("_id"))),
+            "name": source.get("name", option.get("text")),
+            "matched": option.get("text"),
+            "weight": option.get("_score", 0),
+        })
+    return results
+
+
+# ============================================================================
+# 자동완성 서비스 (백엔드 선택 + 인기 접두어 캐시)
+# ============================================================================
+
+class AutocompleteService:
+    """
+    재료 자동완성. local은 PrefixTrie, opensearch는 completion suggester를 사용합니다.
+    같은 접두어는 두 백엔드 모두 LRU 캐시에서 바로 응답합니다 (짧은 접두어일수록 반복이 많음).
+    """
+
+    def __init__(self, trie: Optional[PrefixTrie] = None, opensearch_client=None,
+                 cache_size: int = config.AUTOCOMPLETE_CACHE_SIZE):
+        self.trie = trie
+        self.opensearch_client = opensearch_client
+        self._cached = lru_cache(maxsize=cache_size)(self._complete)
+
+    def _complete(self, backend: str, prefix: str, limit: int) -> tuple:
+        increment("autocomplete_cache_misses", backend=backend)
+        if backend == "opensearch":
+            with span("opensearch_suggest", index=config.INGREDIENT_INDEX):
+                response = self.opensearch_client.search(index=config.INGREDIENT_INDEX,
+                                                         body=completion_suggest_body(prefix, limit))
+            return tuple(parse_completion_response(response))
+        return tuple(self.trie.complete(prefix, limit))
+
+    def complete(self, prefix: str, limit: int = 10, backend: str = "local") -> List[dict]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if backend == "opensearch" and self.opensearch_client is None:
+            raise ValueError("opensearch 자동완성에는 opensearch_client가 필요합니다")
+        if backend == "local" and self.trie is None:
+            raise ValueError("local 자동완성 트라이가 없습니다")
+        with span("autocomplete", backend=backend):
+            return list(self._cached(backend, prefix, limit))
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    def clear_cache(self):
+        self._cached.cache_clear()
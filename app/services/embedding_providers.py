@@ -0,0 +1,310 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core import config
+from app.core.metrics import increment, span
+
+logger = logging.getLogger(__name__)
+
+# 모델별 출력 차원 (알 수 없는 모델은 EMBEDDING_DIM)
+OPENAI_MODEL_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+
+class EmbeddingProvider:
+    """
+    텍스트 목록을 벡터 목록으로 바꾸는 임베딩 제공자.
+    embed()는 입력 순서를 유지하며, dimension은 생성되는 벡터 길이입니다.
+    """
+
+    name = ""
+
+    def __init__(self, model: str, batch_size: int):
+        self.model = model
+        self.batch_size = batch_size
+
+    @property
+    def dimension(self) -> int:
+        raise NotImplementedError
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+    def metadata(self) -> dict:
+        """임베딩 파일과 인덱스 매핑에 기록할 정보."""
+        return {"provider": self.name, "model": self.model, "dimension": self.dimension}
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """OpenAI 임베딩 API. EMBEDDING_BATCH_SIZE 단위로 묶어 호출하고 rate limit 시 재시도합니다."""
+
+    name = "openai"
+
+    def __init__(self, model: str = config.EMBEDDING_MODEL, batch_size: int = config.EMBEDDING_BATCH_SIZE,
+                 api_key: Optional[str] = config.OPENAI_API_KEY, base_url: Optional[str] = config.OPENAI_BASE_URL,
+                 max_retries: int = config.EMBEDDING_MAX_RETRIES, retry_delay: float = config.EMBEDDING_RETRY_DELAY):
+        super().__init__(model, batch_size)
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._client = None
+
+    @property
+    def dimension(self) -> int:
+        return OPENAI_MODEL_DIMENSIONS.get(self.model, config.EMBEDDING_DIM)
+
+    @property
+    def client(self):
+        """OpenAI 클라이언트를 지연 생성합니다."""
+        if self._client is None:
+            from openai import OpenAI
+            # 호환 서버(가짜 서버 등)는 키를 검사하지 않으므로 키가 없어도 동작하게 함
+            api_key = self.api_key or ("unused" if self.base_url else None)
+            # 재시도는 아래 embed()에서 Retry-After를 따라 직접 처리
+            self._client = OpenAI(api_key=api_key, base_url=self.base_url, max_retries=0)
+        return self._client
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        embeddings: List[List[float]] = []
+
+        for start in range(0, len(texts), self.batch_size):
+            chunk = texts[start:start + self.batch_size]
+
+            # 재시도 로직
+            for retry in range(self.max_retries):
+                try:
+                    with span("embedding_request", provider=self.name, model=self.model):
+                        response = self.client.embeddings.create(input=chunk, model=self.model)
+                    # 응답 순서가 보장되지 않으므로 index 기준으로 정렬
+                    data = sorted(response.data, key=lambda d: d.index)
+                    embeddings.extend(d.embedding for d in data)
+                    increment("embedding_texts", len(chunk), provider=self.name)
+                    break
+                except Exception as e:
+                    if "rate limit" in str(e).lower() and retry < self.max_retries - 1:
+                        delay = self._retry_after(e)
+                        increment("embedding_retries", provider=self.name)
+                        logger.warning(
+                            "Rate limit 도달. %s초 후 재시도... (시도 %s/%s)",
+                            delay, retry + 1, self.max_retries
+                        )
+                        time.sleep(delay)
+                    else:
+                        raise
+
+        return embeddings
+
+    def _retry_after(self, error: Exception) -> float:
+        """429 응답의 Retry-After 헤더(초)를 따르고, 없으면 retry_delay를 사용합니다."""
+        response = getattr(error, "response", None)
+        value = response.headers.get("retry-after") if response is not None else None
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return self.retry_delay
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    로컬 경로의 다국어(한국어 지원) 문장 임베딩 모델을 CPU에서 실행합니다.
+
+    - model.onnx + tokenizer.json이 있으면 ONNX Runtime으로 추론하고 평균 풀링합니다.
+    - 그 외에는 sentence-transformers 모델 디렉터리로 로드합니다.
+    batch_size 단위 배치를 스레드 여러 개로 동시에 추론하며, 출력 벡터는 L2 정규화됩니다.
+    """
+
+    name = "local"
+
+    def __init__(self, model_path: str = config.LOCAL_EMBEDDING_MODEL_PATH,
+                 batch_size: int = config.LOCAL_EMBEDDING_BATCH_SIZE,
+                 threads: int = config.LOCAL_EMBEDDING_THREADS, max_length: int = 256):
+        super().__init__(os.path.basename(os.path.normpath(model_path)), batch_size)
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"로컬 임베딩 모델 경로가 없습니다: {model_path}")
+        self.model_path = model_path
+        self.threads = max(1, threads)
+        self.max_length = max_length
+
+        if os.path.exists(os.path.join(model_path, "model.onnx")):
+            self._load_onnx()
+        else:
+            self._load_sentence_transformers()
+
+    def _load_sentence_transformers(self):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("local 임베딩에는 sentence-transformers 또는 ONNX 모델(onnxruntime, tokenizers)이 필요합니다") from e
+
+        self.backend = "sentence-transformers"
+        self._model = SentenceTransformer(self.model_path, device="cpu")
+        self._dimension = self._model.get_sentence_embedding_dimension()
+
+    def _load_onnx(self):
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("ONNX 모델 실행에는 onnxruntime, tokenizers가 필요합니다") from e
+
+        self.backend = "onnx"
+        self._tokenizer = Tokenizer.from_file(os.path.join(self.model_path, "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=self.max_length)
+        self._tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        # 배치 단위 병렬화는 스레드 풀이 담당하므로 세션 내부 스레드는 나눠 씀
+        options.intra_op_num_threads = max(1, (os.cpu_count() or 1) // self.threads)
+        self._session = onnxruntime.InferenceSession(
+            os.path.join(self.model_path, "model.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {model_input.name for model_input in self._session.get_inputs()}
+        self._dimension = int(self._encode_batch(["차원 확인"]).shape[1])
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        if self.backend == "sentence-transformers":
+            return self._model.encode(texts, batch_size=len(texts), convert_to_numpy=True,
+                                      normalize_embeddings=True, show_progress_bar=False)
+
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.asarray([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.asarray([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self._session.run(None, feeds)[0]
+        # 패딩 토큰을 제외한 평균 풀링
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def _timed_encode(self, texts: List[str]) -> np.ndarray:
+        with span("embedding_request", provider=self.name, model=self.model):
+            return self._encode_batch(texts)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        increment("embedding_texts", len(texts), provider=self.name)
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1 or self.threads == 1:
+            results = [self._timed_encode(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.threads, len(batches))) as executor:
+                results = list(executor.map(self._timed_encode, batches))
+        return np.concatenate(results).astype(np.float32).tolist()
+
+
+PROVIDERS = {
+    OpenAIEmbeddingProvider.name: OpenAIEmbeddingProvider,
+    LocalEmbeddingProvider.name: LocalEmbeddingProvider,
+}
+
+
+@lru_cache(maxsize=None)
+def _create_provider(name: str) -> EmbeddingProvider:
+    if name not in PROVIDERS:
+        raise ValueError(f"알 수 없는 임베딩 제공자: {name} (사용 가능: {', '.join(PROVIDERS)})")
+    return PROVIDERS[name]()
+
+
+def get_provider(index_name: Optional[str] = None) -> EmbeddingProvider:
+    """인덱스에 설정된 임베딩 제공자를 반환합니다 (같은 제공자는 프로세스 내에서 재사용)."""
+    name = config.INDEX_EMBEDDING_PROVIDERS.get(index_name, config.EMBEDDING_PROVIDER)
+    return _create_provider(name)
+
+
+def embed_isolating_failures(provider: EmbeddingProvider,
+                             texts: List[str]) -> Tuple[List[Optional[List[float]]], List[Tuple[int, Exception]]]:
+    """
+    texts를 한 번에 임베딩하고, 묶음 요청이 실패하면 한 건씩 다시 보내 계속 실패하는 항목만 건너뜁니다.
+    너무 긴 텍스트 하나 때문에 같은 묶음의 나머지까지 잃지 않도록 합니다.
+    반환: (입력 순서의 임베딩 목록, 실패 항목은 None), [(실패 위치, 오류)]
+    """
+    try:
+        return provider.embed(texts), []
+    except Exception as e:
+        if len(texts) == 1:
+            return [None], [(0, e)]
+        logger.warning("임베딩 묶음 %s개 실패, 한 건씩 재시도: %s", len(texts), e)
+        increment("embedding_batch_fallbacks", provider=provider.name)
+
+    embeddings: List[Optional[List[float]]] = []
+    failures: List[Tuple[int, Exception]] = []
+    for position, text in enumerate(texts):
+        try:
+            embeddings.append(provider.embed([text])[0])
+        except Exception as e:
+            embeddings.append(None)
+            failures.append((position, e))
+    return embeddings, failures
+
+
+# ============================================================================
+# 임베딩 파일 메타데이터
+# ============================================================================
+# generate_*_embeddings.py가 출력 파일 옆에 <이름>.meta.json으로 제공자/모델/차원을 기록하면
+# 업로드 시 검증 차원과 인덱스 매핑 차원이 이 값을 따릅니다.
+
+def metadata_path(embeddings_file: str) -> str:
+    return os.path.splitext(embeddings_file)[0] + ".meta.json"
+
+
+def write_embedding_metadata(embeddings_file: str, provider: EmbeddingProvider) -> dict:
+    metadata = provider.metadata()
+    with open(metadata_path(embeddings_file), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    return metadata
+
+
+def read_embedding_metadata(embeddings_file: Optional[str]) -> dict:
+    """기록된 메타데이터를 읽습니다. 없으면 기존 OpenAI 기본값으로 간주합니다."""
+    path = metadata_path(embeddings_file) if embeddings_file else None
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"provider": "openai", "model": config.EMBEDDING_MODEL, "dimension": config.EMBEDDING_DIM}
+
+
+EMBEDDING_SPACE_KEYS = ("provider", "model", "dimension")
+
+
+def check_query_embedding_space(recipe_embeddings_file: Optional[str],
+                                ingredient_embeddings_file: Optional[str] = None) -> dict:
+    """
+    추천 질의 벡터가 레시피 벡터와 같은 공간인지 확인합니다.
+    재료 벡터(저장된 재료)와 재료 인덱스 제공자의 임베딩(미등록 재료명)을 더해 레시피 행렬과 비교하므로
+    레시피 파일, 재료 파일, 현재 설정된 재료 제공자의 제공자/모델/차원이 모두 같아야 합니다. 다르면 ValueError.
+    """
+    recipe = read_embedding_metadata(recipe_embeddings_file)
+    expected = {key: recipe.get(key) for key in EMBEDDING_SPACE_KEYS}
+
+    sources = []
+    if ingredient_embeddings_file:
+        sources.append(("재료 임베딩 파일", read_embedding_metadata(ingredient_embeddings_file)))
+    provider = config.INDEX_EMBEDDING_PROVIDERS.get(config.INGREDIENT_INDEX, config.EMBEDDING_PROVIDER)
+    sources.append((f"재료 질의 제공자 ({provider})", get_provider(config.INGREDIENT_INDEX).metadata()))
+
+    for label, metadata in sources:
+        actual = {key: metadata.get(key) for key in EMBEDDING_SPACE_KEYS}
+        if actual != expected:
+            raise ValueError(f"{label} {actual}이(가) 레시피 임베딩 {expected}과 다릅니다 "
+                             f"(EMBEDDING_PROVIDER / RECIPE_EMBEDDING_PROVIDER / INGREDIENT_EMBEDDING_PROVIDER를 "
+                             f"임베딩 파일을 만든 제공자와 맞추거나 임베딩을 다시 생성하세요)")
+    return expected
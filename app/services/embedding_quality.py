@@ -0,0 +1,238 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.neighbor_graph import row_fingerprints
+from app.services.vector_store import normalize_rows
+
+# 한 번에 곱할 행 수 (block_size x N 유사도 행렬만 메모리에 올라감)
+DEFAULT_BLOCK_SIZE = 512
+
+# 코사인 유사도가 이 값 이상이면 거의 같은 벡터로 간주
+NEAR_DUPLICATE_THRESHOLD = 0.995
+
+# 보고서에 나열할 최대 쌍/그룹 수 (개수 자체는 전부 셈)
+MAX_REPORTED = 50
+
+QUANTILES = (0.0, 0.01, 0.05, 0.5, 0.95, 0.99, 1.0)
+
+# 이전 버전 대비 경고 기준
+CENTROID_DRIFT_THRESHOLD = 0.98      # 중심 벡터 코사인이 이보다 낮으면 분포 이동
+QUANTILE_DRIFT_THRESHOLD = 0.05      # 중심 유사도 분위수가 이보다 많이 변하면 분포 이동
+DUPLICATE_RATIO_THRESHOLD = 0.01     # 중복 문서 비율 경고 기준
+
+
+def _quantiles(values: np.ndarray) -> Dict[str, float]:
+    if len(values) == 0:
+        return {}
+    return {f"p{int(q * 100)}": float(v) for q, v in zip(QUANTILES, np.quantile(values, QUANTILES))}
+
+
+class EmbeddingProfile:
+    """
+    이전 색인 버전과 비교하기 위한 요약 정보.
+    벡터 자체 대신 중심 벡터, 분위수, 문서별 지문만 저장하므로 카탈로그 크기와 무관하게 작습니다.
+    """
+
+    def __init__(self, ids: Sequence[str], fingerprints: np.ndarray, centroid: np.ndarray,
+                 norm_quantiles: np.ndarray, centroid_sim_quantiles: np.ndarray):
+        self.ids = np.asarray(ids, dtype=str)
+        self.fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        self.centroid = np.asarray(centroid, dtype=np.float32)
+        self.norm_quantiles = np.asarray(norm_quantiles, dtype=np.float64)
+        self.centroid_sim_quantiles = np.asarray(centroid_sim_quantiles, dtype=np.float64)
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            ids=self.ids,
+            fingerprints=self.fingerprints,
+            centroid=self.centroid,
+            norm_quantiles=self.norm_quantiles,
+            centroid_sim_quantiles=self.centroid_sim_quantiles,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingProfile":
+        with np.load(path) as data:
+            return cls(data["ids"], data["fingerprints"], data["centroid"],
+                       data["norm_quantiles"], data["centroid_sim_quantiles"])
+
+
+# ============================================================================
+# 중복 탐지
+# ============================================================================
+
+def exact_duplicate_groups(fingerprints: np.ndarray, rows: np.ndarray) -> List[np.ndarray]:
+    """벡터 바이트가 완전히 같은 행 묶음 (지문 기준)."""
+    order = np.argsort(fingerprints, kind="stable")
+    sorted_fp = fingerprints[order]
+    boundaries = np.flatnonzero(np.diff(sorted_fp)) + 1
+    groups = np.split(rows[order], boundaries)
+    return [group for group in groups if len(group) > 1]
+
+
+def near_duplicate_pairs(unit: np.ndarray, fingerprints: np.ndarray,
+                         threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                         block_size: int = DEFAULT_BLOCK_SIZE,
+                         max_pairs: int = MAX_REPORTED):
+    """
+    코사인 유사도가 threshold 이상인 (i < j) 쌍을 블록 단위 행렬 곱으로 찾습니다.
+    완전히 같은 벡터 쌍은 exact_duplicate_groups에서 다루므로 제외합니다.
+    반환값: (전체 쌍 수, 유사도 상위 max_pairs개의 (i, j, score) 목록)
+    """
+    n = len(unit)
+    total = 0
+    top_i, top_j, top_s = [], [], []
+
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        # 상삼각 부분만 계산: 블록 행 x 블록 시작 이후 열
+        scores = unit[start:end] @ unit[start:].T
+        i, j = np.nonzero(scores >= threshold)
+        i_abs, j_abs = i + start, j + start
+        keep = (j_abs > i_abs) & (fingerprints[i_abs] != fingerprints[j_abs])
+        i_abs, j_abs = i_abs[keep], j_abs[keep]
+        total += len(i_abs)
+
+        if len(i_abs):
+            top_i.append(i_abs)
+            top_j.append(j_abs)
+            top_s.append(scores[i[keep], j[keep]])
+            # 보고용 후보는 max_pairs개만 유지
+            merged_s = np.concatenate(top_s)
+            if len(merged_s) > max_pairs:
+                best = np.argpartition(-merged_s, max_pairs - 1)[:max_pairs]
+                top_i = [np.concatenate(top_i)[best]]
+                top_j = [np.concatenate(top_j)[best]]
+                top_s = [merged_s[best]]
+
+    if not top_s:
+        return total, []
+    pair_i, pair_j, pair_s = np.concatenate(top_i), np.concatenate(top_j), np.concatenate(top_s)
+    order = np.argsort(-pair_s)
+    return total, [(int(pair_i[k]), int(pair_j[k]), float(pair_s[k])) for k in order]
+
+
+# ============================================================================
+# 분석
+# ============================================================================
+
+def analyze_embeddings(ids: Sequence[str], matrix: np.ndarray,
+                       previous: Optional[EmbeddingProfile] = None,
+                       threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                       block_size: int = DEFAULT_BLOCK_SIZE):
+    """
+    임베딩 행렬의 품질(노름, 0/NaN 벡터, 중복)과 이전 버전 대비 분포 변화를 계산합니다.
+    반환값: (JSON 직렬화 가능한 보고서 dict, 이번 버전의 EmbeddingProfile)
+    """
+    ids = np.asarray(ids, dtype=str)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    warnings = []
+
+    finite = np.isfinite(matrix).all(axis=1)
+    norms = np.linalg.norm(np.where(finite[:, None], matrix, 0.0), axis=1)
+    zero = finite & (norms <= 1e-6)
+    usable = np.flatnonzero(finite & ~zero)
+
+    if (~finite).any():
+        warnings.append(f"NaN/Inf 벡터 {int((~finite).sum())}개")
+    if zero.any():
+        warnings.append(f"0 벡터 {int(zero.sum())}개")
+
+    vectors = matrix[usable]
+    unit = normalize_rows(vectors)
+    fingerprints = row_fingerprints(vectors)
+
+    # 완전 중복 (빈 hash_tag 등으로 같은 텍스트가 반복될 때 API가 같은 벡터를 반환)
+    groups = exact_duplicate_groups(fingerprints, np.arange(len(usable)))
+    duplicate_docs = sum(len(group) - 1 for group in groups)
+    near_total, near_pairs = near_duplicate_pairs(unit, fingerprints, threshold, block_size)
+    if len(usable) and duplicate_docs / len(usable) > DUPLICATE_RATIO_THRESHOLD:
+        warnings.append(f"완전 중복 비율 {duplicate_docs / len(usable):.1%}")
+
+    centroid = unit.mean(axis=0) if len(unit) else np.zeros(matrix.shape[1], dtype=np.float32)
+    centroid_norm = float(np.linalg.norm(centroid))
+    centroid_unit = centroid / centroid_norm if centroid_norm > 0 else centroid
+    centroid_sims = unit @ centroid_unit
+
+    profile = EmbeddingProfile(
+        ids[usable], fingerprints, centroid,
+        np.quantile(norms[usable], QUANTILES) if len(usable) else np.zeros(len(QUANTILES)),
+        np.quantile(centroid_sims, QUANTILES) if len(usable) else np.zeros(len(QUANTILES)),
+    )
+
+    report = {
+        "count": int(len(matrix)),
+        "dimension": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "invalid": {
+            "nonfinite_ids": ids[~finite].tolist(),
+            "zero_ids": ids[zero].tolist(),
+        },
+        "norms": {
+            "mean": float(norms[usable].mean()) if len(usable) else 0.0,
+            "std": float(norms[usable].std()) if len(usable) else 0.0,
+            **_quantiles(norms[usable]),
+        },
+        "duplicates": {
+            "exact_groups": len(groups),
+            "exact_docs": int(duplicate_docs),
+            "exact_examples": [ids[usable[group]].tolist() for group in groups[:MAX_REPORTED]],
+            "near_threshold": threshold,
+            "near_pairs": int(near_total),
+            "near_examples": [
+                {"a": str(ids[usable[i]]), "b": str(ids[usable[j]]), "cosine": round(score, 6)}
+                for i, j, score in near_pairs
+            ],
+        },
+        "distribution": {
+            # 1에 가까울수록 벡터들이 한 방향으로 몰려 있음 (이방성)
+            "centroid_norm": centroid_norm,
+            "centroid_similarity": _quantiles(centroid_sims),
+        },
+    }
+
+    if previous is not None:
+        report["drift"] = _compare(profile, previous, warnings)
+
+    report["warnings"] = warnings
+    report["status"] = "warn" if warnings else "ok"
+    return report, profile
+
+
+def _compare(current: EmbeddingProfile, previous: EmbeddingProfile, warnings: List[str]) -> dict:
+    """이전 버전 프로필과 중심 벡터·분위수·문서 집합을 비교합니다."""
+    drift = {}
+
+    if previous.centroid.shape == current.centroid.shape:
+        denominator = float(np.linalg.norm(previous.centroid) * np.linalg.norm(current.centroid))
+        cosine = float(previous.centroid @ current.centroid) / denominator if denominator else 0.0
+        drift["centroid_cosine"] = cosine
+        drift["centroid_l2_shift"] = float(np.linalg.norm(current.centroid - previous.centroid))
+        if cosine < CENTROID_DRIFT_THRESHOLD:
+            warnings.append(f"중심 벡터 이동 (코사인 {cosine:.4f})")
+    else:
+        drift["dimension_changed"] = [int(previous.centroid.shape[0]), int(current.centroid.shape[0])]
+        warnings.append("임베딩 차원 변경")
+
+    labels = [f"p{int(q * 100)}" for q in QUANTILES]
+    norm_delta = current.norm_quantiles - previous.norm_quantiles
+    sim_delta = current.centroid_sim_quantiles - previous.centroid_sim_quantiles
+    drift["norm_quantile_delta"] = dict(zip(labels, norm_delta.tolist()))
+    drift["centroid_similarity_delta"] = dict(zip(labels, sim_delta.tolist()))
+    if np.abs(sim_delta[1:-1]).max(initial=0.0) > QUANTILE_DRIFT_THRESHOLD:
+        warnings.append("중심 유사도 분포 변화")
+
+    # 문서 집합 비교 (지문이 바뀐 문서 = 재임베딩된 문서)
+    previous_fp = dict(zip(previous.ids.tolist(), previous.fingerprints.tolist()))
+    current_ids = current.ids.tolist()
+    changed = sum(1 for doc_id, fp in zip(current_ids, current.fingerprints.tolist())
+                  if doc_id in previous_fp and previous_fp[doc_id] != fp)
+    added = len(set(current_ids) - previous_fp.keys())
+    drift["documents"] = {
+        "added": added,
+        "removed": len(previous_fp.keys() - set(current_ids)),
+        "changed": changed,
+        "unchanged": len(current_ids) - added - changed,
+    }
+    return drift
@@ -0,0 +1,13 @@
+from typing import List, Optional
+
+from app.services.embedding_providers import get_provider
+
+
+def embed_texts(texts: List[str], index_name: Optional[str] = None) -> List[List[float]]:
+    """
+    여러 텍스트를 묶어서 임베딩합니다.
+    index_name에 설정된 제공자(openai / local)를 사용하며, 결과는 입력 순서를 유지합니다.
+    """
+    if not texts:
+        return []
+    return get_provider(index_name).embed(texts)
@@ -0,0 +1,185 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core import config
+from app.core.serialization import JSONDecodeError, load, loads
+from app.services.vector_store import normalize_rows
+
+# 노름이 이 값 이하이면 0 벡터로 간주 (정규화/코사인 계산이 불가능)
+MIN_NORM = 1e-6
+
+# 임베딩 원소로 허용하는 NumPy dtype 종류 (bool / int / uint / float). 문자열('U')·객체('O')는 거부
+NUMERIC_KINDS = "biuf"
+
+# 프로세스 풀 작업 단위 (NDJSON 줄 수)
+DEFAULT_CHUNK_LINES = 2000
+
+
+def _label(item) -> str:
+    if not isinstance(item, dict):
+        return "Unknown"
+    return str(item.get('name', item.get('recipe_id', item.get('ingredient_id', 'Unknown'))))
+
+
+def embedding_matrix(data: Sequence[dict], dim: int = config.EMBEDDING_DIM) -> Tuple[np.ndarray, List[int], List[Tuple[int, str]]]:
+    """
+    embedding 필드를 float32 행렬 하나로 변환합니다.
+
+    길이가 dim인 리스트만 한 번의 np.asarray로 변환합니다. dtype을 추론하게 두고 숫자형(bool/int/float)일 때만
+    float32로 바꾸므로 "0.1" 같은 숫자 문자열은 통과하지 못합니다 (float32로 바로 변환하면 조용히 받아들임).
+    숫자가 아닌 값이 섞여 있을 때만 해당 행들을 하나씩 다시 변환해 원인 행을 찾습니다.
+    반환값: (행렬, 행렬 각 행의 원본 인덱스, [(원본 인덱스, 사유)])
+    """
+    problems = []
+    rows = []
+    for i, item in enumerate(data):
+        embedding = item.get('embedding') if isinstance(item, dict) else None
+        if isinstance(embedding, list) and len(embedding) == dim:
+            rows.append(i)
+        else:
+            problems.append((i, "잘못된 임베딩 차원"))
+
+    try:
+        matrix = np.asarray([data[i]['embedding'] for i in rows])
+    except (TypeError, ValueError):
+        matrix = None
+    if matrix is not None and matrix.ndim == 2 and matrix.dtype.kind in NUMERIC_KINDS:
+        matrix = matrix.astype(np.float32, copy=False)
+    elif not rows:
+        matrix = np.empty((0, dim), dtype=np.float32)
+    else:
+        converted = []
+        kept = []
+        for i in rows:
+            try:
+                vector = np.asarray(data[i]['embedding'])
+            except (TypeError, ValueError):
+                vector = None
+            if vector is None or vector.ndim != 1 or vector.dtype.kind not in NUMERIC_KINDS:
+                problems.append((i, "임베딩 값이 숫자가 아님"))
+                continue
+            converted.append(vector.astype(np.float32, copy=False))
+            kept.append(i)
+        rows = kept
+        matrix = np.stack(converted) if converted else np.empty((0, dim), dtype=np.float32)
+
+    return matrix.reshape(len(rows), dim), rows, problems
+
+
+def validate_embeddings(data: Sequence[dict], dim: int = config.EMBEDDING_DIM,
+                        min_norm: float = MIN_NORM) -> Tuple[List[dict], np.ndarray, List[Tuple[str, str]]]:
+    """
+    형태·유한성·노름을 NumPy로 한 번에 검사합니다.
+    반환값: (유효한 문서, 유효한 문서의 float32 행렬, [(문서 이름, 사유)])
+    """
+    matrix, rows, problems = embedding_matrix(data, dim)
+
+    finite = np.isfinite(matrix).all(axis=1)
+    norms = np.linalg.norm(np.where(np.isfinite(matrix), matrix, 0.0), axis=1)
+    ok = finite & (norms > min_norm)
+
+    for row in np.flatnonzero(~finite):
+        problems.append((rows[row], "NaN/Inf 포함"))
+    for row in np.flatnonzero(finite & (norms <= min_norm)):
+        problems.append((rows[row], "0 벡터"))
+
+    problems.sort()
+    valid = [data[rows[row]] for row in np.flatnonzero(ok)]
+    return valid, matrix[ok], [(_label(data[i]), reason) for i, reason in problems]
+
+
+# ============================================================================
+# 원본 JSON/NDJSON 병렬 파싱 + 검증
+# ============================================================================
+
+def _parse_and_validate_lines(args) -> Tuple[List[dict], int, List[Tuple[str, str]]]:
+    """프로세스 풀 작업 단위: NDJSON 줄 묶음을 파싱·검증·전처리합니다."""
+    lines, dim, transform, normalize = args
+    records = []
+    problems = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(loads(line))
+        except JSONDecodeError as e:
+            problems.append(("Unknown", f"JSON 파싱 실패: {e}"))
+    valid, matrix, invalid = validate_embeddings(records, dim)
+    _attach_vectors(valid, normalize_rows(matrix) if normalize else matrix)
+    if transform is not None:
+        valid = transform(valid)
+    return valid, len(records), problems + invalid
+
+
+def _attach_vectors(docs: List[dict], matrix: np.ndarray) -> None:
+    """
+    embedding을 검증에 쓴 float32 행으로 바꿉니다.
+    프로세스 간 전달 시 float 리스트보다 pickle이 훨씬 작고 빠르며,
+    opensearch-py 직렬화기는 ndarray를 그대로 JSON 배열로 씁니다.
+    """
+    for doc, vector in zip(docs, matrix):
+        doc['embedding'] = vector
+
+
+def _iter_line_chunks(path: str, chunk_lines: int) -> Iterator[List[str]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        chunk = []
+        for line in f:
+            chunk.append(line)
+            if len(chunk) >= chunk_lines:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def load_embedding_file(path: str, dim: int = config.EMBEDDING_DIM, transform=None,
+                        normalize: bool = False, workers: Optional[int] = None,
+                        chunk_lines: int = DEFAULT_CHUNK_LINES) -> Tuple[List[dict], int, List[Tuple[str, str]]]:
+    """
+    임베딩 파일을 읽어 검증된 문서 목록을 반환합니다.
+
+    - .ndjson: 줄 묶음 단위로 프로세스 풀에 나눠 파싱·검증·전처리(transform)합니다.
+    - .json: 배열 하나라 분할 파싱이 불가능하므로 한 번에 읽고 벡터화 검증만 합니다.
+      (문서를 다른 프로세스로 보내는 pickle 비용이 NumPy 검증 자체보다 큽니다)
+
+    반환되는 문서의 embedding은 float32 ndarray이며, normalize=True이면 L2 정규화된 벡터입니다.
+    transform은 유효한 문서 목록을 받아 업로드용 문서 목록을 돌려주는 모듈 수준 함수여야 합니다.
+    반환값: (문서 목록, 전체 문서 수, [(문서 이름, 사유)])
+    """
+    if not path.endswith('.ndjson'):
+        with open(path, 'rb') as f:
+            data = load(f)
+        valid, matrix, problems = validate_embeddings(data, dim)
+        _attach_vectors(valid, normalize_rows(matrix) if normalize else matrix)
+        return (transform(valid) if transform is not None else valid), len(data), problems
+
+    workers = workers or os.cpu_count() or 1
+    docs, total, problems = [], 0, []
+    for valid, count, invalid in _map_chunks(path, dim, transform, normalize, workers, chunk_lines):
+        docs.extend(valid)
+        total += count
+        problems.extend(invalid)
+    return docs, total, problems
+
+
+def _map_chunks(path: str, dim: int, transform, normalize: bool, workers: int, chunk_lines: int):
+    """줄 묶음을 순서대로 처리합니다. 읽은 줄이 메모리에 쌓이지 않도록 진행 중인 묶음 수를 제한합니다."""
+    chunks = ((lines, dim, transform, normalize) for lines in _iter_line_chunks(path, chunk_lines))
+    if workers == 1:
+        yield from map(_parse_and_validate_lines, chunks)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_parse_and_validate_lines, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
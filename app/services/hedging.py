@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Tuple, TypeVar
+
+import numpy as np
+
+from app.core import config
+from app.core.metrics import increment, observe
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# ============================================================================
+# OpenSearch → 프로세스 내 엔진 헤지 요청 + 서킷 브레이커
+# ============================================================================
+# 단일 노드 OpenSearch가 느리거나 재시작 중이면 모든 추천이 클라이언트 타임아웃까지 멈춥니다.
+# OpenSearch가 최근 p95로 정한 마감 시간 안에 답하지 않으면 같은 질의를 로컬 NumPy 엔진으로 보내고,
+# 연속 실패가 쌓이면 브레이커를 열어 일정 시간 동안 모든 요청을 로컬에서 처리합니다.
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 서킷 브레이커.
+    closed → (연속 실패 failure_threshold회) → open → (reset_seconds 경과) → half_open → 시험 요청 성공 시 closed
+    """
+
+    def __init__(self, failure_threshold: int = config.BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = config.BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str):
+        if state != self.state:
+            logger.warning("서킷 브레이커 %s → %s", self.state, state)
+            increment("circuit_breaker_transitions", to=state)
+            self.state = state
+
+    def allow(self) -> bool:
+        """OpenSearch로 보내도 되는지. half_open에서는 시험 요청 하나만 통과시킵니다."""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self._transition("half_open")
+                self._probing = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._transition("closed")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._transition("open")
+
+
+class LatencyTracker:
+    """최근 성공 응답 지연의 분위수로 헤지 마감 시간을 정합니다 (표본이 적으면 initial, 상하한으로 제한)."""
+
+    def __init__(self, window: int = config.HEDGE_WINDOW, quantile: float = config.HEDGE_QUANTILE,
+                 initial: float = config.HEDGE_INITIAL_DEADLINE_MS / 1000,
+                 minimum: float = config.HEDGE_MIN_DEADLINE_MS / 1000,
+                 maximum: float = config.HEDGE_MAX_DEADLINE_MS / 1000):
+        self.samples = deque(maxlen=window)
+        self.quantile = quantile
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def deadline(self) -> float:
+        with self._lock:
+            if len(self.samples) < 20:
+                return self.initial
+            value = float(np.quantile(np.fromiter(self.samples, dtype=float), self.quantile))
+        return min(max(value, self.minimum), self.maximum)
+
+
+class HedgedBackend:
+    """
+    primary(OpenSearch)를 스레드에서 실행하고 마감 시간 안에 답이 없거나 실패하면 fallback(로컬)을 실행합니다.
+    run()은 (결과, 응답한 백엔드, 사유)를 반환하고 같은 값을 hedge_outcome 카운터에 기록합니다.
+    늦게 끝난 primary의 지연/성패도 마감 시간과 브레이커에 반영됩니다.
+    작업자가 모두 바쁘면(OpenSearch 정체) 큐에 쌓지 않고 바로 fallback으로 보냅니다.
+    """
+
+    def __init__(self, primary_name: str = "opensearch", fallback_name: str = "local",
+                 breaker: CircuitBreaker = None, tracker: LatencyTracker = None,
+                 max_workers: int = config.HEDGE_POOL_SIZE):
+        self.primary_name = primary_name
+        self.fallback_name = fallback_name
+        self.breaker = breaker or CircuitBreaker()
+        self.tracker = tracker or LatencyTracker()
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def _answer(self, result: T, backend: str, reason: str) -> Tuple[T, str, str]:
+        increment("hedge_outcome", backend=backend, reason=reason)
+        return result, backend, reason
+
+    def _acquire(self) -> bool:
+        """빈 작업자 자리를 예약합니다. 예약한 만큼만 제출하므로 작업이 큐에서 기다리지 않습니다."""
+        with self._lock:
+            if self.in_flight >= self.max_workers:
+                return False
+            self.in_flight += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def run(self, primary: Callable[[], T], fallback: Callable[[], T]) -> Tuple[T, str, str]:
+        # 포화 확인을 브레이커보다 먼저 해야 half_open 시험 요청이 제출되지 못한 채 소모되지 않음
+        if not self._acquire():
+            return self._answer(fallback(), self.fallback_name, "saturated")
+        if not self.breaker.allow():
+            self._release()
+            return self._answer(fallback(), self.fallback_name, "circuit_open")
+
+        deadline = self.tracker.deadline()
+        timing = {}
+
+        def task():
+            # 지연은 작업자가 실제로 실행을 시작한 시점부터 잼
+            timing["start"] = time.perf_counter()
+            try:
+                return primary()
+            finally:
+                timing["elapsed"] = time.perf_counter() - timing["start"]
+
+        def settle(done):
+            # 헤지 여부와 관계없이 primary가 끝난 시점에 지연/성패를 기록
+            self._release()
+            if done.cancelled() or done.exception() is not None:
+                self.breaker.record_failure()
+                return
+            elapsed = timing["elapsed"]
+            self.tracker.record(elapsed)
+            if elapsed <= deadline:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+        try:
+            future = self.executor.submit(task)
+        except RuntimeError as e:
+            # 종료 중인 실행기: 예약한 자리와 half_open 시험 요청을 되돌림
+            self._release()
+            self.breaker.record_failure()
+            logger.warning("%s 제출 실패, %s로 대체: %s", self.primary_name, self.fallback_name, e)
+            return self._answer(fallback(), self.fallback_name, "error")
+        future.add_done_callback(settle)
+        try:
+            result = future.result(timeout=deadline)
+            return self._answer(result, self.primary_name, "primary")
+        except FutureTimeoutError:
+            observe("hedge_deadline", deadline)
+            return self._answer(fallback(), self.fallback_name, "hedged")
+        except Exception as e:
+            logger.warning("%s 검색 실패, %s로 대체: %s", self.primary_name, self.fallback_name, e)
+            return self._answer(fallback(), self.fallback_name, "error")
+
+    def status(self) -> Dict:
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "deadline_ms": round(self.tracker.deadline() * 1000, 1),
+            "in_flight": self.in_flight,
+            "max_workers": self.max_workers,
+        }
@@ -0,0 +1,110 @@
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from app.core import config
+from app.core.serialization import load
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# 재료 동의어 사전 → 색인 시점 동의어 규칙
+# ============================================================================
+# ingredient_aliases_nested.json (카테고리 → 표준 재료명 → 별칭 목록)의 표준명과 별칭을
+# 하나의 동의어 묶음으로 보고 Solr 형식 규칙 "강력분, 강력밀가루"로 만듭니다.
+# 레시피 ingredients 필드를 색인할 때 묶음의 모든 표기를 같은 위치에 함께 기록하므로
+# "강력밀가루"나 "전립분"으로 검색해도 별칭 확장 절 없이 match 한 번으로 찾습니다.
+
+
+def _normalize_term(term: str) -> str:
+    return re.sub(r"\s+", " ", str(term)).strip().lower()
+
+
+def _escape_term(term: str) -> str:
+    """Solr 동의어 형식의 구분자(쉼표, =>)와 역슬래시를 이스케이프합니다."""
+    return term.replace("\\", "\\\\").replace(",", "\\,").replace("=>", "=\\>")
+
+
+def load_alias_groups(path: str = config.INGREDIENT_ALIASES_FILE) -> List[List[str]]:
+    """표준 재료명별로 [표준명, 별칭...] 묶음을 만듭니다 (중복·공백 정리, 표기가 하나뿐인 묶음 제외)."""
+    with open(path, "rb") as f:
+        nested = load(f)
+
+    groups = []
+    for names in nested.values():
+        for name, aliases in names.items():
+            terms = []
+            for term in [name] + list(aliases or []):
+                term = _normalize_term(term)
+                if term and term not in terms:
+                    terms.append(term)
+            if len(terms) > 1:
+                groups.append(terms)
+    return groups
+
+
+def synonym_rules(groups: List[List[str]]) -> List[str]:
+    """동의어 묶음을 synonym_graph 필터의 동등 규칙 목록으로 바꿉니다."""
+    return [", ".join(_escape_term(term) for term in terms) for terms in groups]
+
+
+def alias_lookup(groups: List[List[str]]) -> Dict[str, List[str]]:
+    """표기 → 같은 묶음의 모든 표기 (질의 시점 확장과 비교할 때 사용)."""
+    lookup: Dict[str, List[str]] = {}
+    for terms in groups:
+        for term in terms:
+            merged = lookup.setdefault(term, [])
+            merged.extend(t for t in terms if t not in merged)
+    return lookup
+
+
+def recipe_synonym_rules(path: str = config.INGREDIENT_ALIASES_FILE) -> List[str]:
+    """레시피 인덱스 매핑용 규칙. 사전 파일이 없으면 빈 목록 (동의어 없이 색인)."""
+    if not os.path.exists(path):
+        logger.warning("재료 동의어 사전이 없어 동의어 없이 색인합니다: %s", path)
+        return []
+    return synonym_rules(load_alias_groups(path))
+
+
+# ============================================================================
+# 재료명 → 재료 ID (ingredient_ids가 없는 레시피 문서 보완)
+# ============================================================================
+# 체크인된 recipe_embedding_input.json과 기존 임베딩 파일에는 재료명 문자열만 있으므로
+# 재료 ID 표의 표준명과 별칭으로 ingredient_ids / ingredient_count를 채웁니다.
+
+
+@lru_cache(maxsize=4)
+def ingredient_id_lookup(path: str = config.INGREDIENT_TABLE_FILE) -> Dict[str, int]:
+    """표기(표준명, 별칭) → 재료 ID. 표준명이 별칭보다 우선합니다. 파일이 없으면 빈 사전."""
+    if not path or not os.path.exists(path):
+        logger.warning("재료 ID 표가 없습니다: %s", path)
+        return {}
+    with open(path, "rb") as f:
+        items = load(f)
+
+    lookup: Dict[str, int] = {}
+    for item in items:
+        lookup[_normalize_term(item["name"])] = item["id"]
+    for item in items:
+        for alias in item.get("aliases") or []:
+            lookup.setdefault(_normalize_term(alias), item["id"])
+    return lookup
+
+
+def resolve_ingredient_names(text: Optional[str], lookup: Dict[str, int]) -> List[int]:
+    """'계피, 꿀, 당근' 형태의 재료 문자열을 재료 ID 목록으로 바꿉니다 (표에 없는 재료는 건너뜀, 중복 제거)."""
+    ids: List[int] = []
+    for name in str(text or "").split(","):
+        ingredient_id = lookup.get(_normalize_term(name))
+        if ingredient_id is not None and ingredient_id not in ids:
+            ids.append(ingredient_id)
+    return ids
+
+
+def recipe_ingredient_ids(recipe: dict, text_field: str = "processed_ingredients") -> List[int]:
+    """레코드의 ingredient_ids, 없으면 text_field 재료명을 재료 ID 표로 변환한 값."""
+    if recipe.get("ingredient_ids"):
+        return list(recipe["ingredient_ids"])
+    return resolve_ingredient_names(recipe.get(text_field), ingredient_id_lookup())
@@ -0,0 +1,184 @@
+import os
+from typing import Dict, List, Optional
+
+from app.core import config
+
+# ============================================================================
+# k-NN 네이티브 메모리 용량 계산
+# ============================================================================
+# HNSW 그래프는 JVM 힙 밖(네이티브 메모리)에 올라가고, 그래프 캐시 총량이
+# knn.memory.circuit_breaker.limit(기본: 힙을 뺀 노드 메모리의 50%)을 넘으면 오래된 그래프부터 내리고(eviction)
+# 다음 질의가 그래프를 다시 읽느라 느려집니다. 브레이커가 걸리면 새 그래프를 올리는 색인/검색이 실패합니다.
+# 추정식 (k-NN 플러그인 문서): 벡터당 1.1 x (벡터 바이트 + 8 x m) 바이트, 복제본마다 한 벌씩
+
+# 벡터 원소당 바이트 (fp32: nmslib/faiss 기본, fp16: faiss SQfp16, byte: 바이트 벡터)
+ENCODING_BYTES = {"fp32": 4, "fp16": 2, "byte": 1}
+DEFAULT_BREAKER_LIMIT = 0.5
+# 기본 매핑 (upload_to_opensearch*.py): nmslib HNSW, m=24
+DEFAULT_M = 24
+
+
+def hnsw_bytes(doc_count: int, dimension: int, m: int = DEFAULT_M, encoding: str = "fp32",
+               replicas: int = 0) -> int:
+    """HNSW 그래프 네이티브 메모리 추정치 (바이트)."""
+    per_vector = 1.1 * (ENCODING_BYTES[encoding] * dimension + 8 * m)
+    return int(per_vector * doc_count * (1 + replicas))
+
+
+def breaker_budget_bytes(node_memory_bytes: int, heap_bytes: int, limit: float = DEFAULT_BREAKER_LIMIT) -> int:
+    """k-NN 그래프 캐시 상한 (노드 메모리 - 힙) x limit."""
+    return int(max(node_memory_bytes - heap_bytes, 0) * limit)
+
+
+def max_docs_within(budget_bytes: int, dimension: int, m: int = DEFAULT_M, encoding: str = "fp32",
+                    replicas: int = 0) -> int:
+    """예산 안에 들어가는 최대 벡터 수."""
+    return int(budget_bytes / hnsw_bytes(1, dimension, m, encoding, replicas)) if budget_bytes > 0 else 0
+
+
+def parse_breaker_limit(value, node_memory_bytes: int, heap_bytes: int) -> float:
+    """knn.memory.circuit_breaker.limit 설정값("50%" 또는 "4gb")을 (노드 메모리 - 힙) 대비 비율로 바꿉니다."""
+    text = str(value).strip().lower()
+    if text.endswith("%"):
+        return float(text[:-1]) / 100
+    units = {"kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3, "tb": 1024 ** 4, "b": 1}
+    for unit, factor in units.items():
+        if text.endswith(unit):
+            available = max(node_memory_bytes - heap_bytes, 1)
+            return float(text[:-len(unit)]) * factor / available
+    return float(text)
+
+
+def host_memory_bytes() -> Optional[int]:
+    """이 머신의 물리 메모리 (컨테이너에 메모리 제한이 없으면 OpenSearch도 이 값을 봄). 알 수 없으면 None."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def project(indices: List[Dict], budget_bytes: int, targets: List[int], base_docs: Optional[int] = None) -> List[Dict]:
+    """
+    카탈로그를 targets 문서 수로 키웠을 때의 그래프 메모리.
+    indices: [{"index", "doc_count", "dimension", "m", "encoding", "replicas"}].
+    각 인덱스는 현재 비율대로 함께 커진다고 봅니다 (base_docs 대비 배율, 기본은 전체 문서 수 합).
+    """
+    base_docs = base_docs or sum(index["doc_count"] for index in indices) or 1
+    rows = []
+    for target in targets:
+        scale = target / base_docs
+        total = sum(hnsw_bytes(int(index["doc_count"] * scale), index["dimension"], index["m"],
+                               index["encoding"], index["replicas"]) for index in indices)
+        rows.append({"docs": target, "graph_bytes": total,
+                     "budget_ratio": total / budget_bytes if budget_bytes else float("inf")})
+    return rows
+
+
+def recommendations(indices: List[Dict], budget_bytes: int, target_docs: int,
+                    node_memory_bytes: int, heap_bytes: int, limit: float) -> List[str]:
+    """target_docs까지 키울 때 예산을 넘으면 선택지별로 얼마나 줄어드는지 제안합니다."""
+    base_docs = sum(index["doc_count"] for index in indices) or 1
+    scale = target_docs / base_docs
+
+    def total(**override):
+        return sum(hnsw_bytes(int(index["doc_count"] * scale), override.get("dimension", index["dimension"]),
+                              override.get("m", index["m"]), override.get("encoding", index["encoding"]),
+                              index["replicas"]) for index in indices)
+
+    needed = total()
+    gb = 1024 ** 3
+    lines = []
+    if needed <= budget_bytes * 0.8:
+        lines.append(f"현재 설정으로 충분합니다 (예산의 {needed / budget_bytes:.0%}, 여유 20% 이상 유지)")
+        return lines
+
+    lines.append(f"목표 {target_docs:,}개 문서에 그래프 {needed / gb:.2f} GB 필요, 예산 {budget_bytes / gb:.2f} GB")
+    # 예산의 80% 안에 들어가도록 필요한 노드 메모리
+    required_node = heap_bytes + needed / 0.8 / limit
+    lines.append(f"노드 메모리를 {required_node / gb:.1f} GB 이상으로 (현재 {node_memory_bytes / gb:.1f} GB, "
+                 f"docker-compose에 mem_limit을 둔다면 그 값)")
+    for m in (16, 12):
+        if all(index["m"] > m for index in indices):
+            lines.append(f"m {indices[0]['m']} → {m}: {total(m=m) / gb:.2f} GB (재색인 필요, recall 소폭 하락 확인)")
+    if all(index["encoding"] == "fp32" for index in indices):
+        lines.append(f"faiss + SQfp16 인코딩: {total(encoding='fp16') / gb:.2f} GB (엔진 변경 + 재색인)")
+    if all(index["dimension"] > 384 for index in indices):
+        lines.append(f"384차원 로컬 임베딩 모델(EMBEDDING_PROVIDER=local): {total(dimension=384) / gb:.2f} GB")
+    if limit < 0.6:
+        lines.append(f"knn.memory.circuit_breaker.limit {limit:.0%} → 60%: "
+                     f"예산 {breaker_budget_bytes(node_memory_bytes, heap_bytes, 0.6) / gb:.2f} GB "
+                     f"(OS 페이지 캐시가 줄어듦)")
+    return lines
+
+
+# ============================================================================
+# 라이브 클러스터에서 읽기
+# ============================================================================
+
+def live_indices(client, names: List[str]) -> List[Dict]:
+    """인덱스 매핑(차원, m, 엔진/인코딩)과 문서 수, 복제본 수를 읽습니다."""
+    indices = []
+    for name in names:
+        if not client.indices.exists(index=name):
+            continue
+        mapping = next(iter(client.indices.get_mapping(index=name).values()))["mappings"]
+        embedding = mapping["properties"]["embedding"]
+        method = embedding.get("method", {})
+        encoder = method.get("parameters", {}).get("encoder", {})
+        encoding = "fp16" if encoder.get("parameters", {}).get("type") == "fp16" else \
+            "byte" if embedding.get("data_type") == "byte" else "fp32"
+        settings = next(iter(client.indices.get_settings(index=name).values()))["settings"]["index"]
+        indices.append({
+            "index": name,
+            "doc_count": client.count(index=name)["count"],
+            "dimension": int(embedding["dimension"]),
+            "m": int(method.get("parameters", {}).get("m", 16)),
+            "engine": method.get("engine", "nmslib"),
+            "encoding": encoding,
+            "replicas": int(settings.get("number_of_replicas", 0)),
+        })
+    return indices
+
+
+def live_node_memory(client) -> Dict:
+    """노드별 물리 메모리/힙 (k-NN 예산 계산용, 노드 중 가장 작은 값 기준)과 브레이커 설정."""
+    stats = client.nodes.stats(metric="os,jvm")
+    nodes = list(stats.get("nodes", {}).values())
+    node_memory = min(node["os"]["mem"]["total_in_bytes"] for node in nodes)
+    heap = max(node["jvm"]["mem"]["heap_max_in_bytes"] for node in nodes)
+
+    settings = client.cluster.get_settings(include_defaults=True, flat_settings=True)
+    raw_limit = DEFAULT_BREAKER_LIMIT
+    for scope in ("transient", "persistent", "defaults"):
+        if "knn.memory.circuit_breaker.limit" in settings.get(scope, {}):
+            raw_limit = settings[scope]["knn.memory.circuit_breaker.limit"]
+            break
+    return {"node_memory_bytes": node_memory, "heap_bytes": heap,
+            "breaker_limit": parse_breaker_limit(raw_limit, node_memory, heap), "nodes": len(nodes)}
+
+
+def offline_indices(m: int = DEFAULT_M, encoding: str = "fp32", dimension: Optional[int] = None) -> List[Dict]:
+    """
+    클러스터 없이 로컬 파일로 추정: 메모리 매핑 벡터 저장소(.npy)가 있으면 그 문서 수/차원,
+    없으면 임베딩 메타데이터의 차원과 업로드 스크립트 기준 문서 수(레시피 1136, 재료 약 500).
+    """
+    import numpy as np
+
+    from app.services.embedding_providers import read_embedding_metadata
+
+    targets = [
+        (config.RECIPE_INDEX, config.RECIPE_VECTORS_FILE, config.RECIPE_EMBEDDINGS_FILE, 1136),
+        (config.INGREDIENT_INDEX, config.INGREDIENT_VECTORS_FILE, config.INGREDIENT_EMBEDDINGS_FILE, 500),
+    ]
+    indices = []
+    for name, vectors_file, embeddings_file, default_docs in targets:
+        if os.path.exists(vectors_file):
+            doc_count, dim = np.load(vectors_file, mmap_mode="r").shape
+            source = vectors_file
+        else:
+            doc_count, dim = default_docs, read_embedding_metadata(embeddings_file)["dimension"]
+            source = "기본값"
+        indices.append({"index": name, "doc_count": int(doc_count), "dimension": int(dimension or dim), "m": m,
+                        "engine": "nmslib" if encoding == "fp32" else "faiss", "encoding": encoding,
+                        "replicas": 0, "source": source})
+    return indices
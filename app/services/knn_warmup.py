@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core import config
+from app.core.metrics import observe
+from app.services.search_queries import knn_query
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# k-NN 그래프 워밍업 + 준비 상태 판정
+# ============================================================================
+# HNSW 그래프는 첫 질의 때 세그먼트별로 네이티브 메모리에 올라가므로 재시작 직후 첫 k-NN 검색이 느립니다.
+# 워밍업 API로 그래프를 미리 올리고, 합성 질의를 반복해 p95가 기준 아래로 내려온 뒤에야 준비 완료로 봅니다.
+
+
+def knn_memory_stats(client) -> Dict:
+    """_plugins/_knn/stats를 노드 합계로 요약합니다 (graph_memory_kb는 KB, 인덱스별 그래프 메모리 포함)."""
+    stats = client.plugins.knn.stats()
+    summary = {"graph_memory_kb": 0, "graph_memory_percent": 0.0, "cache_capacity_reached": False,
+               "eviction_count": 0, "hit_count": 0, "miss_count": 0,
+               "circuit_breaker_triggered": bool(stats.get("circuit_breaker_triggered")), "indices": {}}
+    for node in stats.get("nodes", {}).values():
+        summary["graph_memory_kb"] += node.get("graph_memory_usage", 0)
+        summary["graph_memory_percent"] = max(summary["graph_memory_percent"],
+                                              float(node.get("graph_memory_usage_percentage", 0.0)))
+        summary["cache_capacity_reached"] |= bool(node.get("cache_capacity_reached"))
+        summary["eviction_count"] += node.get("eviction_count", 0)
+        summary["hit_count"] += node.get("hit_count", 0)
+        summary["miss_count"] += node.get("miss_count", 0)
+        for index, usage in node.get("indices_in_cache", {}).items():
+            merged = summary["indices"].setdefault(index, {"graph_memory_kb": 0, "graph_count": 0})
+            merged["graph_memory_kb"] += usage.get("graph_memory_usage", 0)
+            merged["graph_count"] += usage.get("graph_count", 0)
+    return summary
+
+
+def synthetic_vectors(dimension: int, n: int, seed: int = 42, store=None) -> np.ndarray:
+    """
+    준비 상태 확인용 질의 벡터. 로컬 벡터 저장소가 있으면 실제 문서 벡터를 뽑고
+    없으면 정규분포 난수 벡터를 씁니다 (HNSW 탐색 경로만 데우면 되므로 충분).
+    """
+    rng = np.random.default_rng(seed)
+    if store is not None and len(store) and store.dimension == dimension:
+        rows = rng.choice(len(store), size=min(n, len(store)), replace=False)
+        return np.asarray(store.matrix[np.sort(rows)], dtype=np.float32)
+    return rng.standard_normal((n, dimension)).astype(np.float32)
+
+
+def index_dimension(client, index: str) -> int:
+    mapping = client.indices.get_mapping(index=index)
+    return int(next(iter(mapping.values()))["mappings"]["properties"]["embedding"]["dimension"])
+
+
+def probe_latencies(client, index: str, vectors: np.ndarray, k: int = 10) -> List[float]:
+    """k-NN 검색을 하나씩 보내 지연(초)을 잽니다 (응답 본문은 최소화)."""
+    latencies = []
+    for vector in vectors:
+        body = knn_query(vector, k=k)
+        body["_source"] = False
+        start = time.perf_counter()
+        client.search(index=index, body=body, filter_path=["hits.total"])
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def warmup_index(client, index: str, store=None,
+                 p95_threshold_ms: float = config.KNN_READY_P95_MS,
+                 queries: int = config.KNN_WARMUP_QUERIES,
+                 max_rounds: int = config.KNN_WARMUP_MAX_ROUNDS) -> Dict:
+    """
+    워밍업 API 호출 → 합성 질의 라운드를 p95 < p95_threshold_ms가 될 때까지 반복 (최대 max_rounds).
+    반환: 워밍업/전체 소요 시간, 라운드별 p95, 준비 여부, 인덱스 그래프 메모리.
+    """
+    start = time.perf_counter()
+    client.plugins.knn.warmup(index=index, request_timeout=config.OPENSEARCH_BULK_TIMEOUT)
+    warmup_seconds = time.perf_counter() - start
+    observe("knn_warmup", warmup_seconds, index=index)
+
+    vectors = synthetic_vectors(index_dimension(client, index), queries, store=store)
+    rounds = []
+    for _ in range(max_rounds):
+        latencies = probe_latencies(client, index, vectors)
+        rounds.append(round(float(np.percentile(latencies, 95)) * 1000, 2))
+        if rounds[-1] < p95_threshold_ms:
+            break
+
+    memory = knn_memory_stats(client)
+    report = {
+        "index": index,
+        "warmup_seconds": round(warmup_seconds, 3),
+        "total_seconds": round(time.perf_counter() - start, 3),
+        "p95_ms_by_round": rounds,
+        "p95_threshold_ms": p95_threshold_ms,
+        "ready": bool(rounds) and rounds[-1] < p95_threshold_ms,
+        "graph_memory_kb": memory["indices"].get(index, {}).get("graph_memory_kb", 0),
+        "node_graph_memory_kb": memory["graph_memory_kb"],
+    }
+    logger.info("k-NN 워밍업 %s: %.2fs, p95 %s ms, 그래프 메모리 %d KB, 준비 %s", index, report["total_seconds"],
+                rounds, report["graph_memory_kb"], report["ready"])
+    return report
+
+
+def format_report(report: Dict) -> str:
+    rounds = " → ".join(f"{p95}" for p95 in report["p95_ms_by_round"])
+    return (f"{report['index']}: 워밍업 {report['warmup_seconds']}초, 전체 {report['total_seconds']}초, "
+            f"p95 {rounds} ms (기준 {report['p95_threshold_ms']} ms), "
+            f"그래프 메모리 {report['graph_memory_kb'] / 1024:.1f} MB")
+
+
+def warmup_indices(client, indices: Sequence[str], stores: Optional[Dict] = None, **kwargs) -> List[Dict]:
+    return [warmup_index(client, index, store=(stores or {}).get(index), **kwargs) for index in indices]
+
+
+class KnnReadiness:
+    """
+    API 서버의 준비 상태. 시작 시 백그라운드 스레드에서 워밍업을 돌리고
+    모든 인덱스의 p95가 기준 아래로 내려오면 ready가 됩니다 (/ready가 이 값을 보고 200/503).
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.reports: List[Dict] = []
+        self.error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def mark_ready(self):
+        self.ready = True
+
+    def start(self, client, indices: Sequence[str], stores: Optional[Dict] = None,
+              retry_seconds: float = config.KNN_WARMUP_RETRY_SECONDS, **kwargs):
+        def run():
+            # 클러스터가 아직 뜨는 중이거나 p95가 기준보다 높으면 잠시 뒤 다시 시도
+            while not self.ready:
+                try:
+                    self.reports = warmup_indices(client, indices, stores, **kwargs)
+                    self.ready = all(report["ready"] for report in self.reports)
+                    self.error = None if self.ready else "p95가 준비 기준보다 높습니다"
+                except Exception as e:
+                    logger.warning("k-NN 워밍업 실패: %s", e)
+                    self.error = str(e)
+                if not self.ready:
+                    time.sleep(retry_seconds)
+
+        self._thread = threading.Thread(target=run, name="knn-warmup", daemon=True)
+        self._thread.start()
+
+    def status(self) -> Dict:
+        return {"ready": self.ready, "error": self.error, "indices": self.reports}
@@ -0,0 +1,220 @@
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 한 번에 계산할 질의 행 수 (블록 크기 x 전체 문서 수만큼의 점수 행렬만 메모리에 올라감)
+DEFAULT_BLOCK_SIZE = 256
+
+
+def row_fingerprints(matrix: np.ndarray) -> np.ndarray:
+    """행마다 벡터 바이트의 해시를 계산해 변경된 임베딩을 찾는 데 사용합니다."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=8).digest(), 'little') for row in matrix],
+        dtype=np.uint64,
+    )
+
+
+def _topk_rows(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """점수 행렬의 행별 상위 k개 (열 번호, 점수)를 내림차순으로 반환합니다."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int32), empty.astype(np.float32)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def compute_topk(
+    matrix: np.ndarray,
+    k: int,
+    rows: Optional[Sequence[int]] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    정규화된 행렬에서 지정한 행들의 자기 자신을 제외한 상위 k 이웃을 계산합니다.
+    block_size 행씩 나누어 곱하므로 최대 메모리는 block_size x N 점수 행렬입니다.
+    """
+    rows = np.arange(len(matrix)) if rows is None else np.asarray(rows, dtype=np.int64)
+    k = min(k, len(matrix) - 1)
+    indices = np.empty((len(rows), max(k, 0)), dtype=np.int32)
+    scores = np.empty((len(rows), max(k, 0)), dtype=np.float32)
+
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start:start + block_size]
+        block_scores = matrix[block_rows] @ matrix.T
+        # 자기 자신은 이웃에서 제외
+        block_scores[np.arange(len(block_rows)), block_rows] = -np.inf
+        top, top_scores = _topk_rows(block_scores, k)
+        indices[start:start + len(block_rows)] = top
+        scores[start:start + len(block_rows)] = top_scores
+
+    return indices, scores
+
+
+class NeighborGraph:
+    """
+    문서별 최근접 이웃을 CSR 형태(indptr/indices/scores)로 보관합니다.
+    문서 ID로 이웃 목록을 O(1)에 조회할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        scores: np.ndarray,
+        fingerprints: np.ndarray,
+        k: int,
+    ):
+        self.ids = np.asarray(ids, dtype=str)
+        self.indptr = np.asarray(indptr, dtype=np.int32)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float32)
+        self.fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        self.k = k
+        self.id_to_row: Dict[str, int] = {doc_id: row for row, doc_id in enumerate(self.ids.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_dense(cls, ids, indices, scores, fingerprints, k) -> "NeighborGraph":
+        """행별 이웃 배열(리스트 또는 2차원 배열)을 CSR로 압축합니다."""
+        lengths = np.array([len(row) for row in indices], dtype=np.int32)
+        indptr = np.zeros(len(lengths) + 1, dtype=np.int32)
+        np.cumsum(lengths, out=indptr[1:])
+        flat_indices = np.concatenate([np.asarray(row, dtype=np.int32) for row in indices]) if len(indices) else []
+        flat_scores = np.concatenate([np.asarray(row, dtype=np.float32) for row in scores]) if len(scores) else []
+        return cls(ids, indptr, flat_indices, flat_scores, fingerprints, k)
+
+    @classmethod
+    def build(cls, ids: Sequence[str], matrix: np.ndarray, k: int,
+              block_size: int = DEFAULT_BLOCK_SIZE) -> "NeighborGraph":
+        """전체 행렬에서 이웃 그래프를 새로 만듭니다."""
+        indices, scores = compute_topk(matrix, k, block_size=block_size)
+        return cls.from_dense(ids, indices, scores, row_fingerprints(matrix), k)
+
+    def row_neighbors(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.indices[start:end], self.scores[start:end]
+
+    def neighbors(self, doc_id: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """문서 ID의 이웃을 (문서 ID, 코사인 유사도) 목록으로 반환합니다."""
+        row = self.id_to_row.get(str(doc_id))
+        if row is None:
+            return []
+        indices, scores = self.row_neighbors(row)
+        if limit is not None:
+            indices, scores = indices[:limit], scores[:limit]
+        return [(str(self.ids[i]), float(s)) for i, s in zip(indices, scores)]
+
+    # ========================================================================
+    # 증분 갱신
+    # ========================================================================
+
+    def update(self, ids: Sequence[str], matrix: np.ndarray,
+               block_size: int = DEFAULT_BLOCK_SIZE) -> Tuple["NeighborGraph", int]:
+        """
+        바뀐 임베딩만 다시 계산한 새 그래프와 전체 재계산한 행 수를 반환합니다.
+
+        변경/추가된 행은 전체 이웃을 다시 구합니다. 나머지 행은 변경된 행들과의
+        점수만 계산해 기존 목록과 병합하되, 기존 이웃이 변경되면서 k번째 점수 아래로
+        떨어졌거나 삭제된 경우에는 밖에 있던 문서가 올라올 수 있으므로 전체 재계산합니다.
+        """
+        ids = [str(doc_id) for doc_id in ids]
+        fingerprints = row_fingerprints(matrix)
+        k = min(self.k, len(ids) - 1)
+
+        old_rows = np.array([self.id_to_row.get(doc_id, -1) for doc_id in ids], dtype=np.int64)
+        changed = (old_rows < 0) | (self.fingerprints[np.maximum(old_rows, 0)] != fingerprints)
+        changed_rows = np.flatnonzero(changed)
+        kept_rows = np.flatnonzero(~changed)
+
+        # 이전 행 번호 -> 새 행 번호 (삭제된 문서는 -1)
+        old_to_new = np.full(len(self), -1, dtype=np.int64)
+        old_to_new[old_rows[old_rows >= 0]] = np.flatnonzero(old_rows >= 0)
+
+        new_indices: List[Optional[np.ndarray]] = [None] * len(ids)
+        new_scores: List[Optional[np.ndarray]] = [None] * len(ids)
+        recompute = set(changed_rows.tolist())
+
+        if len(changed_rows) and len(kept_rows):
+            for start in range(0, len(kept_rows), block_size):
+                block = kept_rows[start:start + block_size]
+                block_scores = matrix[block] @ matrix[changed_rows].T
+
+                for offset, row in enumerate(block):
+                    old_idx, old_scores = self.row_neighbors(old_rows[row])
+                    mapped = old_to_new[old_idx]
+                    kth_score = old_scores[-1] if len(old_scores) else -np.inf
+                    stale = (mapped < 0) | np.isin(mapped, changed_rows)
+
+                    if np.any(mapped < 0) or len(old_idx) < k:
+                        recompute.add(int(row))
+                        continue
+                    if np.any(stale):
+                        pos = np.searchsorted(changed_rows, mapped[stale])
+                        if np.any(block_scores[offset, pos] < kth_score):
+                            recompute.add(int(row))
+                            continue
+
+                    keep = ~stale
+                    cand_idx = np.concatenate([mapped[keep], changed_rows])
+                    cand_scores = np.concatenate([old_scores[keep], block_scores[offset]])
+                    self_mask = cand_idx != row
+                    cand_idx, cand_scores = cand_idx[self_mask], cand_scores[self_mask]
+                    order = np.argsort(-cand_scores, kind='stable')[:k]
+                    new_indices[row] = cand_idx[order].astype(np.int32)
+                    new_scores[row] = cand_scores[order].astype(np.float32)
+        elif len(kept_rows):
+            # 임베딩 변경 없음: 삭제된 문서만 반영
+            for row in kept_rows:
+                old_idx, old_scores = self.row_neighbors(old_rows[row])
+                mapped = old_to_new[old_idx]
+                if np.any(mapped < 0) or len(old_idx) < k:
+                    recompute.add(int(row))
+                    continue
+                new_indices[row] = mapped[:k].astype(np.int32)
+                new_scores[row] = old_scores[:k]
+
+        recompute_rows = sorted(recompute)
+        if recompute_rows:
+            indices, scores = compute_topk(matrix, k, rows=recompute_rows, block_size=block_size)
+            for i, row in enumerate(recompute_rows):
+                new_indices[row] = indices[i]
+                new_scores[row] = scores[i]
+
+        graph = NeighborGraph.from_dense(ids, new_indices, new_scores, fingerprints, self.k)
+        return graph, len(recompute_rows)
+
+    # ========================================================================
+    # 저장 / 로드
+    # ========================================================================
+
+    def save(self, path: str):
+        """npz 파일로 저장합니다."""
+        np.savez(
+            path,
+            ids=self.ids,
+            indptr=self.indptr,
+            indices=self.indices,
+            scores=self.scores,
+            fingerprints=self.fingerprints,
+            k=np.array([self.k], dtype=np.int32),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "NeighborGraph":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data['ids'],
+                data['indptr'],
+                data['indices'],
+                data['scores'],
+                data['fingerprints'],
+                int(data['k'][0]),
+            )
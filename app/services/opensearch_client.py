@@ -0,0 +1,86 @@
+import gzip
+from functools import lru_cache
+from typing import List, Optional
+
+from opensearchpy import OpenSearch, Urllib3HttpConnection
+
+from app.core import config
+from app.core.serialization import FastJSONSerializer
+
+# ============================================================================
+# 용도별 OpenSearch 클라이언트 프로필
+# ============================================================================
+# bulk: 대량 색인. 벡터 본문이 크고 잘 압축되므로 gzip 요청/응답, 긴 타임아웃, 429·5xx 재시도
+# search: 저지연 검색. 짧은 타임아웃, 재시도 1회(여러 호스트면 다른 노드로), 큰 연결 풀로 keep-alive 유지
+# 여러 호스트(OPENSEARCH_HOSTS)를 주면 연결 풀이 라운드 로빈으로 나눠 보내고 실패한 노드는 잠시 제외합니다.
+
+PROFILES = {
+    "bulk": {
+        "http_compress": True,
+        "timeout": config.OPENSEARCH_BULK_TIMEOUT,
+        "max_retries": 10,
+        "retry_on_timeout": True,
+        "retry_on_status": (429, 502, 503, 504),
+        "pool_maxsize": config.OPENSEARCH_BULK_POOL_SIZE,
+    },
+    "search": {
+        "http_compress": config.OPENSEARCH_SEARCH_COMPRESS,
+        "timeout": config.OPENSEARCH_SEARCH_TIMEOUT,
+        "max_retries": 1,
+        "retry_on_timeout": True,
+        "pool_maxsize": config.OPENSEARCH_SEARCH_POOL_SIZE,
+        # 실패한 노드를 오래 빼두지 않음 (검색 노드가 적으므로)
+        "dead_timeout": 10,
+    },
+}
+
+
+class LeveledGzipConnection(Urllib3HttpConnection):
+    """
+    요청 본문 gzip 압축 수준을 지정할 수 있는 연결.
+    기본 구현은 수준 9로 압축해 큰 bulk 본문에서 CPU 시간이 크게 늘지만,
+    부동소수점 텍스트는 수준 1에서도 압축률 차이가 작습니다 (benchmarks/bench_client_profiles.py).
+    """
+
+    compress_level = config.OPENSEARCH_COMPRESS_LEVEL
+
+    def _gzip_compress(self, body) -> bytes:
+        return gzip.compress(body, compresslevel=self.compress_level)
+
+
+def parse_hosts(value: str = config.OPENSEARCH_HOSTS) -> List[dict]:
+    """'host1:9200,host2:9200' 형식을 클라이언트 hosts 목록으로 바꿉니다."""
+    hosts = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.rpartition(":") if ":" in item else (item, "", str(config.OPENSEARCH_PORT))
+        hosts.append({"host": host, "port": int(port)})
+    return hosts
+
+
+def create_client(profile: str = "search", hosts: Optional[List[dict]] = None, **overrides) -> OpenSearch:
+    """프로필 설정으로 새 클라이언트를 만듭니다. overrides로 개별 설정을 덮어쓸 수 있습니다."""
+    if profile not in PROFILES:
+        raise ValueError(f"알 수 없는 클라이언트 프로필: {profile} (사용 가능: {', '.join(PROFILES)})")
+
+    options = dict(PROFILES[profile])
+    options.update(overrides)
+    if config.OPENSEARCH_USERNAME and config.OPENSEARCH_PASSWORD:
+        options.setdefault("http_auth", (config.OPENSEARCH_USERNAME, config.OPENSEARCH_PASSWORD))
+    return OpenSearch(
+        hosts=hosts or parse_hosts(),
+        use_ssl=config.OPENSEARCH_USE_SSL,
+        verify_certs=False,
+        ssl_show_warn=False,
+        connection_class=LeveledGzipConnection,
+        serializer=FastJSONSerializer(),
+        **options,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_client(profile: str = "search") -> OpenSearch:
+    """프로세스에서 프로필별로 하나씩 공유하는 클라이언트 (연결 풀 재사용)."""
+    return create_client(profile)
@@ -0,0 +1,291 @@
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core import config
+from app.core.metrics import increment, span
+from app.models.schemas import RecipeScore, RecommendationRequest, RecommendationResponse
+from app.services.affinity_matrix import AffinityMatrix, split_ingredients
+from app.services.embedding_service import embed_texts
+from app.services.hedging import HedgedBackend
+from app.services.neighbor_graph import NeighborGraph
+from app.services.search_queries import MSEARCH_FILTER_PATH, RECIPE_LIST_FIELDS, knn_query, with_source
+from app.services.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendationService:
+    """
+    재료 목록 기반 레시피 추천 서비스.
+    단건 요청도 배치 경로를 그대로 사용하므로 두 경로의 결과는 항상 같습니다.
+    """
+
+    def __init__(
+        self,
+        recipe_store: VectorStore,
+        ingredient_store: Optional[VectorStore] = None,
+        backend: str = "local",
+        opensearch_client=None,
+        recipe_neighbors: Optional[NeighborGraph] = None,
+        affinity: Optional[AffinityMatrix] = None,
+        hedge: Optional[HedgedBackend] = None,
+    ):
+        if backend == "opensearch" and opensearch_client is None:
+            raise ValueError("opensearch 백엔드에는 opensearch_client가 필요합니다")
+        if ingredient_store is not None and ingredient_store.dimension != recipe_store.dimension:
+            raise ValueError(f"재료 벡터 차원({ingredient_store.dimension})이 "
+                             f"레시피 벡터 차원({recipe_store.dimension})과 다릅니다")
+
+        self.recipe_store = recipe_store
+        self.ingredient_store = ingredient_store
+        self.backend = backend
+        self.opensearch_client = opensearch_client
+        self.recipe_neighbors = recipe_neighbors
+        self.affinity = affinity
+        self.hedge = hedge
+        self._ingredient_lookup = self._build_ingredient_lookup(ingredient_store)
+
+    @staticmethod
+    def _build_ingredient_lookup(ingredient_store: Optional[VectorStore]) -> Dict[str, int]:
+        """재료명과 동의어를 재료 저장소의 행 번호로 매핑합니다."""
+        lookup: Dict[str, int] = {}
+        if ingredient_store is None:
+            return lookup
+
+        for row, doc in enumerate(ingredient_store.docs):
+            aliases = doc.get('aliases', [])
+            if isinstance(aliases, str):
+                aliases = aliases.split()
+            for alias in aliases:
+                lookup.setdefault(alias, row)
+        # 표준 재료명이 동의어보다 우선
+        for row, doc in enumerate(ingredient_store.docs):
+            lookup[doc['name']] = row
+        return lookup
+
+    # ========================================================================
+    # 질의 벡터 생성
+    # ========================================================================
+
+    def _build_query_vectors(self, requests: List[RecommendationRequest]) -> np.ndarray:
+        """
+        요청별 질의 벡터를 만듭니다.
+        저장소에 있는 재료는 저장된 벡터를 재사용하고, 찾지 못한 재료명만 모아
+        중복을 제거한 뒤 한 번에 임베딩합니다.
+        """
+        unresolved: List[str] = []
+        seen = set()
+        for request in requests:
+            for name in request.ingredients:
+                if name not in self._ingredient_lookup and name not in seen:
+                    seen.add(name)
+                    unresolved.append(name)
+
+        embedded: Dict[str, np.ndarray] = {}
+        if unresolved:
+            logger.info("미등록 재료 %s개 일괄 임베딩", len(unresolved))
+            # 저장된 재료 벡터 대신 쓰이므로 재료 인덱스의 제공자로 임베딩
+            vectors = np.asarray(embed_texts(unresolved, config.INGREDIENT_INDEX), dtype=np.float32)
+            if vectors.shape[1] != self.recipe_store.dimension:
+                raise ValueError(f"재료 임베딩 차원({vectors.shape[1]})이 "
+                                 f"레시피 벡터 차원({self.recipe_store.dimension})과 다릅니다")
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            embedded = dict(zip(unresolved, vectors))
+
+        queries = np.zeros((len(requests), self.recipe_store.dimension), dtype=np.float32)
+        for i, request in enumerate(requests):
+            for name in request.ingredients:
+                row = self._ingredient_lookup.get(name)
+                if row is not None:
+                    queries[i] += self.ingredient_store.matrix[row]
+                else:
+                    queries[i] += embedded[name]
+        return queries
+
+    # ========================================================================
+    # 백엔드별 검색
+    # ========================================================================
+
+    def _search_local(self, queries: np.ndarray, k: int) -> List[List[RecipeScore]]:
+        """레시피 행렬과 한 번의 행렬-행렬 곱으로 전체 요청을 검색합니다."""
+        with span("vector_search", backend="local"):
+            results = self.recipe_store.search_batch(queries, k)
+        return [
+            [self._to_recipe_score(self.recipe_store.docs[row], score) for row, score in hits]
+            for hits in results
+        ]
+
+    def _search_affinity(self, rows: List[int], k: int) -> List[RecipeScore]:
+        """친화도 행렬의 재료 행들을 합산해 상위 k개 레시피를 반환합니다."""
+        with span("vector_search", backend="affinity"):
+            top = self.affinity.recommend(rows, k)
+        recipes = []
+        for recipe_row, score in top:
+            store_row = self.recipe_store.id_to_row.get(str(self.affinity.recipe_ids[recipe_row]))
+            if store_row is not None:
+                recipes.append(self._to_recipe_score(self.recipe_store.docs[store_row], score))
+        return recipes
+
+    def _search_opensearch(self, queries: np.ndarray, limits: List[int]) -> List[List[RecipeScore]]:
+        """_msearch 한 번으로 모든 요청의 k-NN 검색을 보냅니다."""
+        body = []
+        for vector, limit in zip(queries, limits):
+            body.append({"index": config.RECIPE_INDEX})
+            body.append(with_source(knn_query(vector.tolist(), k=limit), includes=RECIPE_LIST_FIELDS))
+
+        with span("opensearch_msearch", index=config.RECIPE_INDEX):
+            response = self.opensearch_client.msearch(body=body, filter_path=MSEARCH_FILTER_PATH)
+
+        results = []
+        for item in response["responses"]:
+            item.setdefault("hits", {}).setdefault("hits", [])
+            if "error" in item:
+                logger.warning("_msearch 하위 요청 실패: %s", item["error"])
+                results.append([])
+                continue
+            results.append([
+                self._to_recipe_score(hit["_source"], hit["_score"])
+                for hit in item["hits"]["hits"]
+            ])
+        return results
+
+    def _search_hedged(self, queries: np.ndarray, limits: List[int]) -> Tuple[List[List[RecipeScore]], str]:
+        """
+        opensearch 백엔드 검색. hedge가 있으면 마감 시간 안에 답이 없거나 브레이커가 열려 있을 때
+        같은 질의를 로컬 행렬 검색으로 처리하고, 응답한 백엔드 이름을 함께 반환합니다.
+        """
+        if self.hedge is None:
+            return self._search_opensearch(queries, limits), "opensearch"
+        results, backend, _ = self.hedge.run(
+            lambda: self._search_opensearch(queries, limits),
+            lambda: self._search_local(queries, max(limits)),
+        )
+        return results, backend
+
+    @staticmethod
+    def _to_recipe_score(doc: dict, score: float) -> RecipeScore:
+        return RecipeScore(
+            recipe_id=str(doc.get('recipe_id')),
+            name=doc.get('name', ''),
+            score=float(score),
+            match_reason="",
+            ingredients=split_ingredients(doc.get('ingredients')),
+            cooking_method=doc.get('cooking_method'),
+            category=doc.get('category'),
+        )
+
+    # ========================================================================
+    # 공개 API
+    # ========================================================================
+
+    def recommend_batch(self, requests: List[RecommendationRequest]) -> List[RecommendationResponse]:
+        """여러 추천 요청을 한 번에 처리하고 입력 순서대로 결과를 반환합니다."""
+        start_time = time.time()
+        if not requests:
+            return []
+
+        results: List[Optional[List[RecipeScore]]] = [None] * len(requests)
+        backends: List[str] = [self.backend] * len(requests)
+
+        # 모든 재료가 친화도 행렬에 있으면 희소 행 합으로 바로 처리
+        if self.affinity is not None:
+            for i, request in enumerate(requests):
+                rows = self.affinity.resolve(request.ingredients) if request.ingredients else None
+                if rows is not None:
+                    results[i] = self._search_affinity(rows, request.limit)
+                    backends[i] = "affinity"
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending:
+            pending_requests = [requests[i] for i in pending]
+            with span("query_vectors"):
+                queries = self._build_query_vectors(pending_requests)
+            limits = [request.limit for request in pending_requests]
+
+            if self.backend == "opensearch":
+                searched, answered = self._search_hedged(queries, limits)
+            else:
+                searched, answered = self._search_local(queries, max(limits)), "local"
+            for i, recipes in zip(pending, searched):
+                results[i] = recipes
+                backends[i] = answered
+
+        processing_time = time.time() - start_time
+        responses = []
+        for request, recipes, backend in zip(requests, results, backends):
+            increment("recommendation_backend", backend=backend)
+            recipes = recipes[:request.limit]
+            requested = set(request.ingredients)
+            for recipe in recipes:
+                matched = [name for name in recipe.ingredients if name in requested]
+                recipe.match_reason = (
+                    f"재료 일치: {', '.join(matched)}" if matched else "임베딩 유사도"
+                )
+            responses.append(RecommendationResponse(
+                recipes=recipes,
+                total_matches=len(recipes),
+                processing_time=processing_time,
+                user_id=request.user_id,
+                backend=backend,
+            ))
+        return responses
+
+    def recommend(self, request: RecommendationRequest) -> RecommendationResponse:
+        """단건 추천 요청을 처리합니다."""
+        return self.recommend_batch([request])[0]
+
+    def similar_recipes(self, recipe_id: str, limit: int = 10) -> Optional[RecommendationResponse]:
+        """
+        주어진 레시피와 비슷한 레시피를 반환합니다.
+        사전 계산된 이웃 그래프에 충분한 이웃이 있으면 조회만 하고, 없으면 행렬 검색으로 대체합니다.
+        """
+        start_time = time.time()
+        vector = self.recipe_store.get_vector(recipe_id)
+        if vector is None:
+            return None
+
+        if self.recipe_neighbors is not None and self.recipe_neighbors.k >= limit:
+            hits = self.recipe_neighbors.neighbors(recipe_id, limit)
+            backend = "neighbors"
+        else:
+            backend = "local"
+            # 자기 자신이 1위로 나오므로 하나 더 검색
+            rows = self.recipe_store.search_batch(vector[None, :], limit + 1)[0]
+            hits = [(self.recipe_store.ids[row], score) for row, score in rows]
+            hits = [(doc_id, score) for doc_id, score in hits if doc_id != str(recipe_id)][:limit]
+
+        increment("recommendation_backend", backend=backend)
+        recipes = []
+        for doc_id, score in hits:
+            row = self.recipe_store.id_to_row.get(doc_id)
+            if row is None:
+                continue
+            recipe = self._to_recipe_score(self.recipe_store.docs[row], score)
+            recipe.match_reason = "유사 레시피"
+            recipes.append(recipe)
+
+        return RecommendationResponse(
+            recipes=recipes,
+            total_matches=len(recipes),
+            processing_time=time.time() - start_time,
+            backend=backend,
+        )
+
+    def recipes_for_ingredient(self, ingredient_id: str, limit: int = 10) -> Optional[RecommendationResponse]:
+        """
+        재료 ID(또는 재료명/동의어)로 그 재료가 들어가기 좋은 레시피를 반환합니다.
+        저장된 재료 벡터를 그대로 질의로 쓰므로 임베딩 호출도, 호출자와의 벡터 왕복도 없습니다.
+        """
+        if self.ingredient_store is None:
+            return None
+        row = self.ingredient_store.id_to_row.get(str(ingredient_id))
+        if row is None:
+            row = self._ingredient_lookup.get(ingredient_id)
+        if row is None:
+            return None
+
+        name = self.ingredient_store.docs[row]['name']
+        return self.recommend(RecommendationRequest(ingredients=[name], limit=limit, user_id=None))
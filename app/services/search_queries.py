@@ -0,0 +1,266 @@
+import copy
+import math
+from typing import List, Optional, Sequence
+
+from app.core.metrics import span
+
+# ============================================================================
+# 용도별 반환 필드
+# ============================================================================
+# embedding(1536 floats)과 embedding_text는 히트당 약 30 KB의 JSON이므로
+# 명시적으로 요청하지 않는 한 응답에서 제외합니다.
+
+HEAVY_FIELDS = ["embedding", "embedding_text"]
+
+RECIPE_LIST_FIELDS = ["recipe_id", "name", "ingredients", "category", "cooking_method", "hashtag"]
+INGREDIENT_LIST_FIELDS = ["ingredient_id", "name", "aliases", "category"]
+
+# 응답 본문에서 검색 결과 외의 메타데이터(_shards, took 등)를 제거
+HITS_FILTER_PATH = [
+    "hits.total",
+    "hits.hits._id",
+    "hits.hits._score",
+    "hits.hits._source",
+    "hits.hits.fields",
+]
+MSEARCH_FILTER_PATH = ["responses." + path for path in HITS_FILTER_PATH] + ["responses.error"]
+
+# ============================================================================
+# 벡터 공간
+# ============================================================================
+# 저장 벡터는 업로드 시 한 번 L2 정규화하므로 내적이 곧 코사인 유사도입니다.
+# cosinesimil은 비교할 때마다 두 벡터의 노름을 다시 계산하므로 innerproduct를 사용하고,
+# 질의 벡터는 아래 쿼리 생성 함수에서 항상 정규화합니다.
+
+VECTOR_SPACE_TYPE = "innerproduct"
+
+# 인덱스 매핑의 _meta에 기록해 정규화된 벡터가 저장된 인덱스인지 확인할 수 있게 함
+EMBEDDING_INDEX_META = {"embedding_normalized": True, "space_type": VECTOR_SPACE_TYPE}
+
+
+def normalize_vector(vector: Sequence[float]) -> List[float]:
+    """L2 정규화한 벡터를 float 리스트로 반환합니다. 노름이 0이면 그대로 둡니다."""
+    values = [float(x) for x in vector]
+    norm = math.sqrt(sum(x * x for x in values))
+    return [x / norm for x in values] if norm > 0 else values
+
+
+def is_normalized_index(client, index: str) -> bool:
+    """인덱스 매핑 _meta에 정규화 벡터 저장 여부가 기록되어 있는지 확인합니다."""
+    mapping = client.indices.get_mapping(index=index)
+    meta = next(iter(mapping.values()), {}).get("mappings", {}).get("_meta", {})
+    return bool(meta.get("embedding_normalized")) and meta.get("space_type") == VECTOR_SPACE_TYPE
+
+
+def source_filter(includes: Optional[Sequence[str]] = None,
+                  excludes: Optional[Sequence[str]] = HEAVY_FIELDS) -> dict:
+    """_source includes/excludes 설정을 만듭니다."""
+    source = {}
+    if includes:
+        source["includes"] = list(includes)
+    if excludes:
+        source["excludes"] = [field for field in excludes if not includes or field not in includes]
+    return source
+
+
+def with_source(body: dict, includes: Optional[Sequence[str]] = None,
+                excludes: Optional[Sequence[str]] = HEAVY_FIELDS) -> dict:
+    """검색 본문에 _source 필터를 추가한 사본을 반환합니다."""
+    body = dict(body)
+    body["_source"] = source_filter(includes, excludes)
+    return body
+
+
+def search(client, index: str, body: dict, includes: Optional[Sequence[str]] = None,
+           excludes: Optional[Sequence[str]] = HEAVY_FIELDS, **kwargs) -> dict:
+    """
+    필요한 필드만 요청하는 검색.
+    includes를 지정하지 않아도 HEAVY_FIELDS는 기본으로 제외됩니다.
+    """
+    kwargs.setdefault("filter_path", HITS_FILTER_PATH)
+    with span("opensearch_search", index=index):
+        response = client.search(index=index, body=with_source(body, includes, excludes), **kwargs)
+    # filter_path로 hits가 비면 키 자체가 빠지므로 호출자가 항상 같은 구조를 보도록 보정
+    response.setdefault("hits", {}).setdefault("hits", [])
+    return response
+
+
+def resolve_ingredient_ids(client, index: str, names: Sequence[str]) -> List[Optional[str]]:
+    """
+    재료명 목록을 재료 인덱스의 ID로 바꿉니다 (_msearch 한 번, 이름이 정확히 같은 첫 결과).
+    찾지 못한 재료는 None입니다.
+    """
+    body = []
+    for name in names:
+        body.append({"index": index})
+        body.append(with_source(match_query("name", name, size=5), includes=["name"]))
+    response = client.msearch(body=body, filter_path=["responses.hits.hits._id", "responses.hits.hits._source"])
+
+    ids = []
+    for name, item in zip(names, response.get("responses", [])):
+        hits = item.get("hits", {}).get("hits", [])
+        ids.append(next((hit["_id"] for hit in hits if hit.get("_source", {}).get("name") == name), None))
+    return ids
+
+
+# ============================================================================
+# 쿼리 본문 생성
+# ============================================================================
+
+def match_query(field: str, text: str, size: int = 10) -> dict:
+    return {"size": size, "query": {"match": {field: text}}}
+
+
+def script_score_query(vector: Sequence[float], size: int = 10, query: Optional[dict] = None) -> dict:
+    """
+    정확한(전수) 코사인 유사도 검색 본문.
+    정규화된 질의 x 정규화된 저장 벡터의 내적을 k-NN 점수 스크립트로 계산합니다
+    (점수는 내적 >= 0이면 내적 + 1, 음수면 1 / (1 - 내적)으로 순위는 코사인과 같음).
+    """
+    return {
+        "size": size,
+        "query": {
+            "script_score": {
+                "query": query or {"match_all": {}},
+                "script": {
+                    "source": "knn_score",
+                    "lang": "knn",
+                    "params": {
+                        "field": "embedding",
+                        "query_value": normalize_vector(vector),
+                        "space_type": VECTOR_SPACE_TYPE
+                    }
+                }
+            }
+        }
+    }
+
+
+def knn_query(vector: Sequence[float], k: int = 10, size: Optional[int] = None) -> dict:
+    """HNSW k-NN 검색 본문. 질의 벡터는 정규화해서 보냅니다."""
+    return {
+        "size": size or k,
+        "query": {"knn": {"embedding": {"vector": normalize_vector(vector), "k": k}}}
+    }
+
+
+def ingredient_filter_query(ingredient_ids: Sequence, size: int = 10) -> dict:
+    """
+    요청한 재료를 모두 포함하는 레시피 (ingredient_ids 정확 일치).
+    점수 없는 filter 절이라 재료별 term 결과가 노드 쿼리 캐시에 비트셋으로 남아 다음 조합에서 재사용되고,
+    재료가 적은(추가로 필요한 재료가 적은) 레시피부터 반환합니다.
+    """
+    return {
+        "size": size,
+        "query": {"bool": {"filter": [{"term": {"ingredient_ids": str(i)}} for i in ingredient_ids]}},
+        "sort": [{"ingredient_count": "asc"}, "_doc"],
+    }
+
+
+def ingredient_coverage_query(ingredient_ids: Sequence, size: int = 10, coverage: Optional[float] = None) -> dict:
+    """
+    가진 재료(ingredient_ids)로 레시피 재료를 얼마나 채우는지 기준으로 찾는 terms_set 검색.
+    coverage=None이면 레시피 재료를 전부 가진 경우만 (minimum_should_match_field=ingredient_count),
+    0~1이면 레시피 재료 수 x coverage개(최소 1개) 이상 가진 경우 (coverage 스크립트).
+    """
+    terms_set = {"terms": [str(i) for i in ingredient_ids]}
+    if coverage is None:
+        terms_set["minimum_should_match_field"] = "ingredient_count"
+    else:
+        terms_set["minimum_should_match_script"] = {
+            "source": "Math.max(1, (int) Math.ceil(doc['ingredient_count'].value * params.coverage))",
+            "params": {"coverage": float(coverage)},
+        }
+    return {"size": size, "query": {"terms_set": {"ingredient_ids": terms_set}}}
+
+
+def similar_query(vector: Sequence[float], exclude_id: str, size: int = 10, exact: bool = False) -> dict:
+    """
+    문서 exclude_id와 비슷한 문서 검색 본문 (자기 자신 제외).
+    벡터는 호출자가 로컬 저장소(VectorStore)에서 ID로 조회해 넘기므로
+    embedding을 OpenSearch에서 받아와 다시 보내는 왕복이 없습니다.
+    """
+    exclude = {"bool": {"must_not": [{"ids": {"values": [str(exclude_id)]}}]}}
+    if exact:
+        return script_score_query(vector, size=size, query=exclude)
+    # 자기 자신이 k개 안에 들어가므로 하나 더 찾은 뒤 걸러냄
+    body = knn_query(vector, k=size + 1, size=size)
+    body["query"] = {"bool": {"must": [body["query"]], "must_not": exclude["bool"]["must_not"]}}
+    return body
+
+
+# ============================================================================
+# 매핑
+# ============================================================================
+
+def with_embedding_metadata(mapping: dict, metadata: dict) -> dict:
+    """
+    임베딩 제공자 메타데이터(provider/model/dimension)에 맞춘 매핑 사본을 만듭니다.
+    embedding 필드 차원을 바꾸고 _meta에 제공자 정보를 기록합니다.
+    """
+    mapping = copy.deepcopy(mapping)
+    mapping["mappings"]["properties"]["embedding"]["dimension"] = int(metadata["dimension"])
+    meta = mapping["mappings"].setdefault("_meta", {})
+    meta.update({
+        "embedding_provider": metadata["provider"],
+        "embedding_model": metadata["model"],
+        "embedding_dimension": int(metadata["dimension"]),
+    })
+    return mapping
+
+
+def exclude_embedding_from_source(mapping: dict, fields: List[str] = None) -> dict:
+    """
+    embedding을 _source에 저장하지 않도록 매핑 사본을 만듭니다.
+    k-NN 그래프와 doc values에는 그대로 남으므로 knn/script_score 검색은 동작하지만,
+    _source로 벡터를 다시 읽거나 reindex/부분 update로 벡터를 보존할 수는 없습니다.
+    """
+    mapping = copy.deepcopy(mapping)
+    excludes = mapping["mappings"].setdefault("_source", {}).setdefault("excludes", [])
+    for field in fields or ["embedding"]:
+        if field not in excludes:
+            excludes.append(field)
+    return mapping
+
+
+def with_ingredient_synonyms(mapping: dict, rules: List[str], field: str = "ingredients") -> dict:
+    """
+    field에 색인 시점 동의어 분석기를 적용한 매핑 사본을 만듭니다 (rules가 비면 그대로).
+    - 규칙 문구도 동의어 필터 앞까지의 분석 체인으로 토큰화되는데, nori의 decompound_mode=mixed는
+      복합어 원형과 분해 토큰을 같은 위치(position increment 0)에 내보내 규칙 파싱이 실패하므로
+      이 필드는 discard 모드 토크나이저를 씁니다. 파싱할 수 없는 규칙은 lenient로 건너뜁니다.
+    - 검색 분석기는 같은 토크나이저에서 동의어만 뺀 것이라 질의는 확장 없이 한 표기만 보냅니다.
+    - 동의어 그래프는 색인에 그대로 쓸 수 없어 flatten_graph로 평탄화합니다.
+    """
+    if not rules:
+        return mapping
+
+    mapping = copy.deepcopy(mapping)
+    analysis = mapping["settings"].setdefault("analysis", {})
+    analysis.setdefault("tokenizer", {})["nori_discard_tokenizer"] = {
+        "type": "nori_tokenizer",
+        "decompound_mode": "discard",
+    }
+    filters = analysis.setdefault("filter", {})
+    filters["ingredient_synonyms"] = {
+        "type": "synonym_graph",
+        "synonyms": list(rules),
+        "lenient": True,
+    }
+    stop_filter = ["nori_part_of_speech"] if "nori_part_of_speech" in filters else []
+    analyzers = analysis.setdefault("analyzer", {})
+    analyzers["ingredient_index_analyzer"] = {
+        "type": "custom",
+        "tokenizer": "nori_discard_tokenizer",
+        "filter": ["lowercase", "ingredient_synonyms", "flatten_graph"] + stop_filter,
+    }
+    analyzers["ingredient_search_analyzer"] = {
+        "type": "custom",
+        "tokenizer": "nori_discard_tokenizer",
+        "filter": ["lowercase"] + stop_filter,
+    }
+    mapping["mappings"]["properties"][field].update({
+        "analyzer": "ingredient_index_analyzer",
+        "search_analyzer": "ingredient_search_analyzer",
+    })
+    return mapping
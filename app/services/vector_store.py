@@ -0,0 +1,119 @@
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.serialization import dump, load
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """행 단위로 L2 정규화합니다. 노름이 0인 행은 그대로 둡니다."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorStore:
+    """
+    임베딩 JSON 파일을 float32 행렬로 올려두고 프로세스 내에서 코사인 검색을 수행합니다.
+    모든 행은 로드 시점에 정규화되므로 내적이 곧 코사인 유사도입니다.
+    """
+
+    def __init__(self, ids: List[str], docs: List[dict], matrix: np.ndarray, normalized: bool = False):
+        self.ids = ids
+        self.docs = docs
+        # 이미 정규화된 행렬(메모리 매핑 파일)은 복사하지 않고 그대로 사용
+        self.matrix = matrix if normalized else normalize_rows(matrix.astype(np.float32, copy=False))
+        self.id_to_row: Dict[str, int] = {doc_id: row for row, doc_id in enumerate(ids)}
+
+    @classmethod
+    def from_json(cls, path: str, id_field: str) -> "VectorStore":
+        """generate_*_embeddings.py 출력 파일에서 저장소를 생성합니다."""
+        with open(path, 'rb') as f:
+            data = load(f)
+        return cls.from_documents(data, id_field)
+
+    @classmethod
+    def from_documents(cls, data: Sequence[dict], id_field: str) -> "VectorStore":
+        """embedding 필드를 가진 문서 목록에서 저장소를 생성합니다."""
+        data = [item for item in data if item.get('embedding')]
+        ids = [str(item[id_field]) for item in data]
+        matrix = np.asarray([item['embedding'] for item in data], dtype=np.float32)
+        # 검색 결과에 embedding을 다시 실어 보낼 필요가 없으므로 메타데이터만 보관
+        docs = [
+            {key: value for key, value in item.items() if key not in ('embedding', 'embedding_text')}
+            for item in data
+        ]
+        return cls(ids, docs, matrix)
+
+    # ========================================================================
+    # 메모리 매핑 파일 (scripts/build_vector_store.py)
+    # ========================================================================
+    # <name>.npy: 정규화된 float32 행렬 / <name>.docs.json: ID와 메타데이터
+    # 행렬은 np.load(mmap_mode="r")로 열어 필요한 행만 페이지 단위로 읽히므로,
+    # 시작 시 임베딩 JSON 전체를 파싱하지 않고 ID로 벡터를 바로 조회할 수 있습니다.
+
+    @staticmethod
+    def docs_path(path: str) -> str:
+        return os.path.splitext(path)[0] + ".docs.json"
+
+    def save(self, path: str):
+        """정규화된 행렬을 .npy로, ID와 메타데이터를 옆 JSON 파일로 저장합니다."""
+        np.save(path, np.ascontiguousarray(self.matrix, dtype=np.float32))
+        with open(self.docs_path(path), 'wb') as f:
+            dump({"ids": self.ids, "docs": self.docs}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "VectorStore":
+        """save()로 저장한 파일을 엽니다. mmap=True이면 행렬을 읽기 전용으로 메모리 매핑합니다."""
+        matrix = np.load(path, mmap_mode="r" if mmap else None)
+        with open(cls.docs_path(path), 'rb') as f:
+            data = load(f)
+        return cls(data["ids"], data["docs"], matrix, normalized=True)
+
+    @classmethod
+    def open(cls, json_path: str, id_field: str, vectors_path: Optional[str] = None) -> "VectorStore":
+        """
+        메모리 매핑 파일이 임베딩 JSON보다 새것이면 그것을, 아니면 JSON을 읽습니다.
+        (JSON만 다시 생성된 경우 오래된 벡터를 쓰지 않도록)
+        """
+        if (vectors_path and os.path.exists(vectors_path) and os.path.exists(cls.docs_path(vectors_path))
+                and (not os.path.exists(json_path) or os.path.getmtime(vectors_path) >= os.path.getmtime(json_path))):
+            return cls.load(vectors_path)
+        return cls.from_json(json_path, id_field)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def get_vector(self, doc_id: str) -> Optional[np.ndarray]:
+        """문서 ID로 정규화된 벡터를 조회합니다."""
+        row = self.id_to_row.get(str(doc_id))
+        return None if row is None else self.matrix[row]
+
+    def search_batch(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """
+        여러 질의 벡터를 한 번의 행렬-행렬 곱으로 검색합니다.
+        질의별로 (행 번호, 코사인 유사도) 상위 k개를 점수 내림차순으로 반환합니다.
+        """
+        if len(queries) == 0 or len(self) == 0:
+            return [[] for _ in range(len(queries))]
+
+        queries = normalize_rows(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        scores = queries @ self.matrix.T
+        k = min(k, scores.shape[1])
+
+        # 전체 정렬 대신 argpartition으로 상위 k개만 뽑은 뒤 그 안에서 정렬
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        return [
+            [(int(row), float(score)) for row, score in zip(rows, row_scores)]
+            for rows, row_scores in zip(top, top_scores)
+        ]
@@ -0,0 +1,110 @@
+# ============================================================================
+# 친화도 행렬 빌드 시간 / 메모리 벤치마크
+# ============================================================================
+# 목적: 현재 카탈로그(약 500 재료 x 1,136 레시피)와 10배 합성 카탈로그에서
+#       친화도 행렬의 빌드 시간, 메모리, 추천 지연 시간을 측정
+#       벡터 값은 성능에 영향이 없으므로 고정 시드의 무작위 단위 벡터를 사용하고,
+#       레시피별 재료 구성은 scripts/data/*_embedding_input.json의 실제 분포에서 추출
+# 사용법: python benchmarks/bench_affinity_matrix.py [--scales 1 10] [--top-n 200]
+# ============================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.affinity_matrix import DEFAULT_TOP_N, AffinityMatrix, split_ingredients
+from app.services.vector_store import VectorStore
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "data")
+DIM = 1536
+
+
+def make_catalog(scale, rng):
+    """실제 입력 데이터를 scale배로 늘린 합성 재료/레시피 저장소를 만듭니다."""
+    with open(os.path.join(DATA_DIR, "ingredient_embedding_input.json"), 'r', encoding='utf-8') as f:
+        ingredients = json.load(f)
+    with open(os.path.join(DATA_DIR, "recipe_embedding_input.json"), 'r', encoding='utf-8') as f:
+        recipes = json.load(f)
+
+    names = [item['name'] for item in ingredients]
+    # 합성 재료명: 원본 이름 + 복제 번호 (1배는 원본 그대로)
+    synthetic_names = [name if copy == 0 else f"{name}#{copy}" for copy in range(scale) for name in names]
+    ingredient_docs = [{"ingredient_id": i, "name": name, "aliases": []} for i, name in enumerate(synthetic_names)]
+
+    recipe_docs = []
+    for copy in range(scale):
+        for recipe in recipes:
+            members = split_ingredients(recipe['processed_ingredients'])
+            if copy:
+                members = [f"{name}#{rng.integers(scale)}" if rng.integers(scale) else name for name in members]
+            recipe_docs.append({
+                "recipe_id": f"{recipe['recipe_id']}-{copy}",
+                "name": recipe['recipe_name'],
+                "ingredients": ", ".join(members),
+            })
+
+    def unit_vectors(n):
+        return rng.standard_normal((n, DIM), dtype=np.float32)
+
+    ingredient_store = VectorStore([str(d['ingredient_id']) for d in ingredient_docs], ingredient_docs,
+                                   unit_vectors(len(ingredient_docs)))
+    recipe_store = VectorStore([d['recipe_id'] for d in recipe_docs], recipe_docs, unit_vectors(len(recipe_docs)))
+    return ingredient_store, recipe_store
+
+
+def run(scale, top_n, rng):
+    ingredient_store, recipe_store = make_catalog(scale, rng)
+    rows, cols = len(ingredient_store), len(recipe_store)
+
+    start = time.perf_counter()
+    affinity = AffinityMatrix.build(ingredient_store, recipe_store, top_n=top_n)
+    build_seconds = time.perf_counter() - start
+
+    # 1~3개 재료 조합 추천 지연 시간
+    latencies = []
+    for _ in range(500):
+        query_rows = rng.choice(rows, size=rng.integers(1, 4), replace=False).tolist()
+        start = time.perf_counter()
+        affinity.recommend(query_rows, 10)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "scale": scale,
+        "ingredients": rows,
+        "recipes": cols,
+        "top_n": top_n,
+        "build_seconds": round(build_seconds, 3),
+        "sparse_bytes": affinity.nbytes,
+        "dense_bytes": rows * cols * 4,
+        "embedding_bytes": (rows + cols) * DIM * 4,
+        "recommend_p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "recommend_p99_ms": round(float(np.percentile(latencies, 99)), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="친화도 행렬 벤치마크")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = [run(scale, args.top_n, rng) for scale in args.scales]
+
+    print(f"{'scale':>5} {'재료':>6} {'레시피':>7} {'빌드(s)':>8} {'CSR(KB)':>9} {'밀집(KB)':>10} {'p50(ms)':>8} {'p99(ms)':>8}")
+    for r in results:
+        print(f"{r['scale']:>5} {r['ingredients']:>6} {r['recipes']:>7} {r['build_seconds']:>8} "
+              f"{r['sparse_bytes'] / 1024:>9.1f} {r['dense_bytes'] / 1024:>10.1f} "
+              f"{r['recommend_p50_ms']:>8} {r['recommend_p99_ms']:>8}")
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# ============================================================================
+# 재료 자동완성 벤치마크 (접두어 트라이 vs 선형 탐색 vs completion suggester)
+# ============================================================================
+# 목적: 재료명을 한 글자씩 입력하는 키 입력 열을 재생해 접두어 조회 지연(p50/p95/p99)을 비교
+#       - linear     : 모든 재료명/별칭을 startswith로 훑는 기준선
+#       - trie       : PrefixTrie (캐시 없음)
+#       - trie_cache : AutocompleteService (인기 접두어 LRU 캐시)
+#       - opensearch : 재료 인덱스 name_suggest completion suggester (--live)
+#       프로세스 내 목표: p99 < 5 ms
+# 사용법: python benchmarks/bench_autocomplete.py [--sessions 2000] [--limit 10] [--live]
+# 데이터: data/ingredient_embeddings.json이 있으면 그 재료, 없으면 scripts/data/ingredient_aliases_nested.json
+#         (--live는 name_suggest가 포함된 재료 인덱스가 업로드된 로컬 OpenSearch 필요)
+# ============================================================================
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.core.serialization import load
+from app.services.autocomplete import (
+    AutocompleteService,
+    PrefixTrie,
+    build_entries,
+    load_alias_documents,
+    normalize,
+    to_jamo,
+)
+
+TARGET_P99_MS = 5.0
+
+
+def load_ingredients():
+    if os.path.exists(config.INGREDIENT_EMBEDDINGS_FILE):
+        with open(config.INGREDIENT_EMBEDDINGS_FILE, "rb") as f:
+            return [{k: v for k, v in doc.items() if k != "embedding"} for doc in load(f)], "재료 임베딩"
+    return load_alias_documents(), "동의어 사전"
+
+
+def keystroke_prefixes(entries, sessions, rng):
+    """
+    인기 재료일수록 자주 입력하는 키 입력 열 (한 음절씩 + 마지막 음절은 자모 단위 중간 상태).
+    예: "양파" → ["ㅇ", "야", "양", "양ㅍ", "양파"]
+    """
+    weights = np.array([entry["weight"] + 1 for entry in entries], dtype=float)
+    picks = rng.choices(range(len(entries)), weights=weights, k=sessions)
+    prefixes = []
+    for i in picks:
+        text = entries[i]["matched"]
+        for end in range(1, len(text) + 1):
+            if end == len(text) and rng.random() < 0.5:
+                prefixes.append(text[:end - 1] + to_jamo(text[end - 1])[0])
+            prefixes.append(text[:end])
+    return prefixes
+
+
+def linear_complete(entries, prefix, limit):
+    prefix = normalize(prefix)
+    jamo = to_jamo(prefix)
+    matched = [entry for entry in entries if to_jamo(entry["matched"]).startswith(jamo)]
+    matched.sort(key=lambda entry: (-entry["weight"], len(entry["matched"])))
+    results, seen = [], set()
+    for entry in matched:
+        group = entry["ingredient_id"] or entry["name"]
+        if group not in seen:
+            seen.add(group)
+            results.append(entry)
+        if len(results) >= limit:
+            break
+    return results
+
+
+def measure(fn, prefixes):
+    latencies = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        fn(prefix)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(name, latencies):
+    p50, p95, p99 = (float(np.percentile(latencies, q)) * 1000 for q in (50, 95, 99))
+    mark = "✅" if p99 < TARGET_P99_MS else "❌"
+    print(f"   {name:<12}{p50:>10.4f}{p95:>10.4f}{p99:>10.4f}  {mark}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재료 자동완성 벤치마크")
+    parser.add_argument("--sessions", type=int, default=2000, help="재생할 재료 입력 세션 수")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--live", action="store_true", help="OpenSearch completion suggester도 측정")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    ingredients, source = load_ingredients()
+    recipes = []
+    if os.path.exists(config.RECIPE_EMBEDDINGS_FILE):
+        with open(config.RECIPE_EMBEDDINGS_FILE, "rb") as f:
+            recipes = [{"ingredients": doc.get("ingredients")} for doc in load(f)]
+
+    start = time.perf_counter()
+    entries = build_entries(ingredients, recipes)
+    trie = PrefixTrie(entries)
+    build_ms = (time.perf_counter() - start) * 1000
+    prefixes = keystroke_prefixes(entries, args.sessions, rng)
+    distinct = len(set(prefixes))
+    print(f"\n🔎 {source} 재료 {len(ingredients)}개 → 후보 {len(entries)}개 (레시피 {len(recipes)}개로 인기도), "
+          f"트라이 생성 {build_ms:.1f} ms")
+    print(f"   키 입력 {len(prefixes)}회 (서로 다른 접두어 {distinct}개), 목표 p99 < {TARGET_P99_MS} ms")
+
+    service = AutocompleteService(trie)
+    print(f"   {'방식':<12}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    report("linear", measure(lambda p: linear_complete(entries, p, args.limit), prefixes))
+    report("trie", measure(lambda p: trie.complete(p, args.limit), prefixes))
+    report("trie_cache", measure(lambda p: service.complete(p, args.limit), prefixes))
+    info = service.cache_info()
+    print(f"   캐시 적중률 {info.hits / max(1, info.hits + info.misses):.1%} ({info.currsize}개 보관)")
+
+    sample = "양"
+    print(f"   예시 '{sample}' → {[s['matched'] for s in trie.complete(sample, 5)]}")
+
+    if args.live:
+        from app.services.opensearch_client import get_client
+
+        client = get_client("search")
+        try:
+            client.search(index=config.INGREDIENT_INDEX, body={"size": 0})
+        except Exception as e:
+            print(f"⚠️ OpenSearch 연결 실패로 건너뜁니다: {e}")
+            return
+        live_service = AutocompleteService(opensearch_client=client, cache_size=0)
+        live_prefixes = prefixes[:2000]
+        report("opensearch", measure(lambda p: live_service.complete(p, args.limit, backend="opensearch"),
+                                     live_prefixes))
+
+
+if __name__ == "__main__":
+    main()
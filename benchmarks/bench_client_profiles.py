@@ -0,0 +1,245 @@
+# ============================================================================
+# OpenSearch 클라이언트 프로필 벤치마크 (전송 바이트 + 요청 지연)
+# ============================================================================
+# 목적: app/services/opensearch_client.py의 프로필별로 실제 전송 바이트와 요청 지연을 비교
+#       - 오프라인: bulk 본문 / k-NN 검색 본문의 gzip 수준별(미압축, 1, 6, 9) 크기와 압축 시간
+#       - --live: 로컬 OpenSearch에 대해 클라이언트 구성별 bulk 색인, k-NN 검색 반복
+#         · default       : 이전 방식 (OpenSearch(hosts=...), 압축 없음, 기본 직렬화기)
+#         · bulk          : gzip 본문(OPENSEARCH_COMPRESS_LEVEL), 큰 연결 풀, 긴 타임아웃
+#         · search        : 짧은 타임아웃, keep-alive 연결 풀, 압축 없음
+#         · search+gzip   : search 프로필 + gzip (작은 검색 본문에서 압축이 손해인지 확인)
+#         · no-keepalive  : 요청마다 새 클라이언트 (연결 재사용이 없을 때의 지연)
+#       전송 바이트는 urllib3 연결 풀의 urlopen을 감싸 요청 본문 길이와 응답 Content-Length로 셉니다.
+# 사용법: python benchmarks/bench_client_profiles.py [--docs 500] [--searches 200] [--live]
+#                                                   [--output data/bench/client_profiles.json]
+# 필수(--live): 로컬 OpenSearch (임시 인덱스를 만들고 끝나면 삭제)
+# ============================================================================
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+import uuid
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.core.serialization import FastJSONSerializer
+from app.services.opensearch_client import create_client, parse_hosts
+from app.services.search_queries import knn_query
+
+GZIP_LEVELS = [1, 6, 9]
+
+
+def make_docs(n, rng):
+    docs = []
+    for i in range(n):
+        vector = rng.standard_normal(config.EMBEDDING_DIM).astype(np.float32)
+        vector /= np.linalg.norm(vector)
+        docs.append({
+            "recipe_id": str(1000 + i),
+            "name": f"레시피 {i}",
+            "ingredients": "계란, 밀가루, 우유, 설탕",
+            "category": "한식",
+            "hashtag": "#간단",
+            "embedding": vector,
+        })
+    return docs
+
+
+def make_query_vectors(n, rng):
+    vectors = rng.standard_normal((n, config.EMBEDDING_DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def bulk_actions(index, docs):
+    actions = []
+    for doc in docs:
+        actions.append({"index": {"_index": index, "_id": doc["recipe_id"]}})
+        actions.append(doc)
+    return actions
+
+
+def percentile_ms(latencies, q):
+    return round(float(np.percentile(latencies, q)) * 1000, 2)
+
+
+# ============================================================================
+# 오프라인: gzip 수준별 본문 크기와 압축 시간
+# ============================================================================
+
+def bench_compression(docs, query_vectors, repeat=3):
+    serializer = FastJSONSerializer()
+    bodies = {
+        f"bulk ({len(docs)}건)": "".join(serializer.dumps(line) + "\n"
+                                        for line in bulk_actions("bench", docs)).encode("utf-8"),
+        "k-NN 검색 1건": serializer.dumps(knn_query(query_vectors[0].tolist(), 10)).encode("utf-8"),
+    }
+
+    report = {}
+    print(f"\n🗜️ gzip 수준별 본문 크기 / 압축 시간 (최소 {repeat}회)")
+    print(f"   {'본문':<18}{'수준':>6}{'KB':>12}{'비율':>8}{'압축(ms)':>10}")
+    for name, body in bodies.items():
+        rows = {"none": {"kb": round(len(body) / 1024, 1), "ratio": 1.0, "compress_ms": 0.0}}
+        for level in GZIP_LEVELS:
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                compressed = gzip.compress(body, compresslevel=level)
+                best = min(best, time.perf_counter() - start)
+            rows[str(level)] = {
+                "kb": round(len(compressed) / 1024, 1),
+                "ratio": round(len(body) / len(compressed), 2),
+                "compress_ms": round(best * 1000, 2),
+            }
+        for level, row in rows.items():
+            print(f"   {name:<18}{level:>6}{row['kb']:>12}{row['ratio']:>8}{row['compress_ms']:>10}")
+        report[name] = rows
+    return report
+
+
+# ============================================================================
+# --live: 클라이언트 구성별 전송 바이트와 지연
+# ============================================================================
+
+class WireCounter:
+    """클라이언트의 모든 연결에서 보낸/받은 바이트(압축 후)를 셉니다."""
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.requests = 0
+
+    def attach(self, client):
+        for connection in client.transport.connection_pool.connections:
+            urlopen = connection.pool.urlopen
+
+            def counted(method, url, body=None, *args, _urlopen=urlopen, **kwargs):
+                response = _urlopen(method, url, body, *args, **kwargs)
+                self.requests += 1
+                self.sent += len(body or b"")
+                length = response.headers.get("content-length")
+                self.received += int(length) if length else len(response.data)
+                return response
+
+            connection.pool.urlopen = counted
+        return client
+
+
+def client_factories():
+    """구성 이름 -> (클라이언트 생성 함수, 요청마다 새로 만드는지 여부)."""
+    def default_client():
+        from opensearchpy import OpenSearch
+        return OpenSearch(hosts=parse_hosts(), timeout=30)
+
+    return {
+        "default": (default_client, False),
+        "bulk": (lambda: create_client("bulk"), False),
+        "search": (lambda: create_client("search"), False),
+        "search+gzip": (lambda: create_client("search", http_compress=True), False),
+        "no-keepalive": (lambda: create_client("search"), True),
+    }
+
+
+def run_requests(factory, per_request, send, jobs, counter):
+    """jobs마다 send(client, job)를 호출해 지연 목록을 반환합니다."""
+    client = None if per_request else counter.attach(factory())
+    send(client or counter.attach(factory()), jobs[0])  # 워밍업 (연결 수립)
+    counter.sent = counter.received = counter.requests = 0
+
+    latencies = []
+    for job in jobs:
+        start = time.perf_counter()
+        send(client or counter.attach(factory()), job)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_live(docs, query_vectors, batch_size):
+    index = f"bench-client-profiles-{uuid.uuid4().hex[:8]}"
+    admin = create_client("bulk")
+    admin.indices.create(index=index, body={
+        "settings": {"index": {"knn": True, "number_of_shards": 1, "number_of_replicas": 0}},
+        "mappings": {"properties": {"embedding": {
+            "type": "knn_vector", "dimension": config.EMBEDDING_DIM,
+            "method": {"name": "hnsw", "space_type": "innerproduct", "engine": "faiss"},
+        }}},
+    })
+
+    batches = [docs[i:i + batch_size] for i in range(0, len(docs), batch_size)]
+
+    def send_bulk(client, batch):
+        client.bulk(body=bulk_actions(index, batch))
+
+    def send_search(client, vector):
+        client.search(index=index, body=knn_query(vector.tolist(), 10),
+                      params={"_source_includes": "recipe_id"})
+
+    report = {}
+    try:
+        for name, (factory, per_request) in client_factories().items():
+            row = {}
+            for operation, send, jobs in [("bulk", send_bulk, batches), ("search", send_search, list(query_vectors))]:
+                counter = WireCounter()
+                latencies = run_requests(factory, per_request, send, jobs, counter)
+                row[operation] = {
+                    "requests": len(jobs),
+                    "sent_kb_per_request": round(counter.sent / len(jobs) / 1024, 2),
+                    "received_kb_per_request": round(counter.received / len(jobs) / 1024, 2),
+                    "p50_ms": percentile_ms(latencies, 50),
+                    "p95_ms": percentile_ms(latencies, 95),
+                    "total_s": round(sum(latencies), 3),
+                }
+                if operation == "bulk":
+                    admin.indices.refresh(index=index)
+            report[name] = row
+    finally:
+        admin.indices.delete(index=index, ignore=[404])
+
+    print(f"\n📡 클라이언트 구성별 전송 바이트 / 지연 (bulk {batch_size}건씩, k-NN 검색 {len(query_vectors)}회)")
+    print(f"   {'구성':<14}{'작업':<8}{'보냄 KB/건':>12}{'받음 KB/건':>12}{'p50(ms)':>10}{'p95(ms)':>10}{'총(s)':>9}")
+    for name, row in report.items():
+        for operation, stats in row.items():
+            print(f"   {name:<14}{operation:<8}{stats['sent_kb_per_request']:>12}{stats['received_kb_per_request']:>12}"
+                  f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['total_s']:>9}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenSearch 클라이언트 프로필 벤치마크")
+    parser.add_argument("--docs", type=int, default=500, help="bulk 본문 / 색인 문서 수")
+    parser.add_argument("--batch-size", type=int, default=100, help="--live bulk 요청당 문서 수")
+    parser.add_argument("--searches", type=int, default=200, help="--live k-NN 검색 횟수")
+    parser.add_argument("--live", action="store_true", help="로컬 OpenSearch에 실제 요청을 보내 측정")
+    parser.add_argument("--output", default=os.path.join(config.DATA_DIR, "bench", "client_profiles.json"))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    docs = make_docs(args.docs, rng)
+    query_vectors = make_query_vectors(args.searches, rng)
+
+    report = {
+        "docs": args.docs,
+        "hosts": [f"{host['host']}:{host['port']}" for host in parse_hosts()],
+        "compress_level": config.OPENSEARCH_COMPRESS_LEVEL,
+        "compression": bench_compression(docs, query_vectors),
+    }
+
+    if args.live:
+        try:
+            report["live"] = bench_live(docs, query_vectors, args.batch_size)
+        except Exception as e:
+            print(f"⚠️ OpenSearch 측정 실패로 건너뜁니다: {e}")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"\n💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# ============================================================================
+# 재료 조합 검색 벤치마크 (텍스트 bool/should vs ingredient_ids 정확 일치)
+# ============================================================================
+# 목적: 같은 재료 조합을 세 가지 질의로 검색해 지연, 결과 수, 노드 쿼리 캐시 적중을 비교
+#       - text_should : ingredients 텍스트 match 절을 should로 나열 + minimum_should_match n-1 (이전 방식)
+#       - id_filter   : ingredient_ids term 절을 filter로 (모든 재료 포함, 점수 없음 → 비트셋 캐시)
+#       - terms_set   : ingredient_ids terms_set + coverage 스크립트 (레시피 재료의 50% 이상 충족)
+#       요청 캐시(request_cache)는 끄고 재는 쿼리 자체의 비용만 비교합니다.
+#       Lucene은 문서 1만 개 미만 세그먼트의 filter를 캐시하지 않으므로 작은 인덱스에서는 적중이 0일 수 있음
+# 사용법: python benchmarks/bench_combination_search.py [--combos 50] [--repeat 10] [--size 10]
+# 필수: ingredient_ids / ingredient_count가 포함된 레시피 인덱스가 업로드된 로컬 OpenSearch
+# ============================================================================
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.services.opensearch_client import get_client
+from app.services.search_queries import ingredient_coverage_query, ingredient_filter_query, resolve_ingredient_ids
+
+# test_ingredient_combination_search와 같은 조합 + 색인된 레시피에서 뽑은 조합
+FIXED_COMBINATIONS = [
+    ["계란", "밀가루"],
+    ["닭고기", "양파", "간장"],
+    ["돼지고기", "배추", "고춧가루"],
+]
+
+
+def text_should_query(names, size):
+    return {"size": size, "query": {"bool": {
+        "should": [{"match": {"ingredients": name}} for name in names],
+        "minimum_should_match": max(1, len(names) - 1),
+    }}}
+
+
+def sample_combinations(client, n, rng):
+    """색인된 레시피에서 재료 2~3개씩 뽑아 (이름 목록, ID 목록) 조합을 만듭니다."""
+    response = client.search(index=config.RECIPE_INDEX, body={
+        "size": n * 4,
+        "query": {"function_score": {"query": {"range": {"ingredient_count": {"gte": 3}}},
+                                     "random_score": {"seed": 42, "field": "_seq_no"}}},
+        "_source": ["ingredients", "ingredient_ids"],
+    })
+    combos = []
+    for hit in response["hits"]["hits"]:
+        names = [name.strip() for name in (hit["_source"].get("ingredients") or "").split(",") if name.strip()]
+        ids = [str(i) for i in hit["_source"].get("ingredient_ids") or []]
+        if len(names) != len(ids) or len(ids) < 3:
+            continue
+        picked = rng.sample(range(len(ids)), rng.randint(2, 3))
+        combos.append(([names[i] for i in picked], [ids[i] for i in picked]))
+        if len(combos) >= n:
+            break
+    return combos
+
+
+def query_cache_stats(client):
+    stats = client.indices.stats(index=config.RECIPE_INDEX, metric="query_cache")
+    cache = stats["_all"]["total"]["query_cache"]
+    return cache.get("hit_count", 0), cache.get("miss_count", 0)
+
+
+def percentile_ms(latencies, q):
+    return round(float(np.percentile(latencies, q)) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재료 조합 검색 벤치마크")
+    parser.add_argument("--combos", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--size", type=int, default=10)
+    args = parser.parse_args()
+
+    client = get_client("search")
+    try:
+        mapping = client.indices.get_mapping(index=config.RECIPE_INDEX)
+    except Exception as e:
+        print(f"❌ OpenSearch 연결 실패: {e}")
+        return
+    properties = next(iter(mapping.values()))["mappings"].get("properties", {})
+    if "ingredient_ids" not in properties:
+        print("❌ 레시피 인덱스에 ingredient_ids가 없습니다. 내보내기 → 임베딩 → 업로드를 다시 실행하세요")
+        return
+
+    rng = random.Random(42)
+    combos = []
+    for names in FIXED_COMBINATIONS:
+        ids = resolve_ingredient_ids(client, config.INGREDIENT_INDEX, names)
+        if None not in ids:
+            combos.append((names, ids))
+    combos += sample_combinations(client, args.combos - len(combos), rng)
+    print(f"\n🥘 재료 조합 {len(combos)}개 x {args.repeat}회 (요청 캐시 끔)")
+
+    builders = {
+        "text_should": lambda names, ids: text_should_query(names, args.size),
+        "id_filter": lambda names, ids: ingredient_filter_query(ids, args.size),
+        "terms_set": lambda names, ids: ingredient_coverage_query(ids, args.size, coverage=0.5),
+    }
+    print(f"   {'방식':<14}{'p50(ms)':>10}{'p95(ms)':>10}{'평균 결과 수':>14}{'캐시 적중':>10}{'캐시 미스':>10}")
+    for name, build in builders.items():
+        hits_before, misses_before = query_cache_stats(client)
+        latencies, totals = [], []
+        for _ in range(args.repeat):
+            for names, ids in combos:
+                start = time.perf_counter()
+                response = client.search(index=config.RECIPE_INDEX, body=build(names, ids), request_cache=False,
+                                         filter_path=["hits.total", "hits.hits._id"])
+                latencies.append(time.perf_counter() - start)
+                totals.append(response["hits"]["total"]["value"])
+        hits_after, misses_after = query_cache_stats(client)
+        print(f"   {name:<14}{percentile_ms(latencies, 50):>10}{percentile_ms(latencies, 95):>10}"
+              f"{np.mean(totals):>14.1f}{hits_after - hits_before:>10}{misses_after - misses_before:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# ============================================================================
+# 임베딩 처리량 / 재시도 벤치마크 (가짜 OpenAI 서버 사용)
+# ============================================================================
+# 목적: 실제 API 키 없이 OpenAIEmbeddingProvider의 배치 크기별 처리량과
+#       429(Retry-After) 재시도 동작을 재현 가능하게 측정
+#       - 같은 프로세스에서 fake_embedding_server를 띄우고 base_url로 연결
+#       - 같은 입력은 항상 같은 벡터 → 결과가 결정적인지도 함께 확인
+# 사용법: python benchmarks/bench_embedding_throughput.py [--texts 2000] [--batch-sizes 16,64,100]
+#                                                        [--latency-ms 30] [--rate-limit-every 7]
+# ============================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.services.embedding_providers import OpenAIEmbeddingProvider
+from fake_embedding_server import FakeEmbeddingServer, fake_embedding
+
+
+def run_case(server, texts, batch_size, retry_delay):
+    provider = OpenAIEmbeddingProvider(batch_size=batch_size, api_key=None, base_url=server.base_url,
+                                       max_retries=config.EMBEDDING_MAX_RETRIES, retry_delay=retry_delay)
+    before = dict(server.stats)
+    start = time.perf_counter()
+    embeddings = provider.embed(texts)
+    elapsed = time.perf_counter() - start
+
+    expected = fake_embedding(texts[0], provider.dimension, provider.model)
+    return {
+        "batch_size": batch_size,
+        "seconds": round(elapsed, 3),
+        "texts_per_sec": round(len(texts) / elapsed, 1),
+        "requests": server.stats["requests"] - before["requests"],
+        "rate_limited": server.stats["rate_limited"] - before["rate_limited"],
+        "deterministic": bool(np.allclose(embeddings[0], expected)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 처리량 / 재시도 벤치마크")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-sizes", default="16,64,100")
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--per-input-ms", type=float, default=0.2)
+    parser.add_argument("--rate-limit-every", type=int, default=7, help="N번째 요청마다 429 (0이면 끔)")
+    parser.add_argument("--retry-after", type=float, default=0.05)
+    args = parser.parse_args()
+
+    texts = [f"레시피 {i}: 재료 {i % 97}, 조리법 {i % 13}" for i in range(args.texts)]
+    server = FakeEmbeddingServer(port=0, latency_ms=args.latency_ms, per_input_ms=args.per_input_ms,
+                                 rate_limit_every=args.rate_limit_every, retry_after=args.retry_after).start()
+    try:
+        results = [run_case(server, texts, int(size), args.retry_after)
+                   for size in args.batch_sizes.split(",")]
+    finally:
+        server.stop()
+
+    print(f"\n🧪 텍스트 {args.texts}개, 요청 지연 {args.latency_ms} ms + 입력당 {args.per_input_ms} ms, "
+          f"{args.rate_limit_every or '-'}번째 요청마다 429")
+    for result in results:
+        print(f"   배치 {result['batch_size']:>4}: {result['texts_per_sec']:>8} 텍스트/초, "
+              f"요청 {result['requests']}회 (429 {result['rate_limited']}회), 결정적 {result['deterministic']}")
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
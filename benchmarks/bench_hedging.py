@@ -0,0 +1,121 @@
+# ============================================================================
+# OpenSearch 헤지 요청 / 서킷 브레이커 벤치마크 (장애 주입)
+# ============================================================================
+# 목적: 추천 경로(RecommendationService, opensearch 백엔드)에 느리거나 내려간 OpenSearch를 흉내 낸
+#       클라이언트를 붙여 헤지 없음 / 헤지+브레이커의 지연(p50/p95/p99), 오류 수, 응답 백엔드 비율을 비교
+#       - healthy   : 10~20 ms
+#       - slow_tail : 10%가 1.5초 (GC, 병합 등)
+#       - outage    : 구간 중간 40%가 연결 실패 (재시작, 연결 타임아웃 0.5초 후 오류)
+#       OpenSearch 없이 합성 레시피 행렬로 실행합니다 (응답 내용은 로컬 검색과 같고 지연/오류만 주입)
+# 사용법: python benchmarks/bench_hedging.py [--requests 300] [--recipes 5000] [--dimension 384]
+# ============================================================================
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.models.schemas import RecommendationRequest
+from app.services.hedging import CircuitBreaker, HedgedBackend, LatencyTracker
+from app.services.recommendation_service import RecommendationService
+from app.services.vector_store import VectorStore
+
+
+class FaultyOpenSearch:
+    """_msearch 응답을 로컬 행렬로 계산하되 시나리오에 따라 지연/연결 실패를 주입하는 클라이언트."""
+
+    def __init__(self, store, scenario, total, rng):
+        self.store = store
+        self.scenario = scenario
+        self.total = total
+        self.rng = rng
+        self.calls = 0
+
+    def msearch(self, body, **kwargs):
+        call = self.calls
+        self.calls += 1
+        if self.scenario == "outage" and 0.3 * self.total <= call < 0.7 * self.total:
+            time.sleep(0.5)
+            raise ConnectionError("simulated connection timeout")
+        delay = self.rng.uniform(0.010, 0.020)
+        if self.scenario == "slow_tail" and self.rng.random() < 0.1:
+            delay = 1.5
+        time.sleep(delay)
+
+        queries = [item["query"]["knn"]["embedding"] for item in body[1::2]]
+        vectors = np.asarray([q["vector"] for q in queries], dtype=np.float32)
+        responses = []
+        for hits, query in zip(self.store.search_batch(vectors, max(q["k"] for q in queries)), queries):
+            responses.append({"hits": {"hits": [
+                {"_source": self.store.docs[row], "_score": score} for row, score in hits[:query["k"]]]}})
+        return {"responses": responses}
+
+
+def synthetic_store(recipes, dimension, rng):
+    names = [f"재료{i}" for i in range(300)]
+    docs = [{"recipe_id": str(i), "name": f"레시피{i}", "ingredients": ", ".join(rng.sample(names, 6))}
+            for i in range(recipes)]
+    matrix = np.random.default_rng(42).standard_normal((recipes, dimension)).astype(np.float32)
+    ingredient_docs = [{"ingredient_id": str(i), "name": name, "aliases": []} for i, name in enumerate(names)]
+    ingredients = np.random.default_rng(7).standard_normal((len(names), dimension)).astype(np.float32)
+    return (VectorStore([d["recipe_id"] for d in docs], docs, matrix),
+            VectorStore([d["ingredient_id"] for d in ingredient_docs], ingredient_docs, ingredients), names)
+
+
+def run(service, requests):
+    latencies, errors, backends = [], 0, {}
+    for request in requests:
+        start = time.perf_counter()
+        try:
+            response = service.recommend(request)
+            backends[response.backend] = backends.get(response.backend, 0) + 1
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors, backends
+
+
+def report(name, latencies, errors, backends):
+    p50, p95, p99 = (float(np.percentile(latencies, q)) * 1000 for q in (50, 95, 99))
+    share = ", ".join(f"{backend} {count}" for backend, count in sorted(backends.items()))
+    print(f"   {name:<22}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{errors:>7}   {share}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenSearch 헤지 요청 / 서킷 브레이커 벤치마크")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--recipes", type=int, default=5000)
+    parser.add_argument("--dimension", type=int, default=384)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    recipe_store, ingredient_store, names = synthetic_store(args.recipes, args.dimension, rng)
+    requests = [RecommendationRequest(ingredients=rng.sample(names, rng.randint(1, 4)), limit=10, user_id=None)
+                for _ in range(args.requests)]
+
+    print(f"\n🛡️ 추천 {args.requests}건 (레시피 {args.recipes}개, {args.dimension}차원), "
+          f"헤지 마감 초기 {config.HEDGE_INITIAL_DEADLINE_MS:.0f} ms / p{config.HEDGE_QUANTILE * 100:.0f}")
+    print(f"   {'시나리오 / 방식':<22}{'p50(ms)':>9}{'p95(ms)':>9}{'p99(ms)':>9}{'오류':>7}   응답 백엔드")
+    scenarios = ["healthy", "slow_tail", "outage"]
+    for scenario in scenarios:
+        for hedged in (False, True):
+            client = FaultyOpenSearch(recipe_store, scenario, args.requests, random.Random(1))
+            # 브레이커 열림 시간은 짧은 실행 안에서 half_open 복귀까지 보이도록 줄임
+            hedge = HedgedBackend(breaker=CircuitBreaker(reset_seconds=2.0), tracker=LatencyTracker()) \
+                if hedged else None
+            service = RecommendationService(recipe_store, ingredient_store, backend="opensearch",
+                                            opensearch_client=client, hedge=hedge)
+            latencies, errors, backends = run(service, requests)
+            report(f"{scenario} / {'hedge' if hedged else 'none'}", latencies, errors, backends)
+            if hedge is not None:
+                hedge.executor.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# ============================================================================
+# 수집(추출 → 임베딩 → 색인) 확장성 벤치마크
+# ============================================================================
+# 목적: 카탈로그가 현재(약 1,136 레시피)의 10배, 100배가 됐을 때
+#       추출·임베딩·색인 경로의 처리량, 최대 메모리, 단계별 시간이 어떻게 변하는지 측정
+#       - 합성 카탈로그: scripts/data/*_embedding_input.json의 실제 분포(재료 수, 재료 빈도,
+#                        카테고리/조리법/해시태그, 동의어 수)에서 추출
+#       - 추출: 내보내기 스크립트의 write_ndjson으로 NDJSON 파일 기록 (DB 대신 합성 레코드)
+#       - 임베딩: 같은 프로세스의 가짜 OpenAI 서버 + OpenAIEmbeddingProvider
+#       - 색인: run_pipeline.StreamingPipeline, 기본은 bulk 본문 직렬화까지만 하는 대역
+#               (--opensearch면 로컬 OpenSearch 임시 인덱스에 실제 bulk 색인)
+#       규모별로 새 프로세스에서 실행해 최대 RSS를 규모마다 따로 측정
+# 사용법: python benchmarks/bench_ingest_scaling.py [--scales 1 10 100] [--latency-ms 0] [--opensearch]
+# 결과: data/bench/ingest_scaling.json (이번 실행), data/bench/ingest_scaling_history.jsonl (릴리스별 누적)
+# ============================================================================
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts"))
+
+from app.core import config
+from app.services.affinity_matrix import split_ingredients
+from fake_embedding_server import FakeEmbeddingServer
+
+INPUT_DIR = os.path.join(PROJECT_ROOT, "scripts", "data")
+BENCH_DIR = os.path.join(config.DATA_DIR, "bench")
+KINDS = ("recipes", "ingredients")
+
+
+# ============================================================================
+# 합성 카탈로그
+# ============================================================================
+
+def _load_input(name):
+    with open(os.path.join(INPUT_DIR, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _empirical(values):
+    """값 목록의 경험적 분포 (값 배열, 확률 배열)."""
+    counts = Counter(values)
+    keys = list(counts)
+    weights = np.asarray([counts[key] for key in keys], dtype=np.float64)
+    return keys, weights / weights.sum()
+
+
+def iter_synthetic_recipes(scale, seed=42):
+    """
+    실제 레시피를 scale배로 늘린 레코드를 한 건씩 생성합니다 (export_recipe_embedding_input 형식).
+    첫 번째 복제본은 원본 그대로, 이후 복제본은 재료 수/재료 빈도/카테고리 분포에서 새로 뽑습니다.
+    """
+    rng = np.random.default_rng(seed)
+    recipes = _load_input("recipe_embedding_input.json")
+    members = [split_ingredients(recipe['processed_ingredients']) for recipe in recipes]
+    sizes, size_p = _empirical([len(names) for names in members])
+    names, name_p = _empirical([name for names in members for name in names])
+    fields = {field: _empirical([recipe[field] for recipe in recipes])
+              for field in ("rcp_category", "rcp_way2", "hash_tag")}
+
+    for copy in range(scale):
+        for recipe in recipes:
+            if copy == 0:
+                yield recipe
+                continue
+            size = min(int(rng.choice(sizes, p=size_p)), len(names))
+            sampled = sorted(rng.choice(names, size=size, replace=False, p=name_p)) if size else []
+            record = {
+                "recipe_id": f"{recipe['recipe_id']}-{copy}",
+                "recipe_name": f"{recipe['recipe_name']} {copy}",
+                "processed_ingredients": ", ".join(sampled),
+            }
+            for field, (values, p) in fields.items():
+                record[field] = values[int(rng.choice(len(values), p=p))]
+            yield record
+
+
+def iter_synthetic_ingredients(scale, seed=42):
+    """실제 재료를 scale배로 늘린 레코드를 생성합니다 (export_ingredient_embedding_input 형식)."""
+    rng = np.random.default_rng(seed)
+    ingredients = _load_input("ingredient_embedding_input.json")
+    max_id = max(int(item['id']) for item in ingredients)
+    categories, category_p = _empirical([item.get('category', '기타') for item in ingredients])
+
+    for copy in range(scale):
+        for item in ingredients:
+            if copy == 0:
+                yield item
+                continue
+            yield {
+                "id": copy * (max_id + 1) + int(item['id']),
+                "name": f"{item['name']} {copy}",
+                "aliases": [f"{alias} {copy}" for alias in item.get('aliases', [])],
+                "category": categories[int(rng.choice(len(categories), p=category_p))],
+            }
+
+
+# ============================================================================
+# 규모별 실행 (별도 프로세스)
+# ============================================================================
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB). resource 모듈이 없는 플랫폼(Windows)에서는 None."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def make_serializing_indexer():
+    """
+    색인 대역: opensearch-py bulk와 같은 방식으로 액션/문서를 직렬화만 하고 버립니다.
+    네트워크 없이 클라이언트 쪽 비용(문서 생성 + JSON 직렬화)을 측정합니다.
+    """
+    from opensearchpy.serializer import JSONSerializer
+    serializer = JSONSerializer()
+    totals = {"bytes": 0}
+
+    def index_batch(docs):
+        body = []
+        for doc in docs:
+            body.append(serializer.dumps({"index": {}}))
+            body.append(serializer.dumps(doc))
+        totals["bytes"] += len("\n".join(body).encode("utf-8")) + 1
+        return len(docs)
+
+    return index_batch, totals
+
+
+def run_kind(kind, scale, options, base_url, work_dir):
+    from app.services.embedding_providers import OpenAIEmbeddingProvider
+    from embedding.generate_ingredient_embeddings import create_ingredient_embedding_text
+    from embedding.generate_recipe_embeddings import create_embedding_text, iter_input_records
+    from export_recipe_embedding_input import write_ndjson
+    from run_pipeline import StreamingPipeline, make_bulk_indexer, make_ingredient_doc, make_recipe_doc
+
+    if kind == "recipes":
+        records, build_text, make_doc, id_field = (iter_synthetic_recipes(scale), create_embedding_text,
+                                                   make_recipe_doc, "recipe_id")
+    else:
+        records, build_text, make_doc, id_field = (iter_synthetic_ingredients(scale), create_ingredient_embedding_text,
+                                                   make_ingredient_doc, "ingredient_id")
+
+    # 1) 추출: 내보내기 스크립트와 같은 NDJSON 기록
+    export_path = os.path.join(work_dir, f"{kind}.ndjson")
+    start = time.perf_counter()
+    with open(export_path, 'w', encoding='utf-8') as f:
+        docs = write_ndjson(records, f)
+    export_seconds = time.perf_counter() - start
+
+    # 2) 임베딩 + 색인: 스트리밍 파이프라인
+    provider = OpenAIEmbeddingProvider(batch_size=options["embed_batch"], api_key=None, base_url=base_url)
+    if options["opensearch"]:
+        from upload_to_opensearch_local import client, create_index, ingredient_mapping, recipe_mapping
+        from app.services.search_queries import with_embedding_metadata
+        index_name = f"bench_ingest_{kind}"
+        mapping = recipe_mapping if kind == "recipes" else ingredient_mapping
+        create_index(index_name, with_embedding_metadata(mapping, provider.metadata()))
+        index_batch, totals = make_bulk_indexer(client, index_name, id_field), None
+    else:
+        index_batch, totals = make_serializing_indexer()
+
+    try:
+        report = StreamingPipeline(
+            iter_input_records(export_path), build_text, provider.embed, make_doc, index_batch,
+            embed_batch_size=options["embed_batch"], index_batch_size=options["index_batch"],
+            queue_size=options["queue_size"],
+        ).run()
+    finally:
+        if options["opensearch"]:
+            client.indices.delete(index=index_name, ignore_unavailable=True)
+
+    wall = export_seconds + report["wall_seconds"]
+    return {
+        "docs": docs,
+        "export_seconds": round(export_seconds, 3),
+        "export_mb": round(os.path.getsize(export_path) / (1024 * 1024), 2),
+        "pipeline_seconds": report["wall_seconds"],
+        "total_seconds": round(wall, 3),
+        "docs_per_sec": round(docs / wall, 1) if wall else 0.0,
+        "indexed": report["indexed"],
+        "bulk_mb": round(totals["bytes"] / (1024 * 1024), 2) if totals else None,
+        "stages": {stage["stage"]: {"busy_seconds": stage["busy_seconds"], "busy_ratio": stage["busy_ratio"]}
+                   for stage in report["stages"]},
+    }
+
+
+def run_scale(scale, options, base_url):
+    """한 규모의 레시피/재료 수집을 실행합니다. 최대 RSS를 분리하려고 새 프로세스에서 호출됩니다."""
+    result = {"scale": scale}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for kind in KINDS:
+            result[kind] = run_kind(kind, scale, options, base_url, work_dir)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def scaling_exponent(results, kind):
+    """log(시간) ~ log(문서 수) 기울기. 1이면 선형, 1보다 크면 규모가 커질수록 문서당 비용 증가."""
+    points = [(r[kind]["docs"], r[kind]["total_seconds"]) for r in results if r[kind]["total_seconds"] > 0]
+    if len(points) < 2:
+        return None
+    docs, seconds = np.log([p[0] for p in points]), np.log([p[1] for p in points])
+    return round(float(np.polyfit(docs, seconds, 1)[0]), 3)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=PROJECT_ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수집 파이프라인 확장성 벤치마크")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--embed-batch", type=int, default=64)
+    parser.add_argument("--index-batch", type=int, default=100)
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="가짜 임베딩 서버 요청당 지연")
+    parser.add_argument("--per-input-ms", type=float, default=0.0, help="가짜 임베딩 서버 입력당 지연")
+    parser.add_argument("--opensearch", action="store_true", help="로컬 OpenSearch 임시 인덱스에 실제로 색인")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "ingest_scaling.json"))
+    parser.add_argument("--history", default=os.path.join(BENCH_DIR, "ingest_scaling_history.jsonl"))
+    args = parser.parse_args()
+
+    options = {
+        "embed_batch": args.embed_batch,
+        "index_batch": args.index_batch,
+        "queue_size": args.queue_size,
+        "opensearch": args.opensearch,
+    }
+    server = FakeEmbeddingServer(port=0, latency_ms=args.latency_ms, per_input_ms=args.per_input_ms).start()
+    results = []
+    try:
+        for scale in args.scales:
+            print(f"⏱️ {scale}배 카탈로그 수집 중...")
+            # 부모 프로세스 메모리를 물려받지 않도록 spawn으로 새 프로세스 생성
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                results.append(executor.submit(run_scale, scale, options, server.base_url).result())
+    finally:
+        server.stop()
+
+    print(f"\n📈 수집 확장성 (색인: {'OpenSearch' if args.opensearch else '직렬화 대역'}, "
+          f"임베딩 지연 {args.latency_ms} ms + 입력당 {args.per_input_ms} ms)")
+    print(f"   {'규모':>5} {'종류':<12} {'문서':>8} {'문서/초':>9} {'추출(s)':>8} "
+          f"{'임베딩(s)':>9} {'색인(s)':>8} {'최대RSS(MB)':>11}")
+    for result in results:
+        for kind in KINDS:
+            row = result[kind]
+            print(f"   {result['scale']:>4}x {kind:<12} {row['docs']:>8} {row['docs_per_sec']:>9} "
+                  f"{row['export_seconds']:>8} {row['stages']['embed']['busy_seconds']:>9} "
+                  f"{row['stages']['index']['busy_seconds']:>8} {result['peak_rss_mb']!s:>11}")
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "options": dict(options, latency_ms=args.latency_ms, per_input_ms=args.per_input_ms),
+        "scaling_exponent": {kind: scaling_exponent(results, kind) for kind in KINDS},
+        "results": results,
+    }
+    print(f"   시간 ~ 문서 수^k: {report['scaling_exponent']}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    print(f"\n💾 결과 저장: {args.output} (누적: {args.history})")
+
+
+if __name__ == "__main__":
+    main()
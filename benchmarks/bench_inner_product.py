@@ -0,0 +1,200 @@
+# ============================================================================
+# cosinesimil vs 정규화 벡터 + innerproduct 벤치마크
+# ============================================================================
+# 목적: 저장 시 한 번 정규화하고 내적으로 비교하는 방식이
+#       매 비교마다 노름을 계산하는 코사인 방식과 같은 순위를 내면서 더 빠른지 확인
+#       - 오프라인: NumPy로 비교당 비용과 상위 k 순위 일치 여부 측정 (항상 실행)
+#       - --live: 로컬 OpenSearch에 임시 인덱스 두 개를 만들어
+#                 cosinesimil(원본 벡터) / innerproduct(정규화 벡터)의 정확 검색·k-NN 순위와 지연 비교
+# 사용법: python benchmarks/bench_inner_product.py [--docs 20000] [--queries 200] [--k 10] [--live]
+# ============================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.services.search_queries import (
+    EMBEDDING_INDEX_META,
+    VECTOR_SPACE_TYPE,
+    knn_query,
+    script_score_query,
+    search,
+)
+from app.services.opensearch_client import create_client
+from app.services.vector_store import normalize_rows
+
+DIM = config.EMBEDDING_DIM
+
+
+def make_vectors(n, rng):
+    """노름이 제각각인 무작위 벡터 (정규화 여부가 결과에 영향을 주도록)."""
+    vectors = rng.standard_normal((n, DIM), dtype=np.float32)
+    return vectors * rng.uniform(0.5, 2.0, size=(n, 1)).astype(np.float32)
+
+
+def topk(scores, k):
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+def bench_offline(docs, queries, k, repeat):
+    """비교당 비용: 코사인(매번 노름 계산) vs 미리 정규화한 행렬의 내적."""
+    unit_docs = normalize_rows(docs)
+
+    def cosine():
+        norms = np.linalg.norm(docs, axis=1) * np.linalg.norm(queries, axis=1)[:, None]
+        return (queries @ docs.T) / norms
+
+    def inner_product():
+        return normalize_rows(queries) @ unit_docs.T
+
+    timings = {}
+    for name, fn in (("cosine", cosine), ("innerproduct", inner_product)):
+        fn()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            scores = fn()
+        elapsed = (time.perf_counter() - start) / repeat
+        timings[name] = {
+            "ms_per_batch": round(elapsed * 1000, 3),
+            "ns_per_comparison": round(elapsed / (len(queries) * len(docs)) * 1e9, 3),
+            "ranking": topk(scores, k),
+        }
+
+    same = (timings["cosine"]["ranking"] == timings["innerproduct"]["ranking"]).all(axis=1)
+    for timing in timings.values():
+        del timing["ranking"]
+    return {"timings": timings, "identical_rankings": int(same.sum()), "queries": len(queries)}
+
+
+# ============================================================================
+# 라이브 비교 (로컬 OpenSearch)
+# ============================================================================
+
+def _mapping(space_type, meta=None):
+    mapping = {
+        "settings": {"number_of_shards": 1, "number_of_replicas": 0, "index": {"knn": True}},
+        "mappings": {
+            "properties": {
+                "embedding": {
+                    "type": "knn_vector",
+                    "dimension": DIM,
+                    "method": {"name": "hnsw", "space_type": space_type, "engine": "nmslib",
+                               "parameters": {"ef_construction": 128, "m": 24}}
+                }
+            }
+        }
+    }
+    if meta:
+        mapping["mappings"]["_meta"] = meta
+    return mapping
+
+
+def _cosine_script_query(vector, size):
+    """기존 방식: 정규화하지 않은 질의와 painless cosineSimilarity."""
+    return {
+        "size": size,
+        "query": {"script_score": {
+            "query": {"match_all": {}},
+            "script": {"source": "cosineSimilarity(params.query_vector, doc['embedding']) + 1.0",
+                       "params": {"query_vector": [float(x) for x in vector]}}
+        }}
+    }
+
+
+def _raw_knn_query(vector, k):
+    return {"size": k, "query": {"knn": {"embedding": {"vector": [float(x) for x in vector], "k": k}}}}
+
+
+def bench_live(docs, queries, k):
+    from opensearchpy import helpers
+
+    client = create_client("bulk")
+    indices = {
+        "cosinesimil": ("bench_cosinesimil", _mapping("cosinesimil"), docs),
+        VECTOR_SPACE_TYPE: ("bench_innerproduct", _mapping(VECTOR_SPACE_TYPE, EMBEDDING_INDEX_META), normalize_rows(docs)),
+    }
+
+    try:
+        for index_name, mapping, vectors in indices.values():
+            client.indices.delete(index=index_name, ignore_unavailable=True)
+            client.indices.create(index=index_name, body=mapping)
+            helpers.bulk(client, (
+                {"_index": index_name, "_id": str(i), "_source": {"embedding": vector.tolist()}}
+                for i, vector in enumerate(vectors)
+            ), chunk_size=500, request_timeout=300)
+            client.indices.refresh(index=index_name)
+
+        cases = {
+            "exact": {"cosinesimil": lambda q: _cosine_script_query(q, k), VECTOR_SPACE_TYPE: lambda q: script_score_query(q, k)},
+            "hnsw": {"cosinesimil": lambda q: _raw_knn_query(q, k), VECTOR_SPACE_TYPE: lambda q: knn_query(q, k)},
+        }
+        results = {}
+        for case, builders in cases.items():
+            rankings, latencies = {}, {}
+            for space, build in builders.items():
+                index_name = indices[space][0]
+                rankings[space], elapsed = [], []
+                for query in queries:
+                    start = time.perf_counter()
+                    response = search(client, index_name, build(query))
+                    elapsed.append(time.perf_counter() - start)
+                    rankings[space].append([hit["_id"] for hit in response["hits"]["hits"]])
+                latencies[space] = {
+                    "p50_ms": round(float(np.percentile(elapsed, 50)) * 1000, 3),
+                    "p95_ms": round(float(np.percentile(elapsed, 95)) * 1000, 3),
+                }
+            pairs = list(zip(rankings["cosinesimil"], rankings[VECTOR_SPACE_TYPE]))
+            results[case] = {
+                "latency": latencies,
+                "identical_rankings": sum(1 for a, b in pairs if a == b),
+                "mean_overlap": round(float(np.mean([len(set(a) & set(b)) / k for a, b in pairs])), 4),
+            }
+        return results
+    finally:
+        for index_name, _, _ in indices.values():
+            client.indices.delete(index=index_name, ignore_unavailable=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="cosinesimil vs innerproduct 벤치마크")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--live", action="store_true", help="로컬 OpenSearch 임시 인덱스로 비교")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    docs = make_vectors(args.docs, rng)
+    queries = make_vectors(args.queries, rng)
+
+    offline = bench_offline(docs, queries, args.k, args.repeat)
+    print(f"\n🧮 오프라인 ({args.docs}개 문서 x {args.queries}개 질의, 차원 {DIM})")
+    for name, timing in offline["timings"].items():
+        print(f"   {name:<13}: 배치당 {timing['ms_per_batch']} ms, 비교당 {timing['ns_per_comparison']} ns")
+    print(f"   상위 {args.k} 순위 완전 일치: {offline['identical_rankings']}/{offline['queries']}")
+
+    report = {"offline": offline}
+    if args.live:
+        live = bench_live(docs, queries, args.k)
+        report["live"] = live
+        for case, result in live.items():
+            print(f"\n🔍 OpenSearch {case}")
+            for space, latency in result["latency"].items():
+                print(f"   {space:<13}: p50 {latency['p50_ms']} ms, p95 {latency['p95_ms']} ms")
+            print(f"   순위 완전 일치: {result['identical_rankings']}/{len(queries)}, 평균 겹침 {result['mean_overlap']:.2%}")
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
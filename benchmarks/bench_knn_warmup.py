@@ -0,0 +1,73 @@
+# ============================================================================
+# k-NN 콜드 스타트 vs 워밍업 벤치마크
+# ============================================================================
+# 목적: 인덱스를 닫았다 열어(그래프를 네이티브 메모리에서 내림) 재시작 직후 상태를 만든 뒤
+#       - cold   : 워밍업 없이 바로 합성 질의 (첫 질의가 세그먼트 그래프 로딩을 떠안음)
+#       - warmup : _plugins/_knn/warmup 후 합성 질의 (준비 판정과 같은 경로)
+#       첫 질의 지연, 라운드별 p95, 워밍업 시간, 그래프 메모리를 비교
+# 사용법: python benchmarks/bench_knn_warmup.py [--index recipes] [--queries 20] [--threshold 50]
+# 필수: 벡터가 색인된 로컬 OpenSearch (인덱스를 잠시 닫았다 엽니다)
+# ============================================================================
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.services.knn_warmup import (
+    format_report,
+    index_dimension,
+    knn_memory_stats,
+    probe_latencies,
+    synthetic_vectors,
+    warmup_index,
+)
+from app.services.opensearch_client import create_client
+
+
+def reopen(client, index):
+    """인덱스를 닫았다 열어 캐시된 그래프를 내립니다 (노드 재시작과 같은 콜드 상태)."""
+    client.indices.close(index=index)
+    client.indices.open(index=index)
+    client.cluster.health(index=index, wait_for_status="yellow", timeout="60s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="k-NN 콜드 스타트 vs 워밍업 벤치마크")
+    parser.add_argument("--index", default=config.RECIPE_INDEX)
+    parser.add_argument("--queries", type=int, default=config.KNN_WARMUP_QUERIES)
+    parser.add_argument("--threshold", type=float, default=config.KNN_READY_P95_MS, help="준비 기준 p95 (ms)")
+    args = parser.parse_args()
+
+    client = create_client("bulk")
+    try:
+        vectors = synthetic_vectors(index_dimension(client, args.index), args.queries)
+    except Exception as e:
+        print(f"⚠️ OpenSearch 연결 실패로 건너뜁니다: {e}")
+        return
+
+    print(f"\n🧊 콜드 스타트 ({args.index}, 합성 질의 {args.queries}개)")
+    reopen(client, args.index)
+    print(f"   재오픈 후 그래프 메모리 {knn_memory_stats(client)['graph_memory_kb'] / 1024:.1f} MB")
+    for round_no in range(1, 4):
+        latencies = probe_latencies(client, args.index, vectors)
+        print(f"   라운드 {round_no}: 첫 질의 {latencies[0] * 1000:.1f} ms, "
+              f"p95 {np.percentile(latencies, 95) * 1000:.1f} ms")
+
+    print(f"\n🔥 워밍업 후 (기준 p95 < {args.threshold} ms)")
+    reopen(client, args.index)
+    start = time.perf_counter()
+    report = warmup_index(client, args.index, p95_threshold_ms=args.threshold, queries=args.queries)
+    print(f"   {'✅' if report['ready'] else '⚠️'} {format_report(report)}")
+    latencies = probe_latencies(client, args.index, vectors)
+    print(f"   준비 후 첫 질의 {latencies[0] * 1000:.1f} ms, p95 {np.percentile(latencies, 95) * 1000:.1f} ms "
+          f"(재오픈부터 {time.perf_counter() - start:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
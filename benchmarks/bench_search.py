@@ -0,0 +1,274 @@
+# ============================================================================
+# 검색 백엔드 벤치마크 (속도 + 품질)
+# ============================================================================
+# 목적: 고정된 질의 세트를 각 검색 백엔드에 반복 실행해 처리량·지연·재현율을 측정하고
+#       커밋 간 diff로 비교할 수 있는 JSON을 남김
+#       - 질의 세트: 단일 재료명, test_ingredient_combination_search의 재료 조합,
+#                    test_natural_language_search의 자연어 시나리오
+#       - 백엔드: numpy(프로세스 내 VectorStore), script_score(정확 검색), hnsw(k-NN), hybrid(k-NN + 텍스트)
+#       - 정답: 레시피 임베딩 전체에 대한 정확한 코사인 상위 k (NumPy 전수 계산)
+#       - 지표: QPS, p50/p95/p99 지연, recall@k (전체 / 질의 유형별 / 질의별)
+# 사용법: python benchmarks/bench_search.py [--k 10] [--repeat 20] [--concurrency 1]
+#                                          [--backends numpy,script_score,hnsw,hybrid]
+#                                          [--output data/bench/search.json] [--baseline 이전.json]
+# 필수: data/recipe_embeddings.json, data/ingredient_embeddings.json
+#       자연어 시나리오·미등록 재료는 임베딩 제공자로 벡터화 (키가 없으면 OPENAI_BASE_URL로 가짜 서버 사용)
+#       OpenSearch 백엔드는 데이터가 업로드된 로컬 OpenSearch 필요 (연결 실패 시 건너뜀)
+# ============================================================================
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.models.schemas import RecommendationRequest
+from app.services.embedding_service import embed_texts
+from app.services.opensearch_client import get_client
+from app.services.recommendation_service import RecommendationService
+from app.services.search_queries import knn_query, script_score_query, search
+from app.services.vector_store import VectorStore
+
+BACKENDS = ["numpy", "script_score", "hnsw", "hybrid"]
+OPENSEARCH_BACKENDS = {"script_score", "hnsw", "hybrid"}
+
+# 텍스트 검색과 같은 필드 가중치 (upload_to_opensearch*.py의 자연어 검색 테스트)
+TEXT_FIELDS = ["name^2", "ingredients", "hashtag"]
+
+# ============================================================================
+# 고정 질의 세트 (순서와 ID를 바꾸면 이전 결과와 비교할 수 없음)
+# ============================================================================
+
+INGREDIENT_QUERIES = ["닭고기", "계란", "돼지고기", "양파", "두부", "감자", "김치", "소고기", "애호박", "새우"]
+
+COMBINATION_QUERIES = [
+    ["계란", "밀가루"],
+    ["닭고기", "양파", "간장"],
+    ["돼지고기", "배추", "고춧가루"],
+]
+
+SCENARIO_QUERIES = [
+    {"query": "간단한 아침 요리", "keywords": ["간단", "아침", "쉬운"]},
+    {"query": "매운 닭고기 요리", "keywords": ["매운", "닭", "고추"]},
+    {"query": "건강한 채소 요리", "keywords": ["건강", "채소", "영양"]},
+]
+
+
+def query_set():
+    """벤치마크 질의 목록. text는 hybrid 백엔드의 텍스트 절에 쓰입니다."""
+    queries = [
+        {"id": f"ingredient:{name}", "kind": "ingredient", "ingredients": [name], "text": name}
+        for name in INGREDIENT_QUERIES
+    ]
+    queries += [
+        {"id": f"combination:{'+'.join(combo)}", "kind": "combination", "ingredients": combo, "text": " ".join(combo)}
+        for combo in COMBINATION_QUERIES
+    ]
+    queries += [
+        {"id": f"scenario:{scenario['query']}", "kind": "scenario", "embed": scenario["query"],
+         "text": " ".join(scenario["keywords"])}
+        for scenario in SCENARIO_QUERIES
+    ]
+    return queries
+
+
+def build_query_vectors(queries, recipe_store, ingredient_store):
+    """
+    재료 질의는 추천 API와 같은 방식(저장된 재료 벡터 합, 미등록 재료만 임베딩)으로,
+    자연어 시나리오는 레시피 인덱스의 임베딩 제공자로 벡터화합니다.
+    """
+    service = RecommendationService(recipe_store, ingredient_store)
+    ingredient_queries = [q for q in queries if "ingredients" in q]
+    vectors = service._build_query_vectors(
+        [RecommendationRequest(ingredients=q["ingredients"], user_id=None) for q in ingredient_queries]
+    )
+    by_id = dict(zip((q["id"] for q in ingredient_queries), vectors))
+
+    scenarios = [q for q in queries if "embed" in q]
+    if scenarios:
+        embedded = embed_texts([q["embed"] for q in scenarios], config.RECIPE_INDEX)
+        by_id.update(zip((q["id"] for q in scenarios), np.asarray(embedded, dtype=np.float32)))
+
+    return np.stack([by_id[q["id"]] for q in queries])
+
+
+# ============================================================================
+# 백엔드별 단건 검색 (반환값: 레시피 ID 목록)
+# ============================================================================
+
+def make_searchers(recipe_store, client, k):
+    def numpy_search(query, vector):
+        return [recipe_store.ids[row] for row, _ in recipe_store.search_batch(vector[None, :], k)[0]]
+
+    def opensearch_search(build):
+        def run(query, vector):
+            response = search(client, config.RECIPE_INDEX, build(query, vector.tolist()),
+                              includes=["recipe_id"], filter_path=["hits.hits._id"])
+            return [hit["_id"] for hit in response["hits"]["hits"]]
+        return run
+
+    def hybrid_body(query, vector):
+        return {
+            "size": k,
+            "query": {"bool": {"should": [
+                knn_query(vector, k)["query"],
+                {"multi_match": {"query": query["text"], "fields": TEXT_FIELDS, "type": "best_fields"}},
+            ]}}
+        }
+
+    return {
+        "numpy": numpy_search,
+        "script_score": opensearch_search(lambda query, vector: script_score_query(vector, size=k)),
+        "hnsw": opensearch_search(lambda query, vector: knn_query(vector, k)),
+        "hybrid": opensearch_search(hybrid_body),
+    }
+
+
+def percentile_ms(latencies, q):
+    return round(float(np.percentile(latencies, q)) * 1000, 3)
+
+
+def bench_backend(searcher, queries, vectors, truth, k, repeat, warmup, concurrency):
+    """질의 세트를 repeat회 실행해 지연 분포와 처리량, 첫 회차 결과의 recall@k를 구합니다."""
+    jobs = list(zip(queries, vectors))
+    for _ in range(warmup):
+        for query, vector in jobs:
+            searcher(query, vector)
+
+    def timed(job):
+        start = time.perf_counter()
+        result = searcher(*job)
+        return time.perf_counter() - start, result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        runs = list(executor.map(timed, jobs * repeat))
+    wall = time.perf_counter() - start
+
+    latencies = [elapsed for elapsed, _ in runs]
+    recalls = {
+        query["id"]: len(set(result[:k]) & set(expected)) / len(expected) if expected else 1.0
+        for (query, _), (_, result), expected in zip(jobs, runs[:len(jobs)], truth)
+    }
+    by_kind = {}
+    for query in queries:
+        by_kind.setdefault(query["kind"], []).append(recalls[query["id"]])
+
+    return {
+        "requests": len(runs),
+        "qps": round(len(runs) / wall, 1),
+        "p50_ms": percentile_ms(latencies, 50),
+        "p95_ms": percentile_ms(latencies, 95),
+        "p99_ms": percentile_ms(latencies, 99),
+        "recall_at_k": round(float(np.mean(list(recalls.values()))), 4),
+        "recall_by_kind": {kind: round(float(np.mean(values)), 4) for kind, values in sorted(by_kind.items())},
+        "recall_by_query": {query_id: round(value, 4) for query_id, value in recalls.items()},
+    }
+
+
+def connect_opensearch():
+    try:
+        client = get_client("search")
+        if client.indices.exists(index=config.RECIPE_INDEX):
+            return client
+        print(f"⚠️ '{config.RECIPE_INDEX}' 인덱스가 없어 OpenSearch 백엔드를 건너뜁니다")
+    except Exception as e:
+        print(f"⚠️ OpenSearch 연결 실패로 OpenSearch 백엔드를 건너뜁니다: {e}")
+    return None
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=config.BASE_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(report, baseline):
+    """이전 결과 대비 백엔드별 QPS / p95 / recall 변화를 출력합니다."""
+    print(f"\n📈 기준 결과({baseline.get('commit')}) 대비")
+    for name, result in report["backends"].items():
+        before = baseline.get("backends", {}).get(name)
+        if not result.get("qps") or not before or not before.get("qps"):
+            continue
+        print(f"   {name:<13}: QPS {before['qps']} → {result['qps']}, "
+              f"p95 {before['p95_ms']} → {result['p95_ms']} ms, "
+              f"recall {before['recall_at_k']:.2%} → {result['recall_at_k']:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 백엔드 속도/품질 벤치마크")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20, help="질의 세트 반복 횟수")
+    parser.add_argument("--warmup", type=int, default=1, help="측정 전 워밍업 반복 횟수")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시 요청 스레드 수")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--recipes", default=config.RECIPE_EMBEDDINGS_FILE)
+    parser.add_argument("--ingredients", default=config.INGREDIENT_EMBEDDINGS_FILE)
+    parser.add_argument("--output", default=os.path.join(config.DATA_DIR, "bench", "search.json"))
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"알 수 없는 백엔드: {', '.join(sorted(unknown))} (사용 가능: {', '.join(BACKENDS)})")
+
+    print("📁 임베딩 로드...")
+    recipe_store = VectorStore.from_json(args.recipes, 'recipe_id')
+    ingredient_store = VectorStore.from_json(args.ingredients, 'ingredient_id')
+    print(f"   레시피 {len(recipe_store)}개, 재료 {len(ingredient_store)}개")
+
+    queries = query_set()
+    vectors = build_query_vectors(queries, recipe_store, ingredient_store)
+    truth = [[recipe_store.ids[row] for row, _ in hits] for hits in recipe_store.search_batch(vectors, args.k)]
+
+    client = connect_opensearch() if OPENSEARCH_BACKENDS & set(backends) else None
+    searchers = make_searchers(recipe_store, client, args.k)
+
+    report = {
+        "commit": git_commit(),
+        "k": args.k,
+        "repeat": args.repeat,
+        "concurrency": args.concurrency,
+        "recipes": len(recipe_store),
+        "queries": [query["id"] for query in queries],
+        "backends": {},
+    }
+    for name in backends:
+        if name in OPENSEARCH_BACKENDS and client is None:
+            report["backends"][name] = {"skipped": "opensearch unavailable"}
+            continue
+        print(f"⏱️ {name} 측정 중...")
+        report["backends"][name] = bench_backend(searchers[name], queries, vectors, truth, args.k,
+                                                 args.repeat, args.warmup, args.concurrency)
+
+    print(f"\n🔍 질의 {len(queries)}개 x {args.repeat}회, k={args.k}, 동시성 {args.concurrency}")
+    print(f"   {'backend':<13} {'QPS':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'recall@k':>9}")
+    for name, result in report["backends"].items():
+        if "skipped" in result:
+            print(f"   {name:<13} 건너뜀 ({result['skipped']})")
+            continue
+        print(f"   {name:<13} {result['qps']:>9} {result['p50_ms']:>9} {result['p95_ms']:>9} "
+              f"{result['p99_ms']:>9} {result['recall_at_k']:>9.2%}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            print_comparison(report, json.load(f))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"\n💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# ============================================================================
+# JSON 직렬화 마이크로 벤치마크 (표준 json vs orjson)
+# ============================================================================
+# 목적: 임베딩 문서 1,000개 기준 직렬화/역직렬화 시간과 바이트 수를 이전 방식과 비교
+#       - bulk 본문: opensearch-py 기본 JSONSerializer vs FastJSONSerializer
+#                    (embedding이 float 리스트인 경우 / 업로드 스크립트처럼 float32 ndarray인 경우)
+#       - 생성기 출력: json.dump(indent=2) / NDJSON vs 공용 직렬화기
+#       - 읽기: 같은 NDJSON·JSON 파일 바이트를 json.loads vs 공용 loads
+# 사용법: python benchmarks/bench_serialization.py [--docs 1000] [--repeat 5]
+# ============================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from opensearchpy.serializer import JSONSerializer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config, serialization
+from app.core.serialization import FastJSONSerializer
+
+
+def make_docs(n, rng, as_array):
+    docs = []
+    for i in range(n):
+        vector = rng.standard_normal(config.EMBEDDING_DIM).astype(np.float32)
+        vector /= np.linalg.norm(vector)
+        docs.append({
+            "recipe_id": str(1000 + i),
+            "name": f"레시피 {i}",
+            "ingredients": "계란, 밀가루, 우유, 설탕",
+            "category": "한식",
+            "cooking_method": "굽기",
+            "hashtag": "#간단",
+            "embedding": vector if as_array else vector.tolist(),
+            "embedding_text": f"레시피명: 레시피 {i}\n재료: 계란, 밀가루, 우유, 설탕",
+        })
+    return docs
+
+
+def measure(fn, repeat):
+    """가장 빠른 회차의 시간(초)과 결과를 반환합니다 (GC·캐시 잡음 제거)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bulk_body(serializer, docs):
+    lines = []
+    for doc in docs:
+        lines.append(serializer.dumps({"index": {"_index": "recipes", "_id": doc["recipe_id"]}}))
+        lines.append(serializer.dumps(doc))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 직렬화 벤치마크")
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    list_docs = make_docs(args.docs, rng, as_array=False)
+    array_docs = [dict(doc, embedding=np.asarray(doc["embedding"], dtype=np.float32)) for doc in list_docs]
+    stdlib, fast = JSONSerializer(), FastJSONSerializer()
+    per_1k = 1000 / args.docs
+
+    cases = {
+        "bulk (float 리스트)": (
+            lambda: bulk_body(stdlib, list_docs),
+            lambda: bulk_body(fast, list_docs),
+        ),
+        "bulk (float32 ndarray)": (
+            lambda: bulk_body(stdlib, array_docs),
+            lambda: bulk_body(fast, array_docs),
+        ),
+        "파일 .json (indent=2)": (
+            lambda: json.dumps(list_docs, ensure_ascii=False, indent=2).encode("utf-8"),
+            lambda: serialization.dumps(list_docs, indent=True),
+        ),
+        "파일 .ndjson": (
+            lambda: "".join(json.dumps(doc, ensure_ascii=False) + "\n" for doc in list_docs).encode("utf-8"),
+            lambda: b"".join(serialization.dumps(doc) + b"\n" for doc in list_docs),
+        ),
+    }
+
+    ndjson_bytes = cases["파일 .ndjson"][0]()
+    json_bytes = cases["파일 .json (indent=2)"][0]()
+    read_cases = {
+        "읽기 .ndjson": (
+            lambda: [json.loads(line) for line in ndjson_bytes.splitlines()],
+            lambda: [serialization.loads(line) for line in ndjson_bytes.splitlines()],
+        ),
+        "읽기 .json": (
+            lambda: json.loads(json_bytes),
+            lambda: serialization.loads(json_bytes),
+        ),
+    }
+
+    print(f"\n🧪 문서 {args.docs}개 (차원 {config.EMBEDDING_DIM}), 직렬화 백엔드: {serialization.BACKEND}")
+    print(f"   {'작업':<24}{'이전(ms/1k)':>13}{'이후(ms/1k)':>13}{'속도향상':>9}{'이전 MB':>9}{'이후 MB':>9}")
+    report = {"docs": args.docs, "backend": serialization.BACKEND, "cases": {}}
+    for name, (before_fn, after_fn) in {**cases, **read_cases}.items():
+        before, before_out = measure(before_fn, args.repeat)
+        after, after_out = measure(after_fn, args.repeat)
+        sizes = [len(out) / 1e6 if isinstance(out, bytes) else None for out in (before_out, after_out)]
+        report["cases"][name] = {
+            "before_ms_per_1k": round(before * 1000 * per_1k, 2),
+            "after_ms_per_1k": round(after * 1000 * per_1k, 2),
+            "speedup": round(before / after, 2),
+            "before_mb": sizes[0],
+            "after_mb": sizes[1],
+        }
+        case = report["cases"][name]
+        size_text = "".join(f"{size:>9.2f}" if size is not None else f"{'-':>9}" for size in sizes)
+        print(f"   {name:<24}{case['before_ms_per_1k']:>13}{case['after_ms_per_1k']:>13}{case['speedup']:>8}x{size_text}")
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
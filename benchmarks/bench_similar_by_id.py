@@ -0,0 +1,165 @@
+# ============================================================================
+# 문서 ID 기반 유사 검색 벤치마크 (벡터 왕복 제거)
+# ============================================================================
+# 목적: "레시피 X와 비슷한 레시피"를 두 방식으로 처리할 때의 요청 수, 전송 바이트, 지연 비교
+#       - 이전: OpenSearch에서 embedding을 받아온 뒤(1회차) 같은 벡터를 검색 본문에 실어 다시 보냄(2회차)
+#       - 이후: 메모리 매핑 저장소(VectorStore.load)에서 ID로 벡터를 조회하고 검색만 1회
+#       - 로컬: 이웃 그래프/행렬 검색만 사용하는 API 경로 (/recipes/{id}/similar, 네트워크 없음)
+#       오프라인에서는 합성 저장소로 본문 바이트와 조회/직렬화 시간만, --live이면 실제 왕복 시간까지 측정
+# 사용법: python benchmarks/bench_similar_by_id.py [--docs 2000] [--queries 100] [--live]
+# 필수(--live): 데이터가 업로드된 로컬 OpenSearch와 scripts/build_vector_store.py 출력
+# ============================================================================
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.core.serialization import dumps, loads
+from app.services.opensearch_client import get_client
+from app.services.search_queries import RECIPE_LIST_FIELDS, search, similar_query
+from app.services.vector_store import VectorStore
+
+
+def synthetic_store(n, rng):
+    matrix = rng.standard_normal((n, config.EMBEDDING_DIM)).astype(np.float32)
+    ids = [str(1000 + i) for i in range(n)]
+    docs = [{"recipe_id": doc_id, "name": f"레시피 {doc_id}"} for doc_id in ids]
+    return VectorStore(ids, docs, matrix)
+
+
+def percentile_ms(latencies, q):
+    return round(float(np.percentile(latencies, q)) * 1000, 3)
+
+
+def summarize(latencies, requests, sent, received):
+    return {
+        "requests_per_query": requests,
+        "sent_kb_per_query": round(sent / 1024, 1),
+        "received_kb_per_query": round(received / 1024, 1),
+        "p50_ms": percentile_ms(latencies, 50),
+        "p95_ms": percentile_ms(latencies, 95),
+    }
+
+
+# ============================================================================
+# 오프라인: 합성 저장소로 클라이언트 측 비용만 측정
+# ============================================================================
+
+def bench_offline(store, query_ids, k):
+    """
+    이전 방식의 1회차 응답(embedding 포함 히트)을 실제처럼 직렬화/파싱하고,
+    이후 방식은 메모리 매핑 저장소 조회 + 검색 본문 생성만 잽니다.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vectors.npy")
+        store.save(path)
+        start = time.perf_counter()
+        mapped = VectorStore.load(path)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        before, after = [], []
+        before_sent = before_received = after_sent = 0
+        for doc_id in query_ids:
+            start = time.perf_counter()
+            fetched = dumps({"hits": {"hits": [{"_id": doc_id, "_source": {
+                "name": "", "embedding": store.get_vector(doc_id)}}]}})
+            vector = loads(fetched)["hits"]["hits"][0]["_source"]["embedding"]
+            body = dumps(similar_query(vector, doc_id, size=k))
+            before.append(time.perf_counter() - start)
+            before_received += len(fetched)
+            before_sent += len(body)
+
+            start = time.perf_counter()
+            body = dumps(similar_query(mapped.get_vector(doc_id).tolist(), doc_id, size=k))
+            after.append(time.perf_counter() - start)
+            after_sent += len(body)
+
+        n = len(query_ids)
+        report = {
+            "mmap_open_ms": round(open_ms, 2),
+            "fetch_then_search": summarize(before, 2, before_sent / n, before_received / n),
+            "lookup_then_search": summarize(after, 1, after_sent / n, 0),
+        }
+
+    local = []
+    for doc_id in query_ids:
+        start = time.perf_counter()
+        store.search_batch(store.get_vector(doc_id)[None, :], k + 1)
+        local.append(time.perf_counter() - start)
+    report["in_process"] = summarize(local, 0, 0, 0)
+    return report
+
+
+# ============================================================================
+# --live: 실제 OpenSearch 왕복
+# ============================================================================
+
+def bench_live(store, query_ids, k):
+    client = get_client("search")
+    before, after = [], []
+    for doc_id in query_ids:
+        start = time.perf_counter()
+        hit = search(client, config.RECIPE_INDEX, {"query": {"ids": {"values": [doc_id]}}, "size": 1},
+                     includes=["embedding"], excludes=None)["hits"]["hits"][0]
+        search(client, config.RECIPE_INDEX, similar_query(hit["_source"]["embedding"], doc_id, size=k),
+               includes=RECIPE_LIST_FIELDS)
+        before.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        search(client, config.RECIPE_INDEX, similar_query(store.get_vector(doc_id).tolist(), doc_id, size=k),
+               includes=RECIPE_LIST_FIELDS)
+        after.append(time.perf_counter() - start)
+
+    return {
+        "fetch_then_search": {"p50_ms": percentile_ms(before, 50), "p95_ms": percentile_ms(before, 95)},
+        "lookup_then_search": {"p50_ms": percentile_ms(after, 50), "p95_ms": percentile_ms(after, 95)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="문서 ID 기반 유사 검색 벤치마크")
+    parser.add_argument("--docs", type=int, default=2000, help="오프라인 합성 저장소 문서 수")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--live", action="store_true", help="로컬 OpenSearch에 실제 요청")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    store = synthetic_store(args.docs, rng)
+    query_ids = [store.ids[i] for i in rng.choice(len(store), size=args.queries)]
+
+    report = bench_offline(store, query_ids, args.k)
+    print(f"\n🔁 유사 검색 {args.queries}회 (합성 문서 {args.docs}개, 차원 {config.EMBEDDING_DIM})")
+    print(f"   메모리 매핑 저장소 열기: {report['mmap_open_ms']} ms")
+    print(f"   {'방식':<22}{'요청/질의':>10}{'보냄 KB':>10}{'받음 KB':>10}{'p50(ms)':>10}{'p95(ms)':>10}")
+    for name in ["fetch_then_search", "lookup_then_search", "in_process"]:
+        row = report[name]
+        print(f"   {name:<22}{row['requests_per_query']:>10}{row['sent_kb_per_query']:>10}"
+              f"{row['received_kb_per_query']:>10}{row['p50_ms']:>10}{row['p95_ms']:>10}")
+    print("   (fetch/lookup의 지연은 클라이언트 측 직렬화·조회 비용만, 네트워크 제외)")
+
+    if args.live:
+        if not os.path.exists(config.RECIPE_VECTORS_FILE):
+            print(f"⚠️ {config.RECIPE_VECTORS_FILE}이 없어 --live를 건너뜁니다 (scripts/build_vector_store.py)")
+            return
+        recipe_store = VectorStore.load(config.RECIPE_VECTORS_FILE)
+        live_ids = [recipe_store.ids[i] for i in rng.choice(len(recipe_store), size=args.queries)]
+        try:
+            live = bench_live(recipe_store, live_ids, args.k)
+        except Exception as e:
+            print(f"⚠️ OpenSearch 측정 실패로 건너뜁니다: {e}")
+            return
+        print("\n📡 실제 왕복 (OpenSearch)")
+        for name, row in live.items():
+            print(f"   {name:<22}p50 {row['p50_ms']:>8} ms   p95 {row['p95_ms']:>8} ms")
+
+
+if __name__ == "__main__":
+    main()
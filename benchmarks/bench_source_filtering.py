@@ -0,0 +1,82 @@
+# ============================================================================
+# _source 필터링 응답 크기 / 디코딩 시간 벤치마크
+# ============================================================================
+# 목적: 같은 검색을 전체 _source와 필요한 필드만 요청했을 때의
+#       응답 바이트 수, 왕복 시간, 클라이언트 JSON 디코딩 시간을 비교
+# 사용법: python benchmarks/bench_source_filtering.py [--size 10] [--repeat 20]
+# 필수: 데이터가 업로드된 로컬 OpenSearch (OPENSEARCH_HOST, OPENSEARCH_PORT)
+# ============================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.services.search_queries import (
+    HITS_FILTER_PATH,
+    INGREDIENT_LIST_FIELDS,
+    RECIPE_LIST_FIELDS,
+    match_query,
+    script_score_query,
+    with_source,
+)
+
+
+def measure(url, body, params, repeat):
+    """같은 요청을 반복해 평균 응답 크기, 왕복 시간, 디코딩 시간을 구합니다."""
+    total_bytes, total_request, total_decode = 0, 0.0, 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = requests.post(url, json=body, params=params, timeout=60)
+        total_request += time.perf_counter() - start
+        response.raise_for_status()
+
+        start = time.perf_counter()
+        json.loads(response.content)
+        total_decode += time.perf_counter() - start
+        total_bytes += len(response.content)
+
+    return {
+        "bytes": total_bytes // repeat,
+        "request_ms": round(total_request / repeat * 1000, 3),
+        "decode_ms": round(total_decode / repeat * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="_source 필터링 벤치마크")
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    base_url = f"http://{config.OPENSEARCH_HOST}:{config.OPENSEARCH_PORT}"
+    dummy_vector = [0.1] * config.EMBEDDING_DIM
+
+    cases = [
+        ("레시피 텍스트 검색", config.RECIPE_INDEX, match_query("name", "볶음", size=args.size), RECIPE_LIST_FIELDS),
+        ("레시피 script_score", config.RECIPE_INDEX, script_score_query(dummy_vector, size=args.size), RECIPE_LIST_FIELDS),
+        ("재료 script_score", config.INGREDIENT_INDEX, script_score_query(dummy_vector, size=args.size), INGREDIENT_LIST_FIELDS),
+    ]
+
+    results = []
+    for label, index, body, fields in cases:
+        url = f"{base_url}/{index}/_search"
+        full = measure(url, body, {}, args.repeat)
+        filtered = measure(url, with_source(body, includes=fields), {"filter_path": ",".join(HITS_FILTER_PATH)}, args.repeat)
+        results.append({"case": label, "full": full, "filtered": filtered})
+
+        print(f"\n🔍 {label} (size={args.size})")
+        print(f"   전체 _source : {full['bytes']:>9,} bytes, 요청 {full['request_ms']} ms, 디코딩 {full['decode_ms']} ms")
+        print(f"   필드 필터링  : {filtered['bytes']:>9,} bytes, 요청 {filtered['request_ms']} ms, 디코딩 {filtered['decode_ms']} ms")
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
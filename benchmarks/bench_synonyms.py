@@ -0,0 +1,170 @@
+# ============================================================================
+# 재료 동의어: 질의 시점 확장 vs 색인 시점 동의어 벤치마크
+# ============================================================================
+# 목적: 별칭("강력밀가루", "전립분" 등)으로 레시피 ingredients를 검색할 때
+#       - 이전: 동의어 묶음의 모든 표기를 bool should 절로 나열 (질의 시점 확장)
+#       - 이후: 색인 시점 동의어 분석기가 적용된 필드에 match 한 번
+#       두 방식의 질의 절 수, 본문 바이트, 지연(p50/p95), 결과 일치도를 비교
+#       오프라인에서는 규칙 수와 절 수/본문 크기만, --live이면 임시 인덱스 두 개로 실제 측정
+# 사용법: python benchmarks/bench_synonyms.py [--queries 50] [--docs 3000] [--repeat 20] [--live]
+# 필수(--live): Nori 플러그인이 설치된 로컬 OpenSearch (임시 인덱스를 만들고 끝나면 삭제)
+#               레시피 문서는 data/recipe_embeddings.json이 있으면 그 ingredients, 없으면 합성
+# ============================================================================
+
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from app.core import config
+from app.core.serialization import dumps, load
+from app.services.ingredient_synonyms import alias_lookup, load_alias_groups, synonym_rules
+from app.services.search_queries import with_ingredient_synonyms
+
+
+def expansion_query(term, lookup, size):
+    """이전 방식: 같은 묶음의 모든 표기를 should 절로 나열합니다."""
+    terms = lookup.get(term, [term])
+    return {"size": size, "query": {"bool": {
+        "should": [{"match": {"ingredients": {"query": t, "operator": "and"}}} for t in terms],
+        "minimum_should_match": 1,
+    }}}
+
+
+def synonym_query(term, size):
+    """이후 방식: 동의어는 색인에 들어 있으므로 입력 표기 하나만 보냅니다."""
+    return {"size": size, "query": {"match": {"ingredients": {"query": term, "operator": "and"}}}}
+
+
+def clause_count(body):
+    query = body["query"]
+    return len(query["bool"]["should"]) if "bool" in query else 1
+
+
+def pick_queries(groups, n, rng):
+    """표준명이 아닌 별칭을 질의로 고릅니다 (별칭 검색이 확장을 필요로 하는 경우)."""
+    candidates = [terms[i] for terms in groups for i in range(1, len(terms))]
+    return rng.sample(candidates, min(n, len(candidates)))
+
+
+def percentile_ms(latencies, q):
+    return round(float(np.percentile(latencies, q)) * 1000, 3)
+
+
+# ============================================================================
+# --live: 임시 인덱스 두 개 (동의어 없음 / 색인 시점 동의어)
+# ============================================================================
+
+def recipe_texts(groups, n, rng):
+    if os.path.exists(config.RECIPE_EMBEDDINGS_FILE):
+        with open(config.RECIPE_EMBEDDINGS_FILE, "rb") as f:
+            return [doc.get("ingredients", "") for doc in load(f)][:n]
+    # 합성: 묶음마다 임의 표기 하나씩, 레시피당 재료 5~12개
+    return [", ".join(rng.choice(terms) for terms in rng.sample(groups, rng.randint(5, 12))) for _ in range(n)]
+
+
+def text_only_mapping(base_mapping, rules):
+    """레시피 매핑의 분석기 설정과 ingredients 필드만 남긴 매핑 (벡터 없이 텍스트 검색만 비교)."""
+    mapping = {
+        "settings": copy.deepcopy(base_mapping["settings"]),
+        "mappings": {"properties": {"ingredients": {"type": "text", "analyzer": "korean_analyzer"}}},
+    }
+    return with_ingredient_synonyms(mapping, rules)
+
+
+def bench_live(groups, lookup, queries, docs, repeat, size):
+    from opensearchpy import helpers
+
+    from app.services.opensearch_client import create_client
+    from upload_to_opensearch_local import recipe_mapping
+
+    client = create_client("bulk")
+    suffix = f"{os.getpid()}"
+    indices = {
+        "expansion": (f"bench_synonyms_plain_{suffix}", text_only_mapping(recipe_mapping, [])),
+        "index_time": (f"bench_synonyms_graph_{suffix}", text_only_mapping(recipe_mapping, synonym_rules(groups))),
+    }
+    report = {}
+    try:
+        for name, (index, mapping) in indices.items():
+            client.indices.create(index=index, body=mapping)
+            helpers.bulk(client, ({"_index": index, "_id": str(i), "ingredients": text}
+                                  for i, text in enumerate(docs)), refresh=True)
+
+        sample = queries[0]
+        tokens = client.indices.analyze(index=indices["index_time"][0], body={
+            "analyzer": "ingredient_index_analyzer", "text": sample})["tokens"]
+        print(f"   분석 확인 '{sample}' → {sorted({token['token'] for token in tokens})}")
+
+        results = {}
+        for name, (index, _) in indices.items():
+            build = (lambda term: expansion_query(term, lookup, size)) if name == "expansion" else \
+                (lambda term: synonym_query(term, size))
+            latencies, hits = [], {}
+            for term in queries:  # 워밍업
+                client.search(index=index, body=build(term))
+            for _ in range(repeat):
+                for term in queries:
+                    start = time.perf_counter()
+                    response = client.search(index=index, body=build(term), filter_path=["hits.hits._id"])
+                    latencies.append(time.perf_counter() - start)
+                    hits[term] = {hit["_id"] for hit in response.get("hits", {}).get("hits", [])}
+            results[name] = hits
+            report[name] = {"p50_ms": percentile_ms(latencies, 50), "p95_ms": percentile_ms(latencies, 95)}
+
+        # 확장 질의 결과를 기준으로 색인 시점 동의어가 같은 레시피를 찾는지
+        overlaps = [len(results["index_time"][t] & expected) / len(expected)
+                    for t, expected in results["expansion"].items() if expected]
+        report["index_time"]["overlap_with_expansion"] = round(float(np.mean(overlaps)), 4) if overlaps else None
+    finally:
+        for index, _ in indices.values():
+            client.indices.delete(index=index, ignore=[404])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재료 동의어 질의 확장 vs 색인 시점 동의어 벤치마크")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--docs", type=int, default=3000, help="--live 레시피 수 (합성일 때)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--live", action="store_true", help="로컬 OpenSearch에 임시 인덱스를 만들어 측정")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    groups = load_alias_groups()
+    lookup = alias_lookup(groups)
+    queries = pick_queries(groups, args.queries, rng)
+
+    expansion = [expansion_query(term, lookup, args.size) for term in queries]
+    index_time = [synonym_query(term, args.size) for term in queries]
+    print(f"\n🔤 동의어 묶음 {len(groups)}개 → 규칙 {len(synonym_rules(groups))}줄, 별칭 질의 {len(queries)}개")
+    print(f"   {'방식':<14}{'평균 절 수':>12}{'최대 절 수':>12}{'평균 본문(B)':>14}")
+    for name, bodies in [("expansion", expansion), ("index_time", index_time)]:
+        clauses = [clause_count(body) for body in bodies]
+        sizes = [len(dumps(body)) for body in bodies]
+        print(f"   {name:<14}{np.mean(clauses):>12.2f}{max(clauses):>12}{np.mean(sizes):>14.0f}")
+
+    if args.live:
+        try:
+            docs = recipe_texts(groups, args.docs, rng)
+            report = bench_live(groups, lookup, queries, docs, args.repeat, args.size)
+        except Exception as e:
+            print(f"⚠️ OpenSearch 측정 실패로 건너뜁니다: {e}")
+            return
+        print(f"\n📡 실제 검색 (레시피 {len(docs)}개, 질의 {len(queries)}개 x {args.repeat}회)")
+        for name, row in report.items():
+            overlap = row.get("overlap_with_expansion")
+            extra = f"   확장 결과 일치 {overlap:.1%}" if overlap is not None else ""
+            print(f"   {name:<14}p50 {row['p50_ms']:>8} ms   p95 {row['p95_ms']:>8} ms{extra}")
+
+
+if __name__ == "__main__":
+    main()
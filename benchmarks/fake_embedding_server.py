@@ -0,0 +1,197 @@
+# ============================================================================
+# 결정적 가짜 임베딩 서버 (OpenAI 호환 /v1/embeddings)
+# ============================================================================
+# 목적: OpenAI 키 없이 임베딩·검색 코드를 실행하고, 처리량/재시도 동작을 재현 가능하게 측정
+#       - 입력 텍스트(+모델명)로 시드를 만든 의사 난수 단위 벡터 → 같은 입력은 항상 같은 벡터
+#       - 문자열 / 문자열 배열 입력, dimensions·encoding_format(float/base64) 파라미터 지원
+#       - 지연 시간 주입 (기본 + 입력당 + 지터)
+#       - rate limit 주입: N번째 요청마다 또는 분당 요청 수 초과 시 429 + Retry-After
+# 사용법: python benchmarks/fake_embedding_server.py [--port 8100] [--latency-ms 50] [--rate-limit-every 10]
+#         OPENAI_BASE_URL=http://localhost:8100/v1 로 생성기/서비스가 이 서버를 사용
+# ============================================================================
+
+import argparse
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+DEFAULT_DIM = 1536
+DEFAULT_PORT = 8100
+
+
+def fake_embedding(text, dim=DEFAULT_DIM, model=""):
+    """텍스트로 시드를 만든 결정적 단위 벡터."""
+    digest = hashlib.blake2b(f"{model}\x00{text}".encode("utf-8"), digest_size=8).digest()
+    vector = np.random.default_rng(int.from_bytes(digest, "little")).standard_normal(dim)
+    return (vector / np.linalg.norm(vector)).astype(np.float32)
+
+
+def _encode(vector, as_base64):
+    if as_base64:
+        return base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+    return vector.tolist()
+
+
+class FakeEmbeddingServer:
+    """
+    백그라운드 스레드에서 도는 OpenAI 호환 임베딩 서버.
+    벤치마크에서는 start()/stop()으로 직접 띄우고, stats로 요청·429 횟수를 확인합니다.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, dim=DEFAULT_DIM, latency_ms=0.0,
+                 per_input_ms=0.0, jitter_ms=0.0, rate_limit_every=0, rpm=0, retry_after=1.0, seed=0):
+        self.dim = dim
+        self.latency_ms = latency_ms
+        self.per_input_ms = per_input_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_every = rate_limit_every
+        self.rpm = rpm
+        self.retry_after = retry_after
+        self.stats = {"requests": 0, "rate_limited": 0, "inputs": 0}
+
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(seed)
+        self._recent = deque()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    # ========================================================================
+    # 요청 처리
+    # ========================================================================
+
+    def _admit(self):
+        """이번 요청을 rate limit으로 거절할지 결정합니다."""
+        with self._lock:
+            self.stats["requests"] += 1
+            count = self.stats["requests"]
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+
+            limited = bool(self.rate_limit_every) and count % self.rate_limit_every == 0
+            limited = limited or (bool(self.rpm) and len(self._recent) >= self.rpm)
+            if limited:
+                self.stats["rate_limited"] += 1
+            else:
+                self._recent.append(now)
+            jitter = float(self._rng.uniform(0, self.jitter_ms)) if self.jitter_ms else 0.0
+            return limited, jitter
+
+    def embed_response(self, body):
+        inputs = body.get("input", [])
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        model = body.get("model", "")
+        dim = int(body.get("dimensions") or self.dim)
+        # openai 클라이언트는 기본으로 base64(float32 리틀엔디언)를 요청함
+        as_base64 = body.get("encoding_format") == "base64"
+
+        with self._lock:
+            self.stats["inputs"] += len(inputs)
+        tokens = sum(len(str(text).split()) for text in inputs)
+        return {
+            "object": "list",
+            "data": [
+                {"object": "embedding", "index": i, "embedding": _encode(fake_embedding(str(text), dim, model), as_base64)}
+                for i, text in enumerate(inputs)
+            ],
+            "model": model,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.rstrip("/") != "/v1/embeddings":
+                    self._send(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                    return
+
+                limited, jitter = server._admit()
+                if limited:
+                    self._send(429, {"error": {
+                        "message": "Rate limit reached for requests (fake server)",
+                        "type": "requests",
+                        "code": "rate_limit_exceeded",
+                    }}, {"Retry-After": f"{server.retry_after:g}"})
+                    return
+
+                inputs = body.get("input", [])
+                count = 1 if isinstance(inputs, str) else len(inputs)
+                time.sleep((server.latency_ms + server.per_input_ms * count + jitter) / 1000)
+                self._send(200, server.embed_response(body))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    # ========================================================================
+    # 실행 제어
+    # ========================================================================
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="결정적 가짜 OpenAI 임베딩 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM, help="기본 벡터 차원 (요청의 dimensions가 우선)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="요청당 기본 지연")
+    parser.add_argument("--per-input-ms", type=float, default=0.0, help="입력 텍스트당 추가 지연")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="0~지정값 사이 무작위 추가 지연 (시드 고정)")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="N번째 요청마다 429 반환 (0이면 끔)")
+    parser.add_argument("--rpm", type=int, default=0, help="분당 허용 요청 수, 초과 시 429 (0이면 무제한)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429 응답의 Retry-After (초)")
+    args = parser.parse_args()
+
+    server = FakeEmbeddingServer(args.host, args.port, args.dim, args.latency_ms, args.per_input_ms,
+                                 args.jitter_ms, args.rate_limit_every, args.rpm, args.retry_after)
+    print(f"🧪 가짜 임베딩 서버 시작: {server.base_url}/embeddings")
+    print(f"   OPENAI_BASE_URL={server.base_url} 로 설정하면 생성기/서비스가 이 서버를 사용합니다")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 요청 {server.stats['requests']}회, 429 {server.stats['rate_limited']}회, 입력 {server.stats['inputs']}개")
+
+
+if __name__ == "__main__":
+    main()
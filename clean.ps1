@@ -22,5 +22,8 @@ docker system prune -f
 
 Write-Host "`n✅ Clean reset complete!" -ForegroundColor Green
 Write-Host "💡 Run .\setup.ps1 to reinstall everything" -ForegroundColor Cyan
+if (Test-Path "snapshots/index-*") {
+    Write-Host "📦 Index snapshots in ./snapshots were kept - setup.ps1 will restore them instead of re-uploading" -ForegroundColor Cyan
+}
 
 Read-Host "Press Enter to continue"
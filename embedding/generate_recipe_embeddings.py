@@ -1,29 +1,24 @@
+import argparse
 import json
-import openai
+import sys
 from datetime import datetime
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
-import time
 
 # .env 파일에서 환경변수 로드
 load_dotenv()
 
-# OpenAI API 키 설정
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 # 절대 경로로 수정
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from app.core import config, serialization
+from app.core.metrics import print_summary
+from app.services.embedding_providers import embed_isolating_failures, get_provider, write_embedding_metadata
+from app.services.ingredient_synonyms import recipe_ingredient_ids
+
 INPUT_FILE = os.path.join(BASE_DIR, "data", "recipe_embedding_input.json")
 OUTPUT_FILE = os.path.join(BASE_DIR, "data", "recipe_embeddings.json")
-MODEL = "text-embedding-3-small"  # 1536차원 벡터
-
-# API 요청 간 딜레이 (초)
-REQUEST_DELAY = 0.5
-# 최대 재시도 횟수
-MAX_RETRIES = 3
-# 재시도 간 딜레이 (초)
-RETRY_DELAY = 5
 
 def create_embedding_text(recipe):
     """임베딩용 텍스트 생성 (레시피 핵심 정보 조합)"""
@@ -35,67 +30,114 @@ def create_embedding_text(recipe):
 해시태그: {recipe['hash_tag']}
 """.strip()
 
-def generate_recipe_embeddings_file():
-    """레시피 임베딩 생성 및 JSON 파일 저장"""
+def iter_input_records(input_file):
+    """
+    입력 레코드를 읽습니다.
+    .ndjson 파일이나 '-'(표준 입력)는 한 줄씩 스트리밍하고, 그 외에는 JSON 배열로 읽습니다.
+    """
+    if input_file == "-":
+        for line in sys.stdin:
+            if line.strip():
+                yield json.loads(line)
+        return
+
+    with open(input_file, 'r', encoding='utf-8') as f:
+        if input_file.endswith(".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+def iter_batches(records, size):
+    """레코드 스트림을 size개씩 묶습니다."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def embed_batch(provider, batch):
+    """묶음 하나를 임베딩해 저장할 문서 목록을 만듭니다. 묶음이 실패하면 한 건씩 다시 시도하고 실패한 레시피만 건너뜁니다."""
+    texts = [create_embedding_text(recipe) for recipe in batch]
+    embeddings, failures = embed_isolating_failures(provider, texts)
+    for position, e in failures:
+        print(f"오류 발생: {batch[position]['recipe_id']} - {e}")
+
+    # 재료 조합 검색(terms_set / term 필터)용 정확한 재료 ID 배열 (입력에 없으면 재료명을 재료 ID 표로 변환)
+    ingredient_ids = [recipe_ingredient_ids(recipe) for recipe in batch]
+    return [
+        {
+            "recipe_id": recipe["recipe_id"],
+            "name": recipe["recipe_name"],
+            "embedding": embedding,
+            "ingredients": recipe["processed_ingredients"],
+            "ingredient_ids": ids,
+            "ingredient_count": len(ids),
+            "category": recipe["rcp_category"],
+            "cooking_method": recipe["rcp_way2"],
+            "hashtag": recipe["hash_tag"],
+            "embedding_text": text,
+            "created_at": datetime.now().isoformat()
+        }
+        for recipe, text, embedding, ids in zip(batch, texts, embeddings, ingredient_ids)
+        if embedding is not None
+    ]
+
+def generate_recipe_embeddings_file(recipes=None, output_file=OUTPUT_FILE):
+    """
+    레시피 임베딩 생성 및 JSON 파일 저장
+    recipes를 주면 (예: DB 스트림) 입력 파일 대신 그대로 사용합니다.
+    """
 
     # 1. 입력 파일 로드
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-        recipes = json.load(f)
+    if recipes is None:
+        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+            recipes = json.load(f)
 
+    total = len(recipes) if hasattr(recipes, '__len__') else '?'
     output_data = []
 
-    for i, recipe in enumerate(recipes):
-        print(f"[{i+1}/{len(recipes)}] {recipe['recipe_name']} 처리 중...")
-
-        # 2. 임베딩용 텍스트 생성
-        text = create_embedding_text(recipe)
-
-        # 재시도 로직
-        for retry in range(MAX_RETRIES):
-            try:
-                # 3. OpenAI Embedding API 호출
-                response = client.embeddings.create(
-                    input=text,
-                    model=MODEL
-                )
-                embedding = response.data[0].embedding
-
-                # 4. 저장할 구조
-                doc = {
-                    "recipe_id": recipe["recipe_id"],
-                    "name": recipe["recipe_name"],
-                    "embedding": embedding,
-                    "ingredients": recipe["processed_ingredients"],
-                    "category": recipe["rcp_category"],
-                    "cooking_method": recipe["rcp_way2"],
-                    "hashtag": recipe["hash_tag"],
-                    "embedding_text": text,
-                    "created_at": datetime.now().isoformat()
-                }
-
-                output_data.append(doc)
-                
-                # 성공적으로 처리된 경우 딜레이 후 다음 요청
-                time.sleep(REQUEST_DELAY)
-                break
-
-            except Exception as e:
-                if "rate limit" in str(e).lower():
-                    if retry < MAX_RETRIES - 1:
-                        print(f"Rate limit 도달. {RETRY_DELAY}초 후 재시도... (시도 {retry + 1}/{MAX_RETRIES})")
-                        time.sleep(RETRY_DELAY)
-                    else:
-                        print(f"최대 재시도 횟수 초과: {recipe['recipe_id']} - {e}")
-                else:
-                    print(f"오류 발생: {recipe['recipe_id']} - {e}")
-                    break
-
-    # 5. JSON 파일로 저장
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    # 인덱스에 설정된 제공자(openai / local)로 batch_size개씩 묶어 임베딩
+    provider = get_provider(config.RECIPE_INDEX)
+    print(f"임베딩 제공자: {provider.name} ({provider.model}, {provider.dimension}차원)")
+
+    processed = 0
+    for batch in iter_batches(recipes, provider.batch_size):
+        output_data.extend(embed_batch(provider, batch))
+        processed += len(batch)
+        print(f"[{processed}/{total}] {batch[-1]['recipe_name']} 까지 처리")
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    # 벡터 직렬화가 대부분이므로 공용 직렬화기(orjson 우선)로 바이트를 바로 기록
+    with open(output_file, 'wb') as f:
+        if output_file.endswith('.ndjson'):
+            # 업로드 스크립트가 줄 단위로 나눠 병렬 파싱·검증할 수 있는 형식
+            serialization.dump_lines(output_data, f)
+        else:
+            serialization.dump(output_data, f, indent=True)
+    # 업로드 시 검증/매핑 차원이 따라가도록 제공자·모델·차원 기록
+    write_embedding_metadata(output_file, provider)
 
     print(f"\n총 {len(output_data)}개 레시피 임베딩 생성 완료!")
-    print(f"저장 파일: {OUTPUT_FILE}")
+    print(f"저장 파일: {output_file}")
+    # API 호출별 지연 / 재시도
+    print_summary("임베딩 API 호출 시간")
 
 if __name__ == "__main__":
-    generate_recipe_embeddings_file()
+    parser = argparse.ArgumentParser(description="레시피 임베딩 생성")
+    parser.add_argument("--input", help="입력 파일 (.json / .ndjson, '-'이면 표준 입력 NDJSON)")
+    parser.add_argument("--from-db", action="store_true", help="중간 파일 없이 DB에서 바로 스트리밍")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="임베딩 출력 파일 (.ndjson이면 한 줄에 문서 하나)")
+    args = parser.parse_args()
+
+    if args.from_db:
+        from scripts.export_recipe_embedding_input import iter_recipes
+        generate_recipe_embeddings_file(iter_recipes(), args.output)
+    elif args.input:
+        generate_recipe_embeddings_file(iter_input_records(args.input), args.output)
+    else:
+        generate_recipe_embeddings_file(output_file=args.output)
@@ -0,0 +1,66 @@
+# ============================================================================
+# 재료 x 레시피 친화도 행렬 사전 계산 스크립트
+# ============================================================================
+# 목적: 재료 임베딩과 레시피 임베딩의 코사인 유사도에 실제 포함 여부(processed_ingredients)를
+#       섞은 친화도를 재료당 상위 N개만 희소(CSR)로 저장
+#       단일/다중 재료 추천을 script_score 전체 스캔 없이 희소 행 합으로 처리
+# 사용법: python build_affinity_matrix.py [--top-n 200] [--membership-weight 0.5]
+# ============================================================================
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.services.affinity_matrix import (
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_MEMBERSHIP_WEIGHT,
+    DEFAULT_TOP_N,
+    AffinityMatrix,
+)
+from app.services.vector_store import VectorStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재료 x 레시피 친화도 행렬 생성")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N, help="재료당 보관할 레시피 수")
+    parser.add_argument("--membership-weight", type=float, default=DEFAULT_MEMBERSHIP_WEIGHT,
+                        help="레시피에 실제 포함된 재료에 주는 가중치 (0~1)")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="한 번에 계산할 재료 수")
+    args = parser.parse_args()
+
+    for path in (config.RECIPE_EMBEDDINGS_FILE, config.INGREDIENT_EMBEDDINGS_FILE):
+        if not os.path.exists(path):
+            print(f"❌ 임베딩 파일 없음: {path}")
+            return
+
+    print("🧮 재료 x 레시피 친화도 행렬 생성 시작")
+    recipe_store = VectorStore.from_json(config.RECIPE_EMBEDDINGS_FILE, 'recipe_id')
+    ingredient_store = VectorStore.from_json(config.INGREDIENT_EMBEDDINGS_FILE, 'ingredient_id')
+    print(f"   - 재료: {len(ingredient_store)}개, 레시피: {len(recipe_store)}개")
+
+    start_time = time.time()
+    affinity = AffinityMatrix.build(
+        ingredient_store,
+        recipe_store,
+        top_n=args.top_n,
+        membership_weight=args.membership_weight,
+        block_size=args.block_size,
+    )
+    elapsed = time.time() - start_time
+
+    os.makedirs(os.path.dirname(config.AFFINITY_MATRIX_FILE), exist_ok=True)
+    affinity.save(config.AFFINITY_MATRIX_FILE)
+
+    rows, cols = affinity.shape
+    print(f"✅ 친화도 행렬 저장: {config.AFFINITY_MATRIX_FILE}")
+    print(f"   - 크기: {rows} x {cols}, 저장된 값: {len(affinity.values)}개")
+    print(f"   - 메모리: {affinity.nbytes / 1024:.1f} KB (밀집 행렬이면 {rows * cols * 4 / 1024:.1f} KB)")
+    print(f"   - 소요 시간: {elapsed:.2f}초")
+
+
+if __name__ == "__main__":
+    main()
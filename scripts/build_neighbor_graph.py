@@ -0,0 +1,73 @@
+# ============================================================================
+# 레시피/재료 최근접 이웃 그래프 사전 계산 스크립트
+# ============================================================================
+# 목적: 임베딩 행렬에서 문서별 상위 K개 이웃을 미리 계산해 CSR(int32) 파일로 저장
+#       "비슷한 레시피" 조회를 매번 전체 인덱스 재채점 없이 O(1) 조회로 대체
+# 사용법: python build_neighbor_graph.py [--k 50] [--block-size 256] [--full]
+#         기존 그래프 파일이 있으면 바뀐 임베딩만 다시 계산합니다 (--full이면 전체 재계산)
+# ============================================================================
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.services.neighbor_graph import DEFAULT_BLOCK_SIZE, NeighborGraph
+from app.services.vector_store import VectorStore
+
+TARGETS = [
+    ("레시피", config.RECIPE_EMBEDDINGS_FILE, "recipe_id", config.RECIPE_NEIGHBORS_FILE),
+    ("재료", config.INGREDIENT_EMBEDDINGS_FILE, "ingredient_id", config.INGREDIENT_NEIGHBORS_FILE),
+]
+
+
+def build_graph(label, embeddings_file, id_field, output_file, k, block_size, full):
+    """임베딩 파일 하나에 대한 이웃 그래프를 생성(또는 증분 갱신)하고 저장합니다."""
+    if not os.path.exists(embeddings_file):
+        print(f"❌ {label} 임베딩 파일 없음: {embeddings_file}")
+        return
+
+    print(f"\n📁 {label} 임베딩 로드: {embeddings_file}")
+    store = VectorStore.from_json(embeddings_file, id_field)
+    print(f"   - 문서 수: {len(store)}, 차원: {store.dimension}")
+
+    start_time = time.time()
+    if not full and os.path.exists(output_file):
+        previous = NeighborGraph.load(output_file)
+        if previous.k != k:
+            print(f"   ⚠️ K 변경 ({previous.k} → {k}), 전체 재계산")
+            graph = NeighborGraph.build(store.ids, store.matrix, k, block_size)
+            recomputed = len(store)
+        else:
+            graph, recomputed = previous.update(store.ids, store.matrix, block_size)
+    else:
+        graph = NeighborGraph.build(store.ids, store.matrix, k, block_size)
+        recomputed = len(store)
+    elapsed = time.time() - start_time
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    graph.save(output_file)
+
+    size_kb = os.path.getsize(output_file) / 1024
+    print(f"✅ {label} 이웃 그래프 저장: {output_file}")
+    print(f"   - 전체 재계산 행: {recomputed}/{len(store)}")
+    print(f"   - 소요 시간: {elapsed:.2f}초, 파일 크기: {size_kb:.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="레시피/재료 최근접 이웃 그래프 생성")
+    parser.add_argument("--k", type=int, default=50, help="문서당 저장할 이웃 수")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="한 번에 계산할 행 수")
+    parser.add_argument("--full", action="store_true", help="기존 그래프를 무시하고 전체 재계산")
+    args = parser.parse_args()
+
+    print("🕸️ 최근접 이웃 그래프 생성 시작")
+    for label, embeddings_file, id_field, output_file in TARGETS:
+        build_graph(label, embeddings_file, id_field, output_file, args.k, args.block_size, args.full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# ============================================================================
+# 메모리 매핑 벡터 저장소 생성 스크립트
+# ============================================================================
+# 목적: 임베딩 JSON을 정규화된 float32 .npy 행렬 + ID/메타데이터 JSON으로 변환
+#       API 서버와 테스트 스크립트가 문서 ID로 벡터를 바로 조회하도록
+#       (OpenSearch에서 embedding을 받아와 다시 보내는 왕복 제거)
+# 사용법: python build_vector_store.py
+#         임베딩 파일을 다시 생성하면 이 스크립트도 다시 실행하세요 (오래된 파일은 무시됨)
+# ============================================================================
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.services.vector_store import VectorStore
+
+TARGETS = [
+    ("레시피", config.RECIPE_EMBEDDINGS_FILE, "recipe_id", config.RECIPE_VECTORS_FILE),
+    ("재료", config.INGREDIENT_EMBEDDINGS_FILE, "ingredient_id", config.INGREDIENT_VECTORS_FILE),
+]
+
+
+def build_store(label, embeddings_file, id_field, output_file):
+    if not os.path.exists(embeddings_file):
+        print(f"❌ {label} 임베딩 파일 없음: {embeddings_file}")
+        return
+
+    print(f"\n📁 {label} 임베딩 로드: {embeddings_file}")
+    start_time = time.time()
+    store = VectorStore.from_json(embeddings_file, id_field)
+    load_time = time.time() - start_time
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    store.save(output_file)
+
+    start_time = time.time()
+    VectorStore.load(output_file)
+    open_time = time.time() - start_time
+
+    size_mb = (os.path.getsize(output_file) + os.path.getsize(VectorStore.docs_path(output_file))) / 1024 / 1024
+    print(f"✅ {label} 벡터 저장소 저장: {output_file}")
+    print(f"   - 문서 수: {len(store)}, 차원: {store.dimension}, 크기: {size_mb:.1f} MB")
+    print(f"   - 로드 시간: JSON {load_time:.2f}초 → 메모리 매핑 {open_time:.3f}초")
+
+
+def main():
+    print("🗂️ 메모리 매핑 벡터 저장소 생성 시작")
+    for target in TARGETS:
+        build_store(*target)
+
+
+if __name__ == "__main__":
+    main()
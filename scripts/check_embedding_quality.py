@@ -0,0 +1,135 @@
+# ============================================================================
+# 임베딩 품질 / 분포 변화(drift) 점검 스크립트
+# ============================================================================
+# 목적: 업로드 전에 임베딩 파일을 점검해 JSON 보고서로 남김
+#       - 노름 분포, 0 벡터, NaN/Inf 벡터
+#       - 완전 중복 / 거의 같은 벡터 (빈 hash_tag·반복 텍스트로 같은 벡터가 나오는 경우)
+#       - 이전 버전 프로필 대비 중심 벡터·분포 이동, 추가/삭제/변경 문서 수
+#       모든 유사도 계산은 블록 단위 행렬 곱이라 전체 카탈로그도 수 초 내에 끝남
+# 사용법: python check_embedding_quality.py [recipes|ingredients|all] [--input FILE]
+#         [--save-profile] [--fail-on-warn] [--threshold 0.995]
+#         업로드가 끝난 뒤 --save-profile로 실행하면 다음 점검의 비교 기준이 됩니다
+# ============================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.core.serialization import load, loads
+from app.services.embedding_quality import (
+    DEFAULT_BLOCK_SIZE,
+    NEAR_DUPLICATE_THRESHOLD,
+    EmbeddingProfile,
+    analyze_embeddings,
+)
+from app.services.embedding_providers import read_embedding_metadata
+from app.services.embedding_validation import embedding_matrix
+
+TARGETS = {
+    "recipes": ("레시피", config.RECIPE_EMBEDDINGS_FILE, "recipe_id"),
+    "ingredients": ("재료", config.INGREDIENT_EMBEDDINGS_FILE, "ingredient_id"),
+}
+
+
+def load_records(path):
+    """임베딩 파일(.json 배열 / .ndjson)을 읽습니다."""
+    with open(path, 'rb') as f:
+        if path.endswith('.ndjson'):
+            return [loads(line) for line in f if line.strip()]
+        return load(f)
+
+
+def check_target(name, input_file, save_profile, threshold, block_size):
+    """임베딩 파일 하나를 점검하고 보고서를 저장합니다. 보고서 dict를 반환합니다."""
+    label, default_file, id_field = TARGETS[name]
+    input_file = input_file or default_file
+    if not os.path.exists(input_file):
+        print(f"❌ {label} 임베딩 파일 없음: {input_file}")
+        return None
+
+    print(f"\n📁 {label} 임베딩 점검: {input_file}")
+    start_time = time.time()
+    records = load_records(input_file)
+    # 차원은 파일 옆 .meta.json 기준 (local 제공자면 384, 업로드 스크립트의 검증과 같음)
+    dimension = read_embedding_metadata(input_file)["dimension"]
+    matrix, rows, malformed = embedding_matrix(records, dimension)
+    ids = [str(records[row].get(id_field)) for row in rows]
+    load_seconds = time.time() - start_time
+
+    profile_file = os.path.join(config.QUALITY_DIR, f"{name}_profile.npz")
+    previous = EmbeddingProfile.load(profile_file) if os.path.exists(profile_file) else None
+
+    start_time = time.time()
+    report, profile = analyze_embeddings(ids, matrix, previous, threshold, block_size)
+    analyze_seconds = time.time() - start_time
+
+    report["input_file"] = input_file
+    report["malformed"] = len(malformed)
+    if malformed:
+        report["warnings"].append(f"차원/타입 오류 문서 {len(malformed)}개")
+        report["status"] = "warn"
+    report["baseline"] = profile_file if previous is not None else None
+    report["timing_seconds"] = {"load": round(load_seconds, 3), "analyze": round(analyze_seconds, 3)}
+
+    os.makedirs(config.QUALITY_DIR, exist_ok=True)
+    report_file = os.path.join(config.QUALITY_DIR, f"{name}_report.json")
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    duplicates = report["duplicates"]
+    print(f"   - 문서 수: {report['count']}, 차원: {report['dimension']}, 형식 오류: {len(malformed)}")
+    print(f"   - 노름: 평균 {report['norms']['mean']:.4f}, 최소 {report['norms'].get('p0', 0):.4f}, "
+          f"최대 {report['norms'].get('p100', 0):.4f}")
+    print(f"   - 0 벡터: {len(report['invalid']['zero_ids'])}개, NaN/Inf: {len(report['invalid']['nonfinite_ids'])}개")
+    print(f"   - 완전 중복: {duplicates['exact_groups']}개 그룹 ({duplicates['exact_docs']}개 문서), "
+          f"유사도 ≥ {threshold}: {duplicates['near_pairs']}쌍")
+    if "drift" in report:
+        drift = report["drift"]
+        documents = drift["documents"]
+        if "centroid_cosine" in drift:
+            print(f"   - 이전 버전 대비 중심 벡터 코사인: {drift['centroid_cosine']:.4f}")
+        print(f"   - 문서 변화: 추가 {documents['added']}, 삭제 {documents['removed']}, "
+              f"변경 {documents['changed']}, 동일 {documents['unchanged']}")
+    else:
+        print("   - 이전 버전 프로필 없음 (비교 생략)")
+    print(f"   - 소요 시간: 로드 {load_seconds:.2f}초, 분석 {analyze_seconds:.2f}초")
+
+    for warning in report["warnings"]:
+        print(f"   ⚠️ {warning}")
+    print(f"{'✅' if report['status'] == 'ok' else '⚠️'} 보고서 저장: {report_file}")
+
+    if save_profile:
+        profile.save(profile_file)
+        print(f"💾 비교 기준 프로필 저장: {profile_file}")
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 품질 및 분포 변화 점검")
+    parser.add_argument("target", nargs="?", default="all", choices=["recipes", "ingredients", "all"])
+    parser.add_argument("--input", help="점검할 임베딩 파일 (단일 대상일 때만)")
+    parser.add_argument("--save-profile", action="store_true", help="이번 결과를 다음 비교 기준으로 저장")
+    parser.add_argument("--fail-on-warn", action="store_true", help="경고가 있으면 종료 코드 1")
+    parser.add_argument("--threshold", type=float, default=NEAR_DUPLICATE_THRESHOLD, help="근접 중복 코사인 기준")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="한 번에 계산할 행 수")
+    args = parser.parse_args()
+
+    names = list(TARGETS) if args.target == "all" else [args.target]
+    if args.input and len(names) > 1:
+        parser.error("--input은 recipes 또는 ingredients와 함께 사용하세요")
+
+    print("🔬 임베딩 품질 점검 시작")
+    reports = [check_target(name, args.input, args.save_profile, args.threshold, args.block_size) for name in names]
+
+    if args.fail_on_warn and any(report is None or report["status"] != "ok" for report in reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
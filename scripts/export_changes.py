@@ -0,0 +1,258 @@
+# ============================================================================
+# 변경분(CDC) 추출 스크립트 - updated_at 워터마크 기반
+# ============================================================================
+# 목적: 지난 성공 실행 이후 바뀐 레시피/재료만 추출해 임베딩·업로드 단계용 변경 세트 생성
+#       - recipes / ingredients / recipe_ingredients의 updated_at >= 워터마크인 행
+#       - 재료 연결이 바뀐 레시피, 이름/카테고리가 바뀐 재료를 쓰는 레시피도 포함
+#       - 연결만 삭제된 경우(updated_at이 남지 않음)는 레시피별 연결 수 비교로 감지
+#       - 삭제된 레시피/재료는 이전 실행의 ID 목록과 비교해 deletes로 기록
+# 사용법: python export_changes.py [--output-dir data/changes] [--state data/export_state.json]
+#         첫 실행(상태 파일 없음)은 전체를 변경분으로 내보냅니다. --reset으로 다시 전체 추출
+# 출력:   recipe_upserts.ndjson / ingredient_upserts.ndjson → generate_*_embeddings.py --input
+#         deletes.json → upload_to_opensearch*.py changes
+# ============================================================================
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import pymysql
+from dotenv import load_dotenv
+
+from export_ingredient_embedding_input import attach_aliases, load_alias_dict, write_ndjson
+from export_recipe_embedding_input import group_recipe_rows
+
+# .env 파일에서 환경변수 로드
+load_dotenv()
+
+# 환경변수에서 DB 설정 가져오기
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "db": os.getenv("DB_NAME"),
+    "charset": "utf8mb4"
+}
+
+STATE_FILE = "data/export_state.json"
+OUTPUT_DIR = "data/changes"
+
+# IN (...) 절 하나에 넣을 최대 ID 수
+ID_CHUNK_SIZE = 500
+
+
+# ============================================================================
+# DB 헬퍼 (pymysql / sqlite3 모두 동작하도록 DB-API만 사용)
+# ============================================================================
+
+def query(conn, sql, params=(), placeholder="%s"):
+    """쿼리를 실행하고 dict 목록을 반환합니다. SQL의 %s는 placeholder로 바뀝니다."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql.replace("%s", placeholder), tuple(params))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def chunked(values, size=ID_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def in_clause(values):
+    return "(" + ", ".join(["%s"] * len(values)) + ")"
+
+
+# ============================================================================
+# 상태 파일
+# ============================================================================
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_FILE):
+    """중간에 실패해도 이전 상태가 남도록 임시 파일에 쓴 뒤 교체합니다."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ============================================================================
+# 변경 감지
+# ============================================================================
+
+def collect_changes(conn, state, placeholder="%s"):
+    """
+    이전 상태와 비교해 변경 세트와 다음 상태를 계산합니다.
+
+    워터마크는 조회된 행의 최대 updated_at입니다. 같은 시각에 커밋된 행을 놓치지 않도록
+    >= 로 비교하고, 워터마크 시각에 이미 내보낸 행의 키(boundary)는 다음 실행에서 건너뜁니다.
+    """
+    state = state or {}
+    watermarks = state.get("watermarks", {})
+    boundaries = state.get("boundaries", {})
+    q = lambda sql, params=(): query(conn, sql, params, placeholder)
+
+    def changed_rows(table, columns, key):
+        where, params = "", ()
+        if watermarks.get(table) is not None:
+            where, params = " WHERE updated_at >= %s", (watermarks[table],)
+        rows = q(f"SELECT {columns}, updated_at FROM {table}{where}", params)
+        seen = set(boundaries.get(table, []))
+        return [
+            row for row in rows
+            if not (str(row["updated_at"]) == watermarks.get(table) and key(row) in seen)
+        ], rows
+
+    changed_recipes, recipe_rows = changed_rows("recipes", "rcp_seq", lambda row: str(row["rcp_seq"]))
+    changed_ingredients, ingredient_rows = changed_rows("ingredients", "id", lambda row: str(row["id"]))
+    link_key = lambda row: f"{row['recipe_id']}:{row['ingredient_id']}"
+    changed_links, link_rows = changed_rows("recipe_ingredients", "recipe_id, ingredient_id", link_key)
+
+    recipe_ids = {row["rcp_seq"] for row in changed_recipes}
+    recipe_ids |= {row["recipe_id"] for row in changed_links}
+    ingredient_ids = {row["id"] for row in changed_ingredients}
+
+    # 이름/카테고리가 바뀐 재료를 쓰는 레시피는 임베딩 텍스트가 바뀜
+    for chunk in chunked(ingredient_ids):
+        rows = q(f"SELECT DISTINCT recipe_id FROM recipe_ingredients WHERE ingredient_id IN {in_clause(chunk)}", chunk)
+        recipe_ids |= {row["recipe_id"] for row in rows}
+
+    # 연결 삭제 감지: 레시피별 연결 수 비교 (삽입/수정은 updated_at으로 이미 잡힘)
+    link_counts = {
+        str(row["recipe_id"]): row["n"]
+        for row in q("SELECT recipe_id, COUNT(*) AS n FROM recipe_ingredients GROUP BY recipe_id")
+    }
+    previous_counts = state.get("link_counts")
+    if previous_counts is not None:
+        for key in set(previous_counts) | set(link_counts):
+            if previous_counts.get(key, 0) != link_counts.get(key, 0):
+                recipe_ids.add(key)
+
+    # 삭제된 레시피/재료 감지
+    current_recipe_ids = {str(row["rcp_seq"]) for row in q("SELECT rcp_seq FROM recipes")}
+    current_ingredient_ids = {str(row["id"]) for row in q("SELECT id FROM ingredients")}
+    deleted_recipes = sorted(set(state.get("recipe_ids", [])) - current_recipe_ids)
+    deleted_ingredients = sorted(set(state.get("ingredient_ids", [])) - current_ingredient_ids)
+
+    # 삭제된 레시피는 upsert 대상에서 제외
+    recipe_ids = {str(recipe_id) for recipe_id in recipe_ids} & current_recipe_ids
+    ingredient_ids = {str(ingredient_id) for ingredient_id in ingredient_ids} & current_ingredient_ids
+
+    next_watermarks = dict(watermarks)
+    next_boundaries = dict(boundaries)
+    for table, rows, key in (("recipes", recipe_rows, lambda row: str(row["rcp_seq"])),
+                             ("ingredients", ingredient_rows, lambda row: str(row["id"])),
+                             ("recipe_ingredients", link_rows, link_key)):
+        if rows:
+            latest = str(max(row["updated_at"] for row in rows))
+            next_watermarks[table] = latest
+            next_boundaries[table] = sorted(key(row) for row in rows if str(row["updated_at"]) == latest)
+
+    next_state = {
+        "watermarks": next_watermarks,
+        "boundaries": next_boundaries,
+        "link_counts": link_counts,
+        "recipe_ids": sorted(current_recipe_ids),
+        "ingredient_ids": sorted(current_ingredient_ids),
+        "last_run_at": datetime.now().isoformat(),
+    }
+    changes = {
+        "recipe_ids": sorted(recipe_ids),
+        "ingredient_ids": sorted(ingredient_ids),
+        "deleted_recipe_ids": deleted_recipes,
+        "deleted_ingredient_ids": deleted_ingredients,
+    }
+    return changes, next_state
+
+
+def fetch_recipe_records(conn, recipe_ids, placeholder="%s"):
+    """변경된 레시피를 export_recipe_embedding_input.py와 같은 형태로 조회합니다."""
+    for chunk in chunked(recipe_ids):
+        rows = query(conn, f"""
+            SELECT
+                r.rcp_seq AS recipe_id,
+                r.rcp_nm AS recipe_name,
+                r.rcp_category,
+                r.rcp_way2,
+                r.hash_tag,
+                i.id AS ingredient_id,
+                i.name AS ingredient_name
+            FROM recipes r
+            LEFT JOIN recipe_ingredients ri ON r.rcp_seq = ri.recipe_id
+            LEFT JOIN ingredients i ON ri.ingredient_id = i.id
+            WHERE r.rcp_seq IN {in_clause(chunk)}
+            ORDER BY r.rcp_seq, i.name
+        """, chunk, placeholder)
+        yield from group_recipe_rows(rows)
+
+
+def fetch_ingredient_records(conn, ingredient_ids, alias_dict, placeholder="%s"):
+    """변경된 재료를 export_ingredient_embedding_input.py와 같은 형태로 조회합니다."""
+    for chunk in chunked(ingredient_ids):
+        rows = query(conn, f"SELECT id, name, category FROM ingredients WHERE id IN {in_clause(chunk)}",
+                     chunk, placeholder)
+        for row in rows:
+            yield attach_aliases(row, alias_dict)
+
+
+def export_changes(conn, state_file=STATE_FILE, output_dir=OUTPUT_DIR, alias_dict=None,
+                   placeholder="%s", reset=False):
+    """변경 세트를 파일로 쓰고, 모두 성공한 뒤에만 워터마크 상태를 저장합니다."""
+    state = None if reset else load_state(state_file)
+    changes, next_state = collect_changes(conn, state, placeholder)
+    alias_dict = load_alias_dict() if alias_dict is None else alias_dict
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "recipe_upserts.ndjson"), "w", encoding="utf-8") as f:
+        recipe_count = write_ndjson(fetch_recipe_records(conn, changes["recipe_ids"], placeholder), f)
+    with open(os.path.join(output_dir, "ingredient_upserts.ndjson"), "w", encoding="utf-8") as f:
+        ingredient_count = write_ndjson(
+            fetch_ingredient_records(conn, changes["ingredient_ids"], alias_dict, placeholder), f
+        )
+    with open(os.path.join(output_dir, "deletes.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "recipes": changes["deleted_recipe_ids"],
+            "ingredients": changes["deleted_ingredient_ids"],
+        }, f, ensure_ascii=False, indent=2)
+
+    save_state(next_state, state_file)
+    return {
+        "full_export": state is None,
+        "recipe_upserts": recipe_count,
+        "ingredient_upserts": ingredient_count,
+        "recipe_deletes": len(changes["deleted_recipe_ids"]),
+        "ingredient_deletes": len(changes["deleted_ingredient_ids"]),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="updated_at 워터마크 기반 변경분 추출")
+    parser.add_argument("--state", default=STATE_FILE, help="워터마크 상태 파일")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="변경 세트 출력 디렉터리")
+    parser.add_argument("--reset", action="store_true", help="상태를 무시하고 전체를 변경분으로 추출")
+    args = parser.parse_args()
+
+    conn = pymysql.connect(**DB_CONFIG)
+    try:
+        summary = export_changes(conn, args.state, args.output_dir, reset=args.reset)
+    except Exception as e:
+        print(f"❌ 변경분 추출 실패 (워터마크는 갱신되지 않음): {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    print(f"✅ 변경분 추출 완료{' (첫 실행: 전체)' if summary['full_export'] else ''}: {args.output_dir}")
+    print(f"   - 레시피 upsert: {summary['recipe_upserts']}개, 삭제: {summary['recipe_deletes']}개")
+    print(f"   - 재료 upsert: {summary['ingredient_upserts']}개, 삭제: {summary['ingredient_deletes']}개")
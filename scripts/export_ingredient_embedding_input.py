@@ -1,6 +1,8 @@
+import argparse
 import pymysql
 import json
 import os
+import sys
 from dotenv import load_dotenv
 
 # .env 파일에서 환경변수 로드
@@ -16,39 +18,117 @@ DB_CONFIG = {
     "cursorclass": pymysql.cursors.DictCursor
 }
 
-# 1. DB 연결
-conn = pymysql.connect(**DB_CONFIG)
+ALIASES_FILE = "data/ingredient_aliases_nested.json"
+OUTPUT_FILE = "data/ingredient_embedding_input.json"
+NDJSON_OUTPUT_FILE = "data/ingredient_embedding_input.ndjson"
 
-# 2. ingredients 테이블에서 id, name, category 조회
-with conn.cursor() as cursor:
-    cursor.execute("SELECT id, name, category FROM ingredients")
-    ingredients = cursor.fetchall()
+# 서버 측 커서에서 한 번에 가져올 행 수
+FETCH_CHUNK_SIZE = 1000
 
-conn.close()
+sql = "SELECT id, name, category FROM ingredients"
 
-# 3. 동의어 사전 로드 (data/ingredient_aliases_nested.json)
-with open("data/ingredient_aliases_nested.json", "r", encoding="utf-8") as f:
-    alias_dict = json.load(f)
 
-# 4. name과 category 기준으로 aliases 붙이기
-output = []
-for item in ingredients:
+def load_alias_dict(path=ALIASES_FILE):
+    """동의어 사전을 로드합니다 (category → name → aliases)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def attach_aliases(item, alias_dict):
+    """name과 category 기준으로 aliases를 붙인 레코드를 만듭니다."""
     std_name = item["name"]
     std_cat = item["category"]
 
     # 동의어 찾기
     aliases = alias_dict.get(std_cat, {}).get(std_name, [])
 
-    output.append({
+    return {
         "id": item["id"],
         "name": std_name,
         "aliases": aliases,
         "category": std_cat
-    })
+    }
+
+
+def fetch_ingredients():
+    """기존 방식: 버퍼 커서로 전체 재료를 한 번에 가져옵니다."""
+    conn = pymysql.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def iter_ingredient_rows(chunk_size=FETCH_CHUNK_SIZE):
+    """서버 측 커서(SSDictCursor)로 재료 행을 chunk_size씩 가져옵니다."""
+    conn = pymysql.connect(**{**DB_CONFIG, "cursorclass": pymysql.cursors.SSDictCursor})
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+    finally:
+        conn.close()
+
+
+def iter_ingredients(chunk_size=FETCH_CHUNK_SIZE, alias_dict=None):
+    """동의어가 붙은 재료 레코드를 한 건씩 스트리밍합니다."""
+    alias_dict = load_alias_dict() if alias_dict is None else alias_dict
+    for item in iter_ingredient_rows(chunk_size):
+        yield attach_aliases(item, alias_dict)
+
+
+def write_ndjson(records, output):
+    """레코드를 한 줄에 하나씩 바로 기록하고 건수를 반환합니다."""
+    count = 0
+    for record in records:
+        output.write(json.dumps(record, ensure_ascii=False, default=str))
+        output.write("\n")
+        count += 1
+    output.flush()
+    return count
+
+
+def export_json(output_file=OUTPUT_FILE):
+    """기존 방식: 전체 목록을 JSON 배열 파일로 저장합니다."""
+    ingredients = fetch_ingredients()
+    alias_dict = load_alias_dict()
+    output = [attach_aliases(item, alias_dict) for item in ingredients]
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+
+    print(f"✅ ingredient_embedding_input.json 생성 완료: {len(output)}개 항목")
+
+
+def export_ndjson(output_file=NDJSON_OUTPUT_FILE, chunk_size=FETCH_CHUNK_SIZE):
+    """스트리밍 방식: NDJSON으로 한 건씩 기록합니다. '-'이면 표준 출력으로 보냅니다."""
+    if output_file == "-":
+        count = write_ndjson(iter_ingredients(chunk_size), sys.stdout)
+        print(f"✅ 재료 NDJSON 스트리밍 완료: {count}개 항목", file=sys.stderr)
+        return
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        count = write_ndjson(iter_ingredients(chunk_size), f)
+
+    print(f"✅ {output_file} 생성 완료: {count}개 항목")
+
 
-# 5. JSON 저장
-os.makedirs("data", exist_ok=True)
-with open("data/ingredient_embedding_input.json", "w", encoding="utf-8") as f:
-    json.dump(output, f, ensure_ascii=False, indent=2)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="재료 임베딩 입력 데이터 추출")
+    parser.add_argument("--ndjson", action="store_true", help="서버 측 커서로 스트리밍하며 NDJSON으로 저장")
+    parser.add_argument("--output", help="출력 경로 ('-'이면 표준 출력, --ndjson 전용)")
+    parser.add_argument("--chunk-size", type=int, default=FETCH_CHUNK_SIZE, help="fetchmany 크기")
+    args = parser.parse_args()
 
-print(f"✅ ingredient_embedding_input.json 생성 완료: {len(output)}개 항목")
+    if args.ndjson:
+        export_ndjson(args.output or NDJSON_OUTPUT_FILE, args.chunk_size)
+    else:
+        export_json(args.output or OUTPUT_FILE)
@@ -1,6 +1,8 @@
+import argparse
 import pymysql
 import json
 import os
+import sys
 from dotenv import load_dotenv
 
 # .env 파일에서 환경변수 로드
@@ -15,36 +17,155 @@ DB_CONFIG = {
     "charset": "utf8mb4"
 }
 
-# 1. DB 연결
-conn = pymysql.connect(
-    **DB_CONFIG,
-    cursorclass=pymysql.cursors.DictCursor
-)
+OUTPUT_FILE = "data/recipe_embedding_input.json"
+NDJSON_OUTPUT_FILE = "data/recipe_embedding_input.ndjson"
 
-# 2. 레시피 + 재료 JOIN → 주재료/부재료 구분
-sql = """
+# 서버 측 커서에서 한 번에 가져올 행 수
+FETCH_CHUNK_SIZE = 1000
+
+# 레시피 + 재료 JOIN: GROUP_CONCAT(group_concat_max_len에서 잘림) 대신 재료 행을 그대로 받아
+# 레시피 단위로 정렬된 순서를 이용해 클라이언트에서 묶음 (버퍼 / 스트리밍 공통)
+streaming_sql = """
 SELECT
     r.rcp_seq AS recipe_id,
     r.rcp_nm AS recipe_name,
-    GROUP_CONCAT(i.name ORDER BY i.name SEPARATOR ', ') AS processed_ingredients,
     r.rcp_category,
     r.rcp_way2,
-    r.hash_tag
+    r.hash_tag,
+    i.id AS ingredient_id,
+    i.name AS ingredient_name
 FROM recipes r
 LEFT JOIN recipe_ingredients ri ON r.rcp_seq = ri.recipe_id
 LEFT JOIN ingredients i ON ri.ingredient_id = i.id
-GROUP BY r.rcp_seq, r.rcp_nm, r.rcp_category, r.rcp_way2, r.hash_tag
+ORDER BY r.rcp_seq, i.name
 """
 
-with conn.cursor() as cursor:
-    cursor.execute(sql)
-    recipes = cursor.fetchall()
 
-conn.close()
+def fetch_recipes():
+    """
+    기존 방식: 버퍼 커서로 전체 레시피를 한 번에 가져옵니다.
+    재료 ID 목록은 GROUP_CONCAT(group_concat_max_len에서 잘려 ID가 빠짐) 대신
+    스트리밍 경로와 같은 재료 행을 받아 group_recipe_rows로 클라이언트에서 묶습니다.
+    """
+    conn = pymysql.connect(
+        **DB_CONFIG,
+        cursorclass=pymysql.cursors.DictCursor
+    )
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(streaming_sql)
+            rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    return list(group_recipe_rows(rows))
+
+
+def iter_recipe_rows(chunk_size=FETCH_CHUNK_SIZE):
+    """서버 측 커서(SSDictCursor)로 레시피-재료 행을 chunk_size씩 가져옵니다."""
+    conn = pymysql.connect(
+        **DB_CONFIG,
+        cursorclass=pymysql.cursors.SSDictCursor
+    )
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(streaming_sql)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+    finally:
+        conn.close()
+
+
+def group_recipe_rows(rows):
+    """
+    recipe_id 순으로 정렬된 레시피-재료 행을 레시피 단위로 묶습니다.
+    GROUP_CONCAT과 같은 형태('a, b, c', 재료가 없으면 None)를 만들되 길이 제한이 없습니다.
+    재료 ID는 같은 순서의 정수 목록(ingredient_ids)으로 함께 모읍니다.
+    """
+    current = None
+    names = []
+    ids = []
+
+    for row in rows:
+        if current is None or row["recipe_id"] != current["recipe_id"]:
+            if current is not None:
+                current["processed_ingredients"] = ", ".join(names) if names else None
+                current["ingredient_ids"] = ids
+                yield current
+            current = {
+                "recipe_id": row["recipe_id"],
+                "recipe_name": row["recipe_name"],
+                "processed_ingredients": None,
+                "ingredient_ids": [],
+                "rcp_category": row["rcp_category"],
+                "rcp_way2": row["rcp_way2"],
+                "hash_tag": row["hash_tag"],
+            }
+            names = []
+            ids = []
+        if row["ingredient_name"] is not None:
+            names.append(row["ingredient_name"])
+        if row.get("ingredient_id") is not None:
+            ids.append(int(row["ingredient_id"]))
+
+    if current is not None:
+        current["processed_ingredients"] = ", ".join(names) if names else None
+        current["ingredient_ids"] = ids
+        yield current
+
+
+def iter_recipes(chunk_size=FETCH_CHUNK_SIZE):
+    """레시피를 한 건씩 스트리밍합니다. 메모리 사용량은 카탈로그 크기와 무관합니다."""
+    return group_recipe_rows(iter_recipe_rows(chunk_size))
+
+
+def write_ndjson(records, output):
+    """레코드를 한 줄에 하나씩 바로 기록하고 건수를 반환합니다."""
+    count = 0
+    for record in records:
+        output.write(json.dumps(record, ensure_ascii=False, default=str))
+        output.write("\n")
+        count += 1
+    output.flush()
+    return count
+
+
+def export_json(output_file=OUTPUT_FILE):
+    """기존 방식: 전체 목록을 JSON 배열 파일로 저장합니다."""
+    recipes = fetch_recipes()
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(recipes, f, ensure_ascii=False, indent=2)
+
+    print(f"recipe_embedding_input.json 생성 완료: {len(recipes)}개 레시피")
+
+
+def export_ndjson(output_file=NDJSON_OUTPUT_FILE, chunk_size=FETCH_CHUNK_SIZE):
+    """스트리밍 방식: NDJSON으로 한 건씩 기록합니다. '-'이면 표준 출력으로 보냅니다."""
+    if output_file == "-":
+        count = write_ndjson(iter_recipes(chunk_size), sys.stdout)
+        print(f"레시피 NDJSON 스트리밍 완료: {count}개 레시피", file=sys.stderr)
+        return
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        count = write_ndjson(iter_recipes(chunk_size), f)
+
+    print(f"{output_file} 생성 완료: {count}개 레시피")
+
 
-# 3. JSON 저장
-os.makedirs("data", exist_ok=True)
-with open("data/recipe_embedding_input.json", "w", encoding="utf-8") as f:
-    json.dump(recipes, f, ensure_ascii=False, indent=2)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="레시피 임베딩 입력 데이터 추출")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="서버 측 커서로 스트리밍하며 NDJSON으로 저장 (GROUP_CONCAT 미사용)")
+    parser.add_argument("--output", help="출력 경로 ('-'이면 표준 출력, --ndjson 전용)")
+    parser.add_argument("--chunk-size", type=int, default=FETCH_CHUNK_SIZE, help="fetchmany 크기")
+    args = parser.parse_args()
 
-print(f"recipe_embedding_input.json 생성 완료: {len(recipes)}개 레시피")
+    if args.ndjson:
+        export_ndjson(args.output or NDJSON_OUTPUT_FILE, args.chunk_size)
+    else:
+        export_json(args.output or OUTPUT_FILE)
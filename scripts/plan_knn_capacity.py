@@ -0,0 +1,167 @@
+# ============================================================================
+# k-NN 네이티브 메모리 용량 계획 / 모니터링 스크립트
+# ============================================================================
+# 목적: nmslib HNSW(m=24, 1536차원) 그래프가 k-NN 서킷 브레이커 예산을 언제 넘는지 미리 계산
+#       - plan    : 문서 수 x 차원 x m x 인코딩으로 그래프 메모리를 추정하고 목표 카탈로그 크기별로 투영,
+#                   예산을 넘으면 노드 메모리 / m / 인코딩 / 차원 / 브레이커 설정별 절감량을 제안
+#                   --live이면 인덱스 매핑·문서 수, 노드 메모리·힙, 브레이커 설정, _plugins/_knn/stats를 읽음
+#       - monitor : _plugins/_knn/stats를 주기적으로 읽어 예산 사용률, eviction, 캐시 미스 증가를 경고
+# 사용법: python plan_knn_capacity.py plan [--live] [--targets 10000 100000 1000000] [--node-memory-gb 8]
+#         python plan_knn_capacity.py monitor [--interval 10] [--warn-percent 80] [--iterations 0]
+# ============================================================================
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.services.knn_capacity import (
+    DEFAULT_BREAKER_LIMIT,
+    DEFAULT_M,
+    ENCODING_BYTES,
+    breaker_budget_bytes,
+    hnsw_bytes,
+    host_memory_bytes,
+    live_indices,
+    live_node_memory,
+    max_docs_within,
+    offline_indices,
+    project,
+    recommendations,
+)
+from app.services.knn_warmup import knn_memory_stats
+from app.services.opensearch_client import create_client
+
+GB = 1024 ** 3
+MB = 1024 ** 2
+INDICES = [config.RECIPE_INDEX, config.INGREDIENT_INDEX]
+
+
+def plan(args):
+    if args.live:
+        client = create_client("search", timeout=30)
+        try:
+            indices = live_indices(client, INDICES)
+            node = live_node_memory(client)
+            memory = knn_memory_stats(client)
+        except Exception as e:
+            print(f"❌ OpenSearch 연결 실패: {e} (오프라인 추정은 --live 없이 실행)")
+            sys.exit(1)
+        node_memory, heap, limit = node["node_memory_bytes"], node["heap_bytes"], node["breaker_limit"]
+        source = f"클러스터 (노드 {node['nodes']}개)"
+    else:
+        indices = offline_indices(args.m, args.encoding, args.dimension)
+        node_memory = int(args.node_memory_gb * GB) if args.node_memory_gb else (host_memory_bytes() or 8 * GB)
+        heap, limit, memory = int(args.heap_gb * GB), args.breaker_limit, None
+        source = "오프라인 추정"
+
+    budget = breaker_budget_bytes(node_memory, heap, limit)
+    print(f"\n🧮 k-NN 네이티브 메모리 계획 ({source})")
+    print(f"   노드 메모리 {node_memory / GB:.1f} GB - 힙 {heap / GB:.1f} GB → "
+          f"브레이커 {limit:.0%} = 그래프 예산 {budget / GB:.2f} GB")
+
+    print(f"\n   {'인덱스':<14}{'문서':>10}{'차원':>7}{'m':>5}{'인코딩':>8}{'복제본':>7}{'추정(MB)':>11}{'단독 최대':>14}")
+    for index in indices:
+        estimate = hnsw_bytes(index["doc_count"], index["dimension"], index["m"], index["encoding"], index["replicas"])
+        fits = max_docs_within(budget, index["dimension"], index["m"], index["encoding"], index["replicas"])
+        print(f"   {index['index']:<14}{index['doc_count']:>10,}{index['dimension']:>7}{index['m']:>5}"
+              f"{index['encoding']:>8}{index['replicas']:>7}{estimate / MB:>11.1f}{fits:>14,}")
+    total = sum(hnsw_bytes(i["doc_count"], i["dimension"], i["m"], i["encoding"], i["replicas"]) for i in indices)
+    print(f"   합계 {total / MB:.1f} MB (예산의 {total / budget:.1%})" if budget else "   ⚠️ 예산이 0입니다")
+
+    if memory is not None:
+        actual = memory["graph_memory_kb"] * 1024
+        print(f"   실제 그래프 메모리 {actual / MB:.1f} MB (캐시 사용률 {memory['graph_memory_percent']:.1f}%, "
+              f"eviction {memory['eviction_count']}회, 브레이커 {'⚠️ 작동' if memory['circuit_breaker_triggered'] else '정상'})")
+        if actual and actual < total * 0.5:
+            print("   💡 추정치보다 훨씬 작으면 아직 올라가지 않은 그래프가 있는 것 (워밍업 후 다시 확인)")
+
+    base_docs = sum(index["doc_count"] for index in indices)
+    print(f"\n📈 카탈로그 확장 투영 (현재 {base_docs:,}개, 인덱스 비율 유지)")
+    for row in project(indices, budget, args.targets, base_docs):
+        ratio = row["budget_ratio"]
+        mark = "✅" if ratio < 0.8 else "⚠️" if ratio < 1.0 else "❌"
+        print(f"   {mark} {row['docs']:>12,}개 → {row['graph_bytes'] / GB:>8.2f} GB (예산의 {ratio:.0%})")
+
+    target = max(args.targets)
+    print(f"\n💡 권장 설정 (목표 {target:,}개)")
+    for line in recommendations(indices, budget, target, node_memory, heap, limit):
+        print(f"   - {line}")
+
+
+def monitor(args):
+    client = create_client("search", timeout=30)
+    previous = None
+    iteration = 0
+    print(f"👀 k-NN 메모리 모니터링 ({args.interval}초 간격, 경고 기준 캐시 사용률 {args.warn_percent}%)")
+    while True:
+        try:
+            memory = knn_memory_stats(client)
+        except Exception as e:
+            print(f"{datetime.now():%H:%M:%S} ❌ stats 조회 실패: {e}")
+            memory = None
+
+        if memory is not None:
+            warnings = []
+            if memory["circuit_breaker_triggered"]:
+                warnings.append("k-NN 서킷 브레이커 작동 (새 그래프 로딩 실패)")
+            if memory["cache_capacity_reached"]:
+                warnings.append("그래프 캐시 용량 도달")
+            if memory["graph_memory_percent"] >= args.warn_percent:
+                warnings.append(f"캐시 사용률 {memory['graph_memory_percent']:.1f}% ≥ {args.warn_percent}%")
+            if previous is not None:
+                evicted = memory["eviction_count"] - previous["eviction_count"]
+                misses = memory["miss_count"] - previous["miss_count"]
+                if evicted > 0:
+                    warnings.append(f"eviction {evicted}회 (내려간 그래프를 다시 읽는 질의가 느려짐)")
+                if misses > 0 and previous["graph_memory_kb"] > 0:
+                    warnings.append(f"캐시 미스 {misses}회 (그래프 재로딩)")
+            per_index = ", ".join(f"{name} {usage['graph_memory_kb'] / 1024:.1f} MB"
+                                  for name, usage in sorted(memory["indices"].items()))
+            status = "⚠️" if warnings else "✅"
+            print(f"{datetime.now():%H:%M:%S} {status} 그래프 {memory['graph_memory_kb'] / 1024:.1f} MB "
+                  f"({memory['graph_memory_percent']:.1f}%) [{per_index}]")
+            for warning in warnings:
+                print(f"           ⚠️ {warning}")
+            previous = memory
+
+        iteration += 1
+        if args.iterations and iteration >= args.iterations:
+            break
+        time.sleep(args.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="k-NN 네이티브 메모리 용량 계획 / 모니터링")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = subparsers.add_parser("plan", help="그래프 메모리 추정과 카탈로그 확장 투영")
+    plan_parser.add_argument("--live", action="store_true", help="클러스터의 매핑/문서 수/노드 메모리/stats 사용")
+    plan_parser.add_argument("--targets", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                             help="투영할 전체 문서 수 (레시피 + 재료)")
+    plan_parser.add_argument("--node-memory-gb", type=float, help="노드 메모리 (기본: 이 머신의 물리 메모리)")
+    plan_parser.add_argument("--heap-gb", type=float, default=2.0, help="JVM 힙 (docker-compose -Xmx2g)")
+    plan_parser.add_argument("--breaker-limit", type=float, default=DEFAULT_BREAKER_LIMIT,
+                             help="knn.memory.circuit_breaker.limit 비율")
+    plan_parser.add_argument("--m", type=int, default=DEFAULT_M)
+    plan_parser.add_argument("--encoding", choices=sorted(ENCODING_BYTES), default="fp32")
+    plan_parser.add_argument("--dimension", type=int, help="임베딩 차원 (기본: 벡터 저장소/임베딩 메타데이터)")
+
+    monitor_parser = subparsers.add_parser("monitor", help="_plugins/_knn/stats 주기 점검")
+    monitor_parser.add_argument("--interval", type=float, default=10)
+    monitor_parser.add_argument("--warn-percent", type=float, default=80)
+    monitor_parser.add_argument("--iterations", type=int, default=0, help="0이면 계속")
+    args = parser.parse_args()
+
+    if args.command == "plan":
+        plan(args)
+    else:
+        monitor(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,23 @@
 import os
-from opensearchpy import OpenSearch
+import sys
 import requests
-import numpy as np
-import json
 
-# 환경 변수 또는 기본값
-OPENSEARCH_HOST = os.getenv("OPENSEARCH_HOST", "localhost")
-OPENSEARCH_PORT = int(os.getenv("OPENSEARCH_PORT", "9201"))
-INDEX_NAME = "recipes"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.services.knn_warmup import format_report, warmup_index
+from app.services.opensearch_client import create_client
+from app.services.search_queries import RECIPE_LIST_FIELDS, is_normalized_index, match_query, search, similar_query
+from app.services.vector_store import VectorStore
 
-def normalize_vector(vector):
-    norm = np.linalg.norm(vector)
-    return vector / norm if norm != 0 else vector
+INDEX_NAME = "recipes"
 
 print("🧪 OpenSearch 빠른 테스트 시작\n")
 
 # OpenSearch 연결
 print("🔗 OpenSearch 연결 테스트...")
 try:
-    client = OpenSearch(
-        hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
-        timeout=30
-    )
+    client = create_client("search", timeout=30)
     info = client.info()
     print(f"✅ 연결 성공: {info['version']['number']}, 클러스터: {info['cluster_name']}\n")
 except Exception as e:
@@ -42,17 +38,7 @@ except Exception as e:
 # 텍스트 검색
 print("🔍 검색 기능 테스트...\n   레시피 이름 검색 ('볶음'):")
 try:
-    res = client.search(
-        index=INDEX_NAME,
-        body={
-            "query": {
-                "match": {
-                    "name": "볶음"
-                }
-            },
-            "size": 3
-        }
-    )
+    res = search(client, INDEX_NAME, match_query("name", "볶음", size=3), includes=["name"])
     hits = res["hits"]["hits"]
     if hits:
         print(f"   ✅ {len(hits)}개 결과:")
@@ -66,17 +52,7 @@ except Exception as e:
 # 재료 검색
 print("\n   재료 텍스트 검색 ('쌀'):")
 try:
-    res = client.search(
-        index=INDEX_NAME,
-        body={
-            "query": {
-                "match": {
-                    "ingredients": "쌀"
-                }
-            },
-            "size": 3
-        }
-    )
+    res = search(client, INDEX_NAME, match_query("ingredients", "쌀", size=3), includes=["name", "ingredients"])
     hits = res["hits"]["hits"]
     if hits:
         print(f"   ✅ {len(hits)}개 결과:")
@@ -89,39 +65,39 @@ try:
 except Exception as e:
     print(f"   ❌ 검색 실패: {e}")
 
+# k-NN 워밍업 (재시작 직후 그래프 로딩 시간이 벡터 검색 결과에 섞이지 않도록)
+print("\n🔥 k-NN 워밍업...")
+try:
+    report = warmup_index(client, INDEX_NAME)
+    print(f"   {'✅' if report['ready'] else '⚠️'} {format_report(report)}")
+except Exception as e:
+    print(f"   ⚠️ 워밍업 실패: {e}")
+
 # 벡터 검색 테스트
 print("\n🧠 벡터 검색 테스트...")
 try:
-    # 인덱스에서 실제 문서 하나 가져오기
-    sample = client.search(
-        index=INDEX_NAME,
-        body={"query": {"match_all": {}}, "size": 1}
-    )
-    if sample["hits"]["hits"]:
-        doc = sample["hits"]["hits"][0]["_source"]
+    # 기준 문서의 벡터는 로컬 메모리 매핑 저장소에서 ID로 조회 (없으면 인덱스에서 하나 받아옴)
+    if os.path.exists(config.RECIPE_VECTORS_FILE):
+        store = VectorStore.load(config.RECIPE_VECTORS_FILE)
+        doc_id = store.ids[0]
+        doc = {"name": store.docs[0].get("name"), "embedding": store.get_vector(doc_id).tolist()}
+        print(f"   📂 로컬 벡터 저장소: {config.RECIPE_VECTORS_FILE}")
+    else:
+        sample = search(client, INDEX_NAME, {"query": {"match_all": {}}, "size": 1},
+                        includes=["name", "embedding"], excludes=None)
+        doc_id = sample["hits"]["hits"][0]["_id"] if sample["hits"]["hits"] else None
+        doc = sample["hits"]["hits"][0]["_source"] if doc_id else None
+    if doc:
         if 'embedding' in doc:
-            print(f"   ✅ 벡터 데이터 확인: {len(doc['embedding'])}차원")
-
-            test_vector = doc['embedding']
-            normalized_vector = normalize_vector(np.array(test_vector))
-
-            # 벡터 검색 쿼리
-            search_body = {
-                "size": 3,
-                "query": {
-                    "knn": {
-                        "embedding": {
-                            "vector": list(map(float, normalized_vector)),
-                            "k": 10
-                        }
-                    }
-                }
-            }
-
-            print("\n🔎 보낼 쿼리:")
-            print(json.dumps(search_body, indent=2))
-
-            res = client.search(index=INDEX_NAME, body=search_body)
+            print(f"   ✅ 벡터 데이터 확인: {len(doc['embedding'])}차원 (기준: {doc.get('name', 'N/A')})")
+
+            if not is_normalized_index(client, INDEX_NAME):
+                print("   ⚠️ 정규화 벡터(innerproduct) 인덱스가 아닙니다. 업로드 스크립트로 인덱스를 다시 만드세요")
+
+            # 기준 문서를 제외한 k-NN 검색 (질의 벡터 정규화는 knn_query가 처리)
+            search_body = similar_query(doc['embedding'], doc_id, size=3)
+
+            res = search(client, INDEX_NAME, search_body, includes=RECIPE_LIST_FIELDS)
 
             hits = res["hits"]["hits"]
             if hits:
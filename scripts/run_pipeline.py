@@ -0,0 +1,338 @@
+# ============================================================================
+# 단일 프로세스 스트리밍 파이프라인: 추출 → 임베딩 → 색인
+# ============================================================================
+# 목적: export_* / generate_*_embeddings / upload_to_opensearch를 중간 파일 없이 연결
+#       DB 행 스트림 → 텍스트 생성 → 배치 임베딩 → 대량 색인을 스레드로 겹쳐 실행하고,
+#       단계 사이는 크기가 제한된 큐로 연결해 느린 단계의 역압(backpressure)이 앞으로 전파됨
+#       실행 후 단계별 처리량/가동률을 출력해 병목 단계를 확인
+# 사용법: python run_pipeline.py [recipes|ingredients|all] [--embed-batch 64] [--index-batch 100]
+# ============================================================================
+
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from queue import Empty, Full, Queue
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.metrics import print_summary, span
+from app.services.autocomplete import suggest_input
+from app.services.ingredient_synonyms import recipe_ingredient_ids
+from app.services.search_queries import normalize_vector
+
+# 단계 종료 신호
+_DONE = object()
+
+
+class StageStats:
+    """단계별 처리 건수와 시간 (작업/입력 대기/출력 대기)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.wait_input_seconds = 0.0
+        self.wait_output_seconds = 0.0
+
+    def as_dict(self, wall_seconds):
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "items_per_sec": round(self.items / wall_seconds, 2) if wall_seconds else 0.0,
+            "busy_ratio": round(self.busy_seconds / wall_seconds, 3) if wall_seconds else 0.0,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wait_input_seconds": round(self.wait_input_seconds, 3),
+            "wait_output_seconds": round(self.wait_output_seconds, 3),
+        }
+
+
+class StreamingPipeline:
+    """
+    source → build_text → embed_batch → index_batch 4단계를 스레드로 실행합니다.
+
+    - source: 레코드 이터러블 (예: iter_recipes())
+    - build_text(record) -> str
+    - embed_batch(texts) -> 벡터 목록 (입력 순서 유지)
+    - make_doc(record, text, embedding) -> 색인할 문서
+    - index_batch(docs) -> 성공 건수
+    """
+
+    def __init__(self, source, build_text, embed_batch, make_doc, index_batch,
+                 embed_batch_size=64, index_batch_size=100, queue_size=256):
+        self.source = source
+        self.build_text = build_text
+        self.embed_batch = embed_batch
+        self.make_doc = make_doc
+        self.index_batch = index_batch
+        self.embed_batch_size = embed_batch_size
+        self.index_batch_size = index_batch_size
+
+        self.records = Queue(maxsize=queue_size)
+        self.texts = Queue(maxsize=queue_size)
+        self.docs = Queue(maxsize=queue_size)
+
+        self.stats = {name: StageStats(name) for name in ("source", "text", "embed", "index")}
+        self.indexed = 0
+        self.errors = []
+        self._stop = threading.Event()
+
+    # ========================================================================
+    # 큐 헬퍼 (오류 발생 시 다른 단계가 영원히 막히지 않도록 주기적으로 중단 여부 확인)
+    # ========================================================================
+
+    def _put(self, queue, item, stats):
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                break
+            except Full:
+                continue
+        stats.wait_output_seconds += time.perf_counter() - start
+
+    def _get(self, queue, stats):
+        start = time.perf_counter()
+        while True:
+            try:
+                item = queue.get(timeout=0.1)
+                break
+            except Empty:
+                if self._stop.is_set():
+                    item = _DONE
+                    break
+        stats.wait_input_seconds += time.perf_counter() - start
+        return item
+
+    def _run_stage(self, target):
+        try:
+            target()
+        except Exception as e:
+            self.errors.append(e)
+            self._stop.set()
+
+    # ========================================================================
+    # 단계
+    # ========================================================================
+
+    def _source_stage(self):
+        stats = self.stats["source"]
+        iterator = iter(self.source)
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            try:
+                record = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                stats.busy_seconds += time.perf_counter() - start
+            stats.items += 1
+            self._put(self.records, record, stats)
+        self._put(self.records, _DONE, stats)
+
+    def _text_stage(self):
+        stats = self.stats["text"]
+        while True:
+            record = self._get(self.records, stats)
+            if record is _DONE:
+                break
+            start = time.perf_counter()
+            text = self.build_text(record)
+            stats.busy_seconds += time.perf_counter() - start
+            stats.items += 1
+            self._put(self.texts, (record, text), stats)
+        self._put(self.texts, _DONE, stats)
+
+    def _embed_stage(self):
+        stats = self.stats["embed"]
+        batch = []
+        done = False
+        while not done:
+            item = self._get(self.texts, stats)
+            if item is _DONE:
+                done = True
+            else:
+                batch.append(item)
+            if batch and (done or len(batch) >= self.embed_batch_size):
+                start = time.perf_counter()
+                embeddings = self.embed_batch([text for _, text in batch])
+                docs = [self.make_doc(record, text, embedding)
+                        for (record, text), embedding in zip(batch, embeddings)]
+                stats.busy_seconds += time.perf_counter() - start
+                stats.items += len(batch)
+                for doc in docs:
+                    self._put(self.docs, doc, stats)
+                batch = []
+        self._put(self.docs, _DONE, stats)
+
+    def _index_stage(self):
+        stats = self.stats["index"]
+        batch = []
+        done = False
+        while not done:
+            item = self._get(self.docs, stats)
+            if item is _DONE:
+                done = True
+            else:
+                batch.append(item)
+            if batch and (done or len(batch) >= self.index_batch_size):
+                start = time.perf_counter()
+                self.indexed += self.index_batch(batch)
+                stats.busy_seconds += time.perf_counter() - start
+                stats.items += len(batch)
+                batch = []
+
+    # ========================================================================
+    # 실행
+    # ========================================================================
+
+    def run(self):
+        """모든 단계를 실행하고 단계별 통계를 반환합니다. 단계에서 난 첫 오류는 다시 발생시킵니다."""
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._run_stage, args=(stage,), name=name, daemon=True)
+            for name, stage in (("source", self._source_stage), ("text", self._text_stage),
+                                ("embed", self._embed_stage), ("index", self._index_stage))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - start
+
+        if self.errors:
+            raise self.errors[0]
+
+        return {
+            "wall_seconds": round(wall_seconds, 3),
+            "indexed": self.indexed,
+            "stages": [stats.as_dict(wall_seconds) for stats in self.stats.values()],
+        }
+
+
+def print_report(label, report):
+    """단계별 처리량 표와 병목 단계를 출력합니다."""
+    print(f"\n📊 {label} 파이프라인 결과: {report['indexed']}개 색인, {report['wall_seconds']}초")
+    print(f"   {'단계':<8}{'건수':>8}{'건/초':>10}{'가동률':>8}{'입력대기(s)':>12}{'출력대기(s)':>12}")
+    for stage in report["stages"]:
+        print(f"   {stage['stage']:<8}{stage['items']:>8}{stage['items_per_sec']:>10}"
+              f"{stage['busy_ratio']:>8.0%}{stage['wait_input_seconds']:>12}{stage['wait_output_seconds']:>12}")
+    bottleneck = max(report["stages"], key=lambda stage: stage["busy_ratio"])
+    print(f"   🐢 병목 단계: {bottleneck['stage']} (가동률 {bottleneck['busy_ratio']:.0%})")
+
+
+# ============================================================================
+# 레시피 / 재료 파이프라인 구성
+# ============================================================================
+
+def make_recipe_doc(recipe, text, embedding):
+    """generate_recipe_embeddings.py와 같은 형태의 레시피 문서 (벡터는 정규화해서 저장)."""
+    ingredient_ids = recipe_ingredient_ids(recipe)
+    return {
+        "recipe_id": recipe["recipe_id"],
+        "name": recipe["recipe_name"],
+        "embedding": normalize_vector(embedding),
+        "ingredients": recipe["processed_ingredients"],
+        "ingredient_ids": ingredient_ids,
+        "ingredient_count": len(ingredient_ids),
+        "category": recipe["rcp_category"],
+        "cooking_method": recipe["rcp_way2"],
+        "hashtag": recipe["hash_tag"],
+        "embedding_text": text,
+        "created_at": datetime.now().isoformat()
+    }
+
+
+def make_ingredient_doc(item, text, embedding):
+    """generate_ingredient_embeddings.py 출력을 업로드용으로 전처리한 형태의 재료 문서 (벡터는 정규화해서 저장)."""
+    return {
+        "ingredient_id": item["id"],
+        "name": item["name"],
+        "aliases": " ".join(str(alias) for alias in item.get("aliases", [])),
+        "name_suggest": suggest_input(item["name"], item.get("aliases", [])),
+        "category": item.get("category", "기타"),
+        "embedding": normalize_vector(embedding),
+        "embedding_text": text,
+        "created_at": datetime.now().isoformat()
+    }
+
+
+def make_bulk_indexer(client, index_name, id_field):
+    """helpers.bulk로 문서 배치를 색인하는 함수를 만듭니다."""
+    from opensearchpy import helpers
+
+    def index_batch(docs):
+        actions = [{"_index": index_name, "_id": str(doc[id_field]), "_source": doc} for doc in docs]
+        with span("opensearch_bulk", index=index_name):
+            success, errors = helpers.bulk(client, actions, max_retries=3, initial_backoff=1,
+                                           max_backoff=60, raise_on_error=False)
+        if errors:
+            print(f"   ⚠️ {index_name} 배치 오류 {len(errors)}개")
+        return success
+
+    return index_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추출 → 임베딩 → 색인 스트리밍 파이프라인")
+    parser.add_argument("target", nargs="?", default="all", choices=["recipes", "ingredients", "all"])
+    parser.add_argument("--embed-batch", type=int, default=64, help="임베딩 API 한 번에 보낼 텍스트 수")
+    parser.add_argument("--index-batch", type=int, default=100, help="bulk 요청 하나에 담을 문서 수")
+    parser.add_argument("--queue-size", type=int, default=256, help="단계 사이 큐 크기 (역압 기준)")
+    parser.add_argument("--keep-index", action="store_true", help="인덱스를 다시 만들지 않고 upsert")
+    args = parser.parse_args()
+
+    from app.services.embedding_providers import get_provider
+    from app.services.search_queries import with_embedding_metadata
+    from embedding.generate_ingredient_embeddings import create_ingredient_embedding_text
+    from embedding.generate_recipe_embeddings import create_embedding_text
+    from export_ingredient_embedding_input import iter_ingredients
+    from export_recipe_embedding_input import iter_recipes
+    from upload_to_opensearch_local import (
+        INGREDIENT_INDEX,
+        RECIPE_INDEX,
+        client,
+        create_index,
+        ingredient_mapping,
+        recipe_mapping,
+        test_connection,
+    )
+
+    if not test_connection():
+        return
+
+    targets = []
+    if args.target in ("recipes", "all"):
+        targets.append(("레시피", RECIPE_INDEX, recipe_mapping, "recipe_id",
+                        iter_recipes, create_embedding_text, make_recipe_doc))
+    if args.target in ("ingredients", "all"):
+        targets.append(("재료", INGREDIENT_INDEX, ingredient_mapping, "ingredient_id",
+                        iter_ingredients, create_ingredient_embedding_text, make_ingredient_doc))
+
+    for label, index_name, mapping, id_field, source, build_text, make_doc in targets:
+        # 인덱스에 설정된 임베딩 제공자의 차원으로 매핑 생성
+        provider = get_provider(index_name)
+        mapping = with_embedding_metadata(mapping, provider.metadata())
+        if not args.keep_index and not create_index(index_name, mapping):
+            return
+
+        print(f"\n🚰 {label} 파이프라인 시작 (임베딩: {provider.name}/{provider.model}, {provider.dimension}차원)")
+        pipeline = StreamingPipeline(
+            source(),
+            build_text,
+            provider.embed,
+            make_doc,
+            make_bulk_indexer(client, index_name, id_field),
+            embed_batch_size=args.embed_batch,
+            index_batch_size=args.index_batch,
+            queue_size=args.queue_size,
+        )
+        print_report(label, pipeline.run())
+
+    print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# ============================================================================
+# 인덱스 스냅샷 생성 / 복원 스크립트
+# ============================================================================
+# 목적: 색인을 마친 recipes / ingredients 인덱스를 파일시스템 저장소(./snapshots)에 스냅샷으로 남기고
+#       새 환경에서는 JSON 재업로드 + HNSW 그래프 재구성(수 분) 대신 세그먼트 파일을 그대로 복원(수 초)
+#       스냅샷 metadata에 생성 시점의 문서 수를 기록하고, 복원 후 _count와 비교해 검증합니다
+#       임베딩 파일의 메타데이터(제공자/모델/차원)와 해시도 기록해 두고, 현재 파일과 다르면 복원하지 않습니다
+#       (종료 코드 2 → setup.ps1이 JSON 업로드 후 새 스냅샷 생성)
+# 사용법: python snapshot_indices.py create [--force-merge]     # 업로드 직후 한 번
+#         python snapshot_indices.py restore [--name 스냅샷] [--replace] [--ignore-sources]
+#         python snapshot_indices.py list
+# 필수: docker-compose.yml의 path.repo + ./snapshots 마운트 (config.SNAPSHOT_REPOSITORY_PATH)
+# ============================================================================
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.services.embedding_providers import read_embedding_metadata
+from app.services.knn_warmup import format_report, warmup_indices
+from app.services.opensearch_client import create_client
+
+INDICES = [config.RECIPE_INDEX, config.INGREDIENT_INDEX]
+SOURCE_KINDS = {config.RECIPE_INDEX: "recipe", config.INGREDIENT_INDEX: "ingredient"}
+# 임베딩 파일이 스냅샷과 달라 복원하지 않은 경우의 종료 코드 (복원 실패 1과 구분)
+EXIT_STALE = 2
+
+
+class StaleSnapshotError(Exception):
+    """스냅샷이 현재 임베딩 파일(메타데이터/해시)과 달라 복원하지 않음."""
+
+
+def ensure_repository(client):
+    """파일시스템 저장소를 등록합니다 (같은 경로를 다시 등록하면 기존 스냅샷이 그대로 보임)."""
+    client.snapshot.create_repository(repository=config.SNAPSHOT_REPOSITORY, body={
+        "type": "fs",
+        # 벡터 세그먼트는 거의 압축되지 않으므로 메타데이터만 압축
+        "settings": {"location": config.SNAPSHOT_REPOSITORY_PATH, "compress": True},
+    })
+
+
+def doc_counts(client, indices):
+    return {index: client.count(index=index)["count"] for index in indices}
+
+
+def source_file(kind):
+    """업로드 스크립트가 읽을 임베딩 파일 (upload_to_opensearch_local.py의 후보 순서와 같음). 없으면 None."""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_dir)
+    candidates = [
+        os.path.join(project_root, "data", f"{kind}_embeddings.ndjson"),
+        os.path.join(project_root, "data", f"{kind}_embeddings.json"),
+        os.path.join(current_dir, f"{kind}_embeddings.json"),
+    ]
+    return next((path for path in candidates if os.path.exists(path)), None)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprints(indices):
+    """
+    인덱스별 원본 임베딩 파일의 지문: 임베딩 메타데이터(제공자/모델/차원) + 파일 해시.
+    mtime은 참고용으로만 기록합니다 (git checkout만으로도 바뀌므로 비교에는 쓰지 않음).
+    """
+    fingerprints = {}
+    for index in indices:
+        path = source_file(SOURCE_KINDS[index])
+        if path is None:
+            fingerprints[index] = None
+            continue
+        metadata = read_embedding_metadata(path)
+        fingerprints[index] = {
+            "file": os.path.basename(path),
+            "provider": metadata.get("provider"),
+            "model": metadata.get("model"),
+            "dimension": metadata.get("dimension"),
+            "sha256": file_sha256(path),
+            "mtime": datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds"),
+        }
+    return fingerprints
+
+
+def stale_sources(recorded, current):
+    """스냅샷에 기록된 지문과 현재 임베딩 파일이 다른 인덱스와 사유. 현재 파일이 없는 인덱스는 비교하지 않습니다."""
+    stale = {}
+    for index, fingerprint in current.items():
+        if fingerprint is None:
+            print(f"   ⚠️ {index}: 로컬 임베딩 파일이 없어 스냅샷과 비교하지 않습니다")
+            continue
+        previous = (recorded or {}).get(index)
+        if not previous:
+            stale[index] = "스냅샷에 임베딩 파일 기록 없음"
+            continue
+        changed = [key for key in ("provider", "model", "dimension", "sha256") if previous.get(key) != fingerprint[key]]
+        if changed:
+            stale[index] = ", ".join(f"{key} {previous.get(key)} → {fingerprint[key]}" if key != "sha256"
+                                     else f"파일 내용 ({previous.get('mtime')} → {fingerprint['mtime']})"
+                                     for key in changed)
+    return stale
+
+
+def list_snapshots(client):
+    """성공한 스냅샷을 오래된 순으로 반환합니다."""
+    response = client.snapshot.get(repository=config.SNAPSHOT_REPOSITORY, snapshot="_all")
+    snapshots = [s for s in response.get("snapshots", []) if s.get("state") == "SUCCESS"]
+    return sorted(snapshots, key=lambda s: s.get("start_time_in_millis", 0))
+
+
+def create_snapshot(client, name=None, force_merge=False):
+    missing = [index for index in INDICES if not client.indices.exists(index=index)]
+    if missing:
+        print(f"❌ 스냅샷할 인덱스가 없습니다: {missing} (먼저 upload_to_opensearch_local.py 실행)")
+        return False
+
+    client.indices.refresh(index=",".join(INDICES))
+    if force_merge:
+        # 세그먼트마다 HNSW 그래프가 따로 있으므로 하나로 합쳐 두면 복원한 환경의 검색도 빨라짐 (한 번만 비용)
+        print("🔧 세그먼트 병합 중 (max_num_segments=1)...")
+        start_time = time.time()
+        client.indices.forcemerge(index=",".join(INDICES), max_num_segments=1, request_timeout=1800)
+        print(f"   - 병합 완료: {time.time() - start_time:.1f}초")
+
+    counts = doc_counts(client, INDICES)
+    name = name or f"indices-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    print(f"📸 스냅샷 생성: {config.SNAPSHOT_REPOSITORY}/{name} {counts}")
+    start_time = time.time()
+    response = client.snapshot.create(repository=config.SNAPSHOT_REPOSITORY, snapshot=name, body={
+        "indices": ",".join(INDICES),
+        "include_global_state": False,
+        "metadata": {"doc_counts": counts, "sources": source_fingerprints(INDICES),
+                     "created_at": datetime.now().isoformat()},
+    }, wait_for_completion=True, request_timeout=1800)
+
+    snapshot = response.get("snapshot", {})
+    if snapshot.get("state") != "SUCCESS":
+        print(f"❌ 스냅샷 실패: {snapshot.get('state')} {snapshot.get('failures')}")
+        return False
+    print(f"✅ 스냅샷 완료: {time.time() - start_time:.1f}초, 샤드 {snapshot.get('shards', {}).get('successful')}개")
+    return True
+
+
+def verify_counts(client, expected):
+    """복원한 인덱스의 문서 수가 스냅샷 metadata의 문서 수와 같은지 확인합니다."""
+    client.indices.refresh(index=",".join(expected))
+    actual = doc_counts(client, expected)
+    ok = True
+    for index, count in expected.items():
+        matched = actual[index] == count
+        ok = ok and matched
+        print(f"   {'✅' if matched else '❌'} {index}: {actual[index]} / 스냅샷 {count}")
+    return ok
+
+
+def restore_snapshot(client, name=None, replace=False, check_sources=True):
+    snapshots = list_snapshots(client)
+    if name:
+        snapshots = [s for s in snapshots if s["snapshot"] == name]
+    if not snapshots:
+        print(f"❌ 복원할 스냅샷이 없습니다 ({config.SNAPSHOT_REPOSITORY}{' / ' + name if name else ''})")
+        return False
+
+    snapshot = snapshots[-1]
+    expected = snapshot.get("metadata", {}).get("doc_counts") or {}
+    indices = [index for index in INDICES if index in snapshot.get("indices", [])]
+    print(f"📦 스냅샷: {snapshot['snapshot']} ({snapshot.get('start_time')}) 인덱스 {indices}")
+
+    if check_sources:
+        # 임베딩을 다시 만들었거나 제공자/차원을 바꾼 뒤에는 옛 인덱스를 복원하지 않고 재업로드
+        stale = stale_sources(snapshot.get("metadata", {}).get("sources"), source_fingerprints(indices))
+        if stale:
+            for index, reason in stale.items():
+                print(f"   ❌ {index}: 스냅샷이 현재 임베딩 파일과 다릅니다 ({reason})")
+            print("💡 업로드 후 새 스냅샷을 만드세요 (그대로 복원하려면 --ignore-sources)")
+            raise StaleSnapshotError(snapshot["snapshot"])
+
+    existing = [index for index in indices if client.indices.exists(index=index)]
+    if existing and not replace:
+        # setup.ps1을 다시 실행한 경우: 이미 같은 스냅샷으로 복원된 상태면 성공으로 처리
+        if existing == indices and expected and doc_counts(client, indices) == {i: expected.get(i) for i in indices}:
+            print("✅ 이미 같은 문서 수로 복원되어 있습니다")
+            return True
+        print(f"❌ 인덱스가 이미 있습니다: {existing} (덮어쓰려면 --replace)")
+        return False
+    if existing:
+        print(f"🗑️ 기존 인덱스 삭제: {existing}")
+        client.indices.delete(index=",".join(existing))
+
+    start_time = time.time()
+    client.snapshot.restore(repository=config.SNAPSHOT_REPOSITORY, snapshot=snapshot["snapshot"], body={
+        "indices": ",".join(indices),
+        "include_global_state": False,
+        # 단일 노드 로컬 환경: 복제본을 기다리지 않도록
+        "index_settings": {"index.number_of_replicas": 0},
+    }, wait_for_completion=True, request_timeout=1800)
+    client.cluster.health(index=",".join(indices), wait_for_status="yellow", timeout="60s")
+    print(f"⚡ 복원 완료: {time.time() - start_time:.1f}초")
+
+    if expected and not verify_counts(client, {index: expected[index] for index in indices if index in expected}):
+        return False
+    if not expected:
+        print("⚠️ 스냅샷에 문서 수 metadata가 없어 검증을 건너뜁니다")
+
+    # 복원 직후에는 그래프가 네이티브 메모리에 없으므로 바로 데워 둠
+    print("🔥 k-NN 워밍업:")
+    try:
+        for report in warmup_indices(client, indices):
+            print(f"   {'✅' if report['ready'] else '⚠️'} {format_report(report)}")
+    except Exception as e:
+        print(f"   ⚠️ 워밍업 실패 (복원은 완료): {e}")
+    return True
+
+
+def print_snapshots(client):
+    snapshots = list_snapshots(client)
+    if not snapshots:
+        print(f"📭 스냅샷 없음 ({config.SNAPSHOT_REPOSITORY})")
+        return
+    for snapshot in snapshots:
+        metadata = snapshot.get("metadata", {})
+        sources = ", ".join(f"{index} {source['provider']}/{source['dimension']}차원"
+                            for index, source in (metadata.get("sources") or {}).items() if source)
+        print(f"   {snapshot['snapshot']:<28}{snapshot.get('start_time', ''):<28}{metadata.get('doc_counts', {})} {sources}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="recipes / ingredients 인덱스 스냅샷 생성·복원")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    create_parser = subparsers.add_parser("create", help="현재 인덱스를 스냅샷으로 저장")
+    create_parser.add_argument("--name", help="스냅샷 이름 (기본: indices-날짜-시각)")
+    create_parser.add_argument("--force-merge", action="store_true", help="스냅샷 전에 세그먼트를 하나로 병합")
+    restore_parser = subparsers.add_parser("restore", help="스냅샷에서 인덱스 복원 후 문서 수 검증")
+    restore_parser.add_argument("--name", help="복원할 스냅샷 (기본: 가장 최근 성공)")
+    restore_parser.add_argument("--replace", action="store_true", help="기존 인덱스를 삭제하고 복원")
+    restore_parser.add_argument("--ignore-sources", action="store_true",
+                                help="임베딩 파일이 스냅샷과 달라도 복원")
+    subparsers.add_parser("list", help="저장소의 스냅샷 목록")
+    args = parser.parse_args()
+
+    client = create_client("bulk")
+    try:
+        ensure_repository(client)
+    except Exception as e:
+        print(f"❌ 스냅샷 저장소 등록 실패: {e}")
+        print("💡 docker-compose.yml의 path.repo / ./snapshots 마운트를 확인하고 컨테이너를 다시 만드세요")
+        sys.exit(1)
+
+    if args.command == "create":
+        ok = create_snapshot(client, args.name, args.force_merge)
+    elif args.command == "restore":
+        try:
+            ok = restore_snapshot(client, args.name, args.replace, not args.ignore_sources)
+        except StaleSnapshotError:
+            sys.exit(EXIT_STALE)
+    else:
+        print_snapshots(client)
+        ok = True
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,40 @@
 # ============================================================================
 
 import json
+import math
 import os
-from opensearchpy import OpenSearch, helpers
+import sys
+from opensearchpy import helpers
 from dotenv import load_dotenv
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.core.metrics import print_summary, span
+from app.services.search_queries import (
+    EMBEDDING_INDEX_META,
+    INGREDIENT_LIST_FIELDS,
+    RECIPE_LIST_FIELDS,
+    VECTOR_SPACE_TYPE,
+    exclude_embedding_from_source,
+    ingredient_coverage_query,
+    ingredient_filter_query,
+    resolve_ingredient_ids,
+    script_score_query,
+    search,
+    similar_query,
+    with_embedding_metadata,
+    with_ingredient_synonyms,
+)
+from app.services.embedding_providers import read_embedding_metadata
+from app.services.autocomplete import suggest_input
+from app.services.ingredient_synonyms import recipe_ingredient_ids, recipe_synonym_rules
+from app.services.knn_warmup import format_report, index_dimension, warmup_indices
+from app.services.embedding_validation import load_embedding_file
+from app.services.opensearch_client import create_client, parse_hosts
+from app.services.vector_store import VectorStore
+
 # .env 파일에서 환경변수 로드
 load_dotenv()
 
@@ -20,21 +49,13 @@ load_dotenv()
 # ============================================================================
 
 def create_opensearch_client():
-    """로컬 OpenSearch 클라이언트를 생성합니다."""
-    host = os.getenv('OPENSEARCH_HOST', 'localhost')
-    port = int(os.getenv('OPENSEARCH_PORT', '9201'))
-    
-    print("🔑 로컬 OpenSearch 접근")
-    print(f"   - 호스트: {host}")
-    print(f"   - 포트: {port}")
-    return OpenSearch(
-        hosts=[{'host': host, 'port': port}],
-        use_ssl=False,
-        verify_certs=False,
-        timeout=60,
-        max_retries=10,
-        retry_on_timeout=True
-    )
+    """대량 색인 프로필(gzip 본문, 큰 연결 풀, 긴 타임아웃) OpenSearch 클라이언트를 생성합니다."""
+    hosts = parse_hosts()
+
+    print("🔑 로컬 OpenSearch 접근 (bulk 프로필)")
+    for host in hosts:
+        print(f"   - 호스트: {host['host']}:{host['port']}")
+    return create_client("bulk", hosts)
 
 # OpenSearch 클라이언트 생성
 client = create_opensearch_client()
@@ -49,6 +70,9 @@ if not client:
 RECIPE_INDEX = 'recipes'
 INGREDIENT_INDEX = 'ingredients'
 
+# true면 embedding을 _source에 저장하지 않음 (k-NN 검색은 그대로, 단 _source로 벡터 조회 불가)
+EXCLUDE_EMBEDDING_SOURCE = os.getenv('OPENSEARCH_EXCLUDE_EMBEDDING_SOURCE', 'false').lower() == 'true'
+
 # 레시피 인덱스 매핑 설정 (로컬 OpenSearch용)
 recipe_mapping = {
     "settings": {
@@ -77,10 +101,14 @@ recipe_mapping = {
         }
     },
     "mappings": {
+        "_meta": EMBEDDING_INDEX_META,
         "properties": {
             "recipe_id": {"type": "keyword"},
             "name": {"type": "text", "analyzer": "korean_analyzer"},
             "ingredients": {"type": "text", "analyzer": "korean_analyzer"},
+            # 재료 조합 검색용 정확한 재료 ID 배열 (term 필터 캐시) / 레시피 재료 수 (terms_set 기준)
+            "ingredient_ids": {"type": "keyword"},
+            "ingredient_count": {"type": "integer"},
             "category": {"type": "keyword"},
             "cooking_method": {"type": "keyword"},
             "hashtag": {"type": "text", "analyzer": "korean_analyzer"},
@@ -89,7 +117,7 @@ recipe_mapping = {
                 "dimension": 1536,
                 "method": {
                     "name": "hnsw",
-                    "space_type": "cosinesimil",
+                    "space_type": VECTOR_SPACE_TYPE,
                     "engine": "nmslib",
                     "parameters": {
                         "ef_construction": 128,
@@ -103,6 +131,11 @@ recipe_mapping = {
     }
 }
 
+# 레시피 재료 필드에 색인 시점 재료 동의어 적용 (ingredient_aliases_nested.json)
+# "강력밀가루"·"전립분" 같은 별칭 검색도 질의 확장 없이 match 한 번으로 찾음
+if config.INGREDIENT_SYNONYMS_ENABLED:
+    recipe_mapping = with_ingredient_synonyms(recipe_mapping, recipe_synonym_rules())
+
 # 재료 인덱스 매핑 설정 (로컬 OpenSearch용)
 ingredient_mapping = {
     "settings": {
@@ -114,6 +147,12 @@ ingredient_mapping = {
                     "type": "custom",
                     "tokenizer": "nori_tokenizer",
                     "filter": ["lowercase", "nori_part_of_speech"]
+                },
+                # 자동완성: 재료명/별칭 전체를 한 토큰으로 (형태소 분석 없이 소문자만)
+                "suggest_analyzer": {
+                    "type": "custom",
+                    "tokenizer": "keyword",
+                    "filter": ["lowercase"]
                 }
             },
             "tokenizer": {
@@ -131,17 +170,20 @@ ingredient_mapping = {
         }
     },
     "mappings": {
+        "_meta": EMBEDDING_INDEX_META,
         "properties": {
             "ingredient_id": {"type": "long"},
             "name": {"type": "text", "analyzer": "korean_analyzer"},
             "aliases": {"type": "text", "analyzer": "korean_analyzer"},
+            # 재료명 + 별칭 자동완성 (completion suggester, 입력은 preprocess_ingredient_data에서)
+            "name_suggest": {"type": "completion", "analyzer": "suggest_analyzer", "max_input_length": 50},
             "category": {"type": "keyword"},
             "embedding": {
                 "type": "knn_vector",
                 "dimension": 1536,
                 "method": {
                     "name": "hnsw",
-                    "space_type": "cosinesimil",
+                    "space_type": VECTOR_SPACE_TYPE,
                     "engine": "nmslib",
                     "parameters": {
                         "ef_construction": 128,
@@ -184,6 +226,8 @@ def delete_index_if_exists(index_name):
 def create_index(index_name, mapping):
     """로컬 OpenSearch에 인덱스를 생성합니다."""
     try:
+        if EXCLUDE_EMBEDDING_SOURCE:
+            mapping = exclude_embedding_from_source(mapping)
         delete_index_if_exists(index_name)
         response = client.indices.create(index=index_name, body=mapping)
         print(f"✅ 인덱스 생성 완료: {index_name}")
@@ -193,23 +237,50 @@ def create_index(index_name, mapping):
         print(f"❌ 인덱스 생성 실패 {index_name}: {e}")
         return False
 
-def validate_embedding_data(data):
-    """임베딩 데이터의 유효성을 검사합니다."""
-    valid_data = []
-    
-    for item in data:
-        embedding = item.get('embedding')
-        
-        if embedding and isinstance(embedding, list) and len(embedding) == 1536:
-            if all(isinstance(x, (int, float)) for x in embedding):
-                valid_data.append(item)
-            else:
-                print(f"⚠️ 임베딩 값이 숫자가 아님: {item.get('name', item.get('recipe_id', 'Unknown'))}")
-        else:
-            print(f"⚠️ 잘못된 임베딩 차원: {item.get('name', item.get('recipe_id', 'Unknown'))}")
-    
-    print(f"📊 유효한 데이터: {len(valid_data)}/{len(data)}")
-    return valid_data
+def report_invalid(problems, total, valid_count, limit=20):
+    """검증 실패 문서를 사유와 함께 출력합니다 (최대 limit개)."""
+    for name, reason in problems[:limit]:
+        print(f"⚠️ {reason}: {name}")
+    if len(problems) > limit:
+        print(f"⚠️ ... 외 {len(problems) - limit}개")
+    print(f"📊 유효한 데이터: {valid_count}/{total}")
+
+def embedding_file_candidates(kind):
+    """업로드할 임베딩 파일 후보 경로 (앞에 있을수록 우선)."""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_dir)
+    return [
+        os.path.join(project_root, "data", f"{kind}_embeddings.ndjson"),
+        os.path.join(project_root, "data", f"{kind}_embeddings.json"),
+        os.path.join(current_dir, f"{kind}_embeddings.json"),
+        f"../data/{kind}_embeddings.json"
+    ]
+
+def candidate_metadata(candidates):
+    """처음 발견되는 임베딩 파일의 메타데이터 (제공자/모델/차원)."""
+    embeddings_file = next((path for path in candidates if os.path.exists(path)), None)
+    return read_embedding_metadata(embeddings_file)
+
+def index_mapping(mapping, candidates):
+    """처음 발견되는 임베딩 파일의 메타데이터(제공자/모델/차원)에 맞춘 매핑을 만듭니다."""
+    return with_embedding_metadata(mapping, candidate_metadata(candidates))
+
+def test_vector(kind):
+    """테스트용 단위 벡터. 차원은 인덱스 매핑과 같은 임베딩 메타데이터를 따릅니다 (local 제공자면 384)."""
+    dimension = candidate_metadata(embedding_file_candidates(kind))["dimension"]
+    return [1.0 / math.sqrt(dimension)] * dimension
+
+def load_valid_documents(path, transform=None):
+    """
+    임베딩 파일을 읽고 검증합니다.
+    .ndjson 파일은 프로세스 풀에서 줄 묶음 단위로 파싱·검증·transform까지 처리합니다.
+    저장 벡터는 여기서 한 번 L2 정규화합니다 (인덱스는 innerproduct 공간 사용).
+    검증 차원은 파일 옆 .meta.json에 기록된 값을 따릅니다.
+    """
+    dimension = read_embedding_metadata(path)["dimension"]
+    docs, total, problems = load_embedding_file(path, dimension, transform=transform, normalize=True)
+    report_invalid(problems, total, len(docs))
+    return docs
 
 def preprocess_ingredient_data(ingredients):
     """재료 데이터를 AWS OpenSearch 업로드용으로 전처리합니다."""
@@ -226,6 +297,7 @@ def preprocess_ingredient_data(ingredients):
             "ingredient_id": ingredient.get('ingredient_id'),
             "name": ingredient.get('name'),
             "aliases": aliases_text,
+            "name_suggest": suggest_input(ingredient.get('name'), aliases),
             "category": ingredient.get('category'),
             "embedding": ingredient.get('embedding'),
             "embedding_text": ingredient.get('embedding_text'),
@@ -236,7 +308,11 @@ def preprocess_ingredient_data(ingredients):
     return processed
 
 def preprocess_recipe_data(recipes):
-    """레시피 데이터를 전처리합니다."""
+    """레시피 데이터를 전처리합니다 (ingredient_ids가 없는 기존 임베딩 파일은 재료명을 재료 ID로 채움)."""
+    for recipe in recipes:
+        if not recipe.get('ingredient_ids'):
+            recipe['ingredient_ids'] = recipe_ingredient_ids(recipe, text_field='ingredients')
+            recipe['ingredient_count'] = len(recipe['ingredient_ids'])
     return recipes
 
 def bulk_upload(index_name, data, batch_size=20):
@@ -273,14 +349,15 @@ def bulk_upload(index_name, data, batch_size=20):
         if len(actions) >= batch_size or i == total:
             try:
                 # 대량 업로드 실행
-                success, errors = helpers.bulk(
-                    client, 
-                    actions, 
-                    timeout=600,
-                    max_retries=3,
-                    initial_backoff=2,
-                    max_backoff=300
-                )
+                with span("opensearch_bulk", index=index_name):
+                    success, errors = helpers.bulk(
+                        client, 
+                        actions, 
+                        timeout=600,
+                        max_retries=3,
+                        initial_backoff=2,
+                        max_backoff=300
+                    )
                 
                 # 성공/실패 카운팅
                 success_count += success
@@ -340,11 +417,12 @@ def verify_upload():
         recipe_count = client.count(index=RECIPE_INDEX)["count"]
         print(f"   📊 레시피: {recipe_count}개")
         
-        sample = client.search(index=RECIPE_INDEX, body={"query": {"match_all": {}}, "size": 1})
+        sample = search(client, RECIPE_INDEX, {"query": {"match_all": {}}, "size": 1}, includes=["name"])
         if sample["hits"]["hits"]:
             sample_recipe = sample["hits"]["hits"][0]["_source"]
             print(f"   📝 샘플 레시피: {sample_recipe.get('name', 'N/A')}")
-            print(f"   🔢 임베딩 차원: {len(sample_recipe.get('embedding', []))}")
+            # OPENSEARCH_EXCLUDE_EMBEDDING_SOURCE=true면 _source에 embedding이 없으므로 매핑의 차원을 읽음
+            print(f"   🔢 임베딩 차원: {index_dimension(client, RECIPE_INDEX)}")
             
     except Exception as e:
         print(f"   ❌ 레시피 확인 실패: {e}")
@@ -354,7 +432,8 @@ def verify_upload():
         ingredient_count = client.count(index=INGREDIENT_INDEX)["count"]
         print(f"   📊 재료: {ingredient_count}개")
         
-        sample = client.search(index=INGREDIENT_INDEX, body={"query": {"match_all": {}}, "size": 1})
+        sample = search(client, INGREDIENT_INDEX, {"query": {"match_all": {}}, "size": 1},
+                        includes=["name", "category"])
         if sample["hits"]["hits"]:
             sample_ingredient = sample["hits"]["hits"][0]["_source"]
             print(f"   📝 샘플 재료: {sample_ingredient.get('name', 'N/A')}")
@@ -375,7 +454,7 @@ def test_simple_upload():
             "category": "테스트",
             "cooking_method": "테스트",
             "hashtag": "테스트",
-            "embedding": [0.1] * 1536,
+            "embedding": test_vector("recipe"),
             "embedding_text": "테스트용 임베딩 텍스트",
             "created_at": "2025-05-30T00:00:00Z"
         }
@@ -397,205 +476,170 @@ def test_simple_upload():
         print(f"   ❌ 테스트 업로드 실패: {e}")
         return False
 
+_local_stores = {}
+
+def local_vector_store(index_name):
+    """build_vector_store.py가 만든 메모리 매핑 벡터 저장소 (없으면 None)."""
+    if index_name not in _local_stores:
+        path = config.RECIPE_VECTORS_FILE if index_name == RECIPE_INDEX else config.INGREDIENT_VECTORS_FILE
+        _local_stores[index_name] = VectorStore.load(path) if os.path.exists(path) else None
+    return _local_stores[index_name]
+
+def find_sample(index_name, name):
+    """
+    이름에 name이 들어간 문서 하나의 (문서 ID, 이름, 벡터)를 반환합니다.
+    벡터는 로컬 저장소에서 ID로 조회하므로 OpenSearch에서 embedding(약 30 KB)을 받아와
+    검색 본문으로 다시 보내는 왕복이 없습니다. 저장소가 없을 때만 OpenSearch에서 받아옵니다.
+    """
+    store = local_vector_store(index_name)
+    if store is not None:
+        for doc_id, doc in zip(store.ids, store.docs):
+            if name in doc.get('name', ''):
+                return doc_id, doc['name'], store.get_vector(doc_id).tolist()
+        return None
+
+    hits = search(
+        client, index_name,
+        {"query": {"match": {"name": name}}, "size": 1},
+        includes=["name", "embedding"], excludes=None
+    )["hits"]["hits"]
+    if not hits or not hits[0]["_source"].get("embedding"):
+        return None
+    return hits[0]["_id"], hits[0]["_source"].get("name", name), hits[0]["_source"]["embedding"]
+
+def warm_up_knn():
+    """HNSW 그래프를 네이티브 메모리에 올리고 합성 질의 p95가 기준 아래로 내려올 때까지 기다립니다."""
+    print("\n🔥 k-NN 워밍업:")
+    try:
+        for report in warmup_indices(client, [RECIPE_INDEX, INGREDIENT_INDEX]):
+            print(f"   {'✅' if report['ready'] else '⚠️'} {format_report(report)}")
+    except Exception as e:
+        print(f"   ⚠️ 워밍업 실패: {e}")
+
 def test_vector_search():
     """벡터 검색 기능을 자연어로 테스트합니다."""
     print("\n🧪 벡터 검색 테스트:")
     
     try:
-        # 1. 기존 데이터에서 샘플 임베딩 가져오기
+        # 1. 문서 ID로 벡터를 조회해 유사 재료 검색
         print("\n   🔍 재료 벡터 검색 테스트:")
+        if local_vector_store(INGREDIENT_INDEX) is None:
+            print("   ⚠️ 로컬 벡터 저장소가 없어 OpenSearch에서 embedding을 받아옵니다 (scripts/build_vector_store.py)")
         
         # 샘플 재료 검색 (밀가루와 유사한 재료 찾기)
-        sample_ingredient = client.search(
-            index=INGREDIENT_INDEX,
-            body={"query": {"match": {"name": "밀가루"}}, "size": 1}
-        )
+        flour = find_sample(INGREDIENT_INDEX, "밀가루")
         
-        if (sample_ingredient and 
-            sample_ingredient.get("hits") and 
-            sample_ingredient["hits"].get("hits") and 
-            len(sample_ingredient["hits"]["hits"]) > 0):
+        if flour:
+            flour_id, _, flour_embedding = flour
+            print(f"   📝 검색 기준: '밀가루' (곡류/분말)")
             
-            flour_data = sample_ingredient["hits"]["hits"][0]["_source"]
-            flour_embedding = flour_data.get("embedding")
+            # 밀가루와 유사한 재료 검색 (자기 자신 제외, 정확 검색)
+            similar_ingredients = search(
+                client, INGREDIENT_INDEX,
+                similar_query(flour_embedding, flour_id, size=5, exact=True),
+                includes=INGREDIENT_LIST_FIELDS
+            )
             
-            if flour_embedding and len(flour_embedding) == 1536:
-                print(f"   📝 검색 기준: '밀가루' (곡류/분말)")
-                
-                # 밀가루와 유사한 재료 검색 (로컬 OpenSearch용)
-                similar_ingredients = client.search(
-                    index=INGREDIENT_INDEX,
-                    body={
-                        "size": 5,
-                        "query": {
-                            "script_score": {
-                                "query": {"match_all": {}},
-                                "script": {
-                                    "source": "cosineSimilarity(params.query_vector, 'embedding') + 1.0",
-                                    "params": {"query_vector": flour_embedding}
-                                }
-                            }
-                        }
-                    }
-                )
+            if (similar_ingredients and 
+                similar_ingredients.get("hits") and 
+                similar_ingredients["hits"].get("hits")):
                 
-                if (similar_ingredients and 
-                    similar_ingredients.get("hits") and 
-                    similar_ingredients["hits"].get("hits")):
-                    
-                    print(f"   ✅ 유사한 재료 {len(similar_ingredients['hits']['hits'])}개 발견:")
-                    for i, hit in enumerate(similar_ingredients['hits']['hits'][:3], 1):
-                        source = hit.get("_source", {})
-                        score = hit.get("_score", 0)
-                        name = source.get('name', 'Unknown')
-                        category = source.get('category', 'Unknown')
-                        print(f"      {i}. {name} ({category}) - 유사도: {score:.3f}")
-                else:
-                    print("   ❌ 유사한 재료를 찾을 수 없습니다")
+                print(f"   ✅ 유사한 재료 {len(similar_ingredients['hits']['hits'])}개 발견:")
+                for i, hit in enumerate(similar_ingredients['hits']['hits'][:3], 1):
+                    source = hit.get("_source", {})
+                    score = hit.get("_score", 0)
+                    name = source.get('name', 'Unknown')
+                    category = source.get('category', 'Unknown')
+                    print(f"      {i}. {name} ({category}) - 유사도: {score:.3f}")
             else:
-                print("   ❌ 밀가루의 임베딩 데이터가 올바르지 않습니다")
+                print("   ❌ 유사한 재료를 찾을 수 없습니다")
         else:
             print("   ❌ '밀가루' 재료를 찾을 수 없습니다")
         
         print("\n   🔍 레시피 벡터 검색 테스트:")
         
         # 샘플 레시피 검색 (볶음 요리와 유사한 레시피 찾기)
-        sample_recipe = client.search(
-            index=RECIPE_INDEX,
-            body={"query": {"match": {"name": "볶음"}}, "size": 1}
-        )
+        stir_fry = find_sample(RECIPE_INDEX, "볶음")
         
-        if (sample_recipe and 
-            sample_recipe.get("hits") and 
-            sample_recipe["hits"].get("hits") and 
-            len(sample_recipe["hits"]["hits"]) > 0):
+        if stir_fry:
+            recipe_id, recipe_name, stir_fry_embedding = stir_fry
+            print(f"   📝 검색 기준: '{recipe_name}' (볶음 요리)")
             
-            recipe_data = sample_recipe["hits"]["hits"][0]["_source"]
-            stir_fry_embedding = recipe_data.get("embedding")
-            recipe_name = recipe_data.get("name", "Unknown Recipe")
+            # 볶음과 유사한 레시피 검색 (자기 자신 제외, 정확 검색)
+            similar_recipes = search(
+                client, RECIPE_INDEX,
+                similar_query(stir_fry_embedding, recipe_id, size=5, exact=True),
+                includes=RECIPE_LIST_FIELDS
+            )
             
-            if stir_fry_embedding and len(stir_fry_embedding) == 1536:
-                print(f"   📝 검색 기준: '{recipe_name}' (볶음 요리)")
-                
-                # 볶음과 유사한 레시피 검색 (로컬 OpenSearch용)
-                similar_recipes = client.search(
-                    index=RECIPE_INDEX,
-                    body={
-                        "size": 5,
-                        "query": {
-                            "script_score": {
-                                "query": {"match_all": {}},
-                                "script": {
-                                    "source": "cosineSimilarity(params.query_vector, 'embedding') + 1.0",
-                                    "params": {"query_vector": stir_fry_embedding}
-                                }
-                            }
-                        }
-                    }
-                )
+            if (similar_recipes and 
+                similar_recipes.get("hits") and 
+                similar_recipes["hits"].get("hits")):
                 
-                if (similar_recipes and 
-                    similar_recipes.get("hits") and 
-                    similar_recipes["hits"].get("hits")):
+                print(f"   ✅ 유사한 레시피 {len(similar_recipes['hits']['hits'])}개 발견:")
+                for i, hit in enumerate(similar_recipes['hits']['hits'][:3], 1):
+                    source = hit.get("_source", {})
+                    score = hit.get("_score", 0)
+                    name = source.get('name', 'Unknown Recipe')
+                    ingredients = source.get('ingredients', '')
+                    category = source.get('category', 'N/A')
                     
-                    print(f"   ✅ 유사한 레시피 {len(similar_recipes['hits']['hits'])}개 발견:")
-                    for i, hit in enumerate(similar_recipes['hits']['hits'][:3], 1):
-                        source = hit.get("_source", {})
-                        score = hit.get("_score", 0)
-                        name = source.get('name', 'Unknown Recipe')
-                        ingredients = source.get('ingredients', '')
-                        category = source.get('category', 'N/A')
-                        
-                        ingredients_preview = ingredients[:30] + "..." if len(ingredients) > 30 else ingredients
-                        print(f"      {i}. {name} - 유사도: {score:.3f}")
-                        print(f"         재료: {ingredients_preview}")
-                        print(f"         카테고리: {category}")
-                else:
-                    print("   ❌ 유사한 레시피를 찾을 수 없습니다")
+                    ingredients_preview = ingredients[:30] + "..." if len(ingredients) > 30 else ingredients
+                    print(f"      {i}. {name} - 유사도: {score:.3f}")
+                    print(f"         재료: {ingredients_preview}")
+                    print(f"         카테고리: {category}")
             else:
-                print("   ❌ 레시피의 임베딩 데이터가 올바르지 않습니다")
+                print("   ❌ 유사한 레시피를 찾을 수 없습니다")
         else:
             print("   ❌ '볶음' 레시피를 찾을 수 없습니다")
         
         # 3. 특정 재료 기반 레시피 추천 테스트
         print("\n   🔍 특정 재료 기반 레시피 추천 테스트:")
         
-        # 닭고기 임베딩 가져오기
-        chicken_search = client.search(
-            index=INGREDIENT_INDEX,
-            body={"query": {"match": {"name": "닭고기"}}, "size": 1}
-        )
+        # 닭고기 벡터 조회 (로컬 저장소)
+        chicken = find_sample(INGREDIENT_INDEX, "닭고기")
         
-        if (chicken_search and 
-            chicken_search.get("hits") and 
-            chicken_search["hits"].get("hits") and 
-            len(chicken_search["hits"]["hits"]) > 0):
+        if chicken:
+            _, _, chicken_embedding = chicken
+            print(f"   📝 검색 재료: '닭고기'")
             
-            chicken_data = chicken_search["hits"]["hits"][0]["_source"]
-            chicken_embedding = chicken_data.get("embedding")
+            # 닭고기를 사용하는 레시피 검색 (로컬 OpenSearch용)
+            chicken_recipes = search(
+                client, RECIPE_INDEX,
+                script_score_query(chicken_embedding, size=3),
+                includes=RECIPE_LIST_FIELDS
+            )
             
-            if chicken_embedding and len(chicken_embedding) == 1536:
-                print(f"   📝 검색 재료: '닭고기'")
+            if (chicken_recipes and 
+                chicken_recipes.get("hits") and 
+                chicken_recipes["hits"].get("hits")):
                 
-                # 닭고기를 사용하는 레시피 검색 (로컬 OpenSearch용)
-                chicken_recipes = client.search(
-                    index=RECIPE_INDEX,
-                    body={
-                        "size": 3,
-                        "query": {
-                            "script_score": {
-                                "query": {"match_all": {}},
-                                "script": {
-                                    "source": "cosineSimilarity(params.query_vector, 'embedding') + 1.0",
-                                    "params": {"query_vector": chicken_embedding}
-                                }
-                            }
-                        }
-                    }
-                )
-                
-                if (chicken_recipes and 
-                    chicken_recipes.get("hits") and 
-                    chicken_recipes["hits"].get("hits")):
+                print(f"   ✅ 닭고기 활용 레시피 추천:")
+                for i, hit in enumerate(chicken_recipes['hits']['hits'], 1):
+                    source = hit.get("_source", {})
+                    score = hit.get("_score", 0)
+                    name = source.get('name', 'Unknown Recipe')
+                    ingredients = source.get('ingredients', '')
                     
-                    print(f"   ✅ 닭고기 활용 레시피 추천:")
-                    for i, hit in enumerate(chicken_recipes['hits']['hits'], 1):
-                        source = hit.get("_source", {})
-                        score = hit.get("_score", 0)
-                        name = source.get('name', 'Unknown Recipe')
-                        ingredients = source.get('ingredients', '')
-                        
-                        print(f"      {i}. {name} - 관련도: {score:.3f}")
-                        if '닭' in ingredients:
-                            print(f"         ✓ 닭고기 포함 확인")
-                        else:
-                            print(f"         - 닭고기 직접 포함되지 않음")
-                else:
-                    print("   ❌ 닭고기 활용 레시피를 찾을 수 없습니다")
+                    print(f"      {i}. {name} - 관련도: {score:.3f}")
+                    if '닭' in ingredients:
+                        print(f"         ✓ 닭고기 포함 확인")
+                    else:
+                        print(f"         - 닭고기 직접 포함되지 않음")
             else:
-                print("   ❌ 닭고기의 임베딩 데이터가 올바르지 않습니다")
+                print("   ❌ 닭고기 활용 레시피를 찾을 수 없습니다")
         else:
             print("   ❌ '닭고기' 재료를 찾을 수 없습니다")
         
         # 4. 간단한 더미 벡터 검색 (기본 기능 확인)
         print("\n   🔍 기본 벡터 검색 기능 테스트:")
         
-        dummy_vector = [0.1] * 1536
-        
-        dummy_search = client.search(
-            index=INGREDIENT_INDEX,
-            body={
-                "size": 3,
-                "query": {
-                    "script_score": {
-                        "query": {"match_all": {}},
-                        "script": {
-                            "source": "cosineSimilarity(params.query_vector, 'embedding') + 1.0",
-                            "params": {"query_vector": dummy_vector}
-                        }
-                    }
-                }
-            }
+        dummy_vector = test_vector("ingredient")
+        
+        dummy_search = search(
+            client, INGREDIENT_INDEX,
+            script_score_query(dummy_vector, size=3),
+            includes=INGREDIENT_LIST_FIELDS
         )
         
         if (dummy_search and 
@@ -657,9 +701,9 @@ def test_natural_language_search():
         
         try:
             # 키워드 기반 텍스트 검색
-            text_results = client.search(
-                index=RECIPE_INDEX,
-                body={
+            text_results = search(
+                client, RECIPE_INDEX,
+                {
                     "size": 3,
                     "query": {
                         "multi_match": {
@@ -668,7 +712,8 @@ def test_natural_language_search():
                             "type": "best_fields"
                         }
                     }
-                }
+                },
+                includes=RECIPE_LIST_FIELDS
             )
             
             print(f"   ✅ 텍스트 검색 결과 ({len(text_results['hits']['hits'])}개):")
@@ -681,6 +726,31 @@ def test_natural_language_search():
         except Exception as e:
             print(f"   ❌ 시나리오 '{scenario['query']}' 검색 실패: {e}")
 
+def text_combination_search(ingredients):
+    """재료명 텍스트 검색 (최소 n-1개 재료 포함). 재료 ID로 찾을 수 없을 때의 대체 경로."""
+    should_queries = [{"match": {"ingredients": ingredient}} for ingredient in ingredients]
+    combo_results = search(
+        client, RECIPE_INDEX,
+        {
+            "size": 3,
+            "query": {
+                "bool": {
+                    "should": should_queries,
+                    "minimum_should_match": max(len(ingredients) - 1, 1)  # 최소 n-1개 재료 포함
+                }
+            }
+        },
+        includes=RECIPE_LIST_FIELDS
+    )
+    
+    print(f"   ✅ 텍스트 검색 추천 레시피 ({len(combo_results['hits']['hits'])}개):")
+    for i, hit in enumerate(combo_results['hits']['hits'], 1):
+        source = hit["_source"]
+        included_ingredients = [ing for ing in ingredients if ing in source.get('ingredients', '')]
+        print(f"      {i}. {source['name']} - 점수: {hit['_score']:.3f}")
+        print(f"         포함 재료: {', '.join(included_ingredients) if included_ingredients else '없음'}")
+        print(f"         조리법: {source.get('cooking_method', 'N/A')}")
+
 def test_ingredient_combination_search():
     """재료 조합 기반 레시피 검색 테스트"""
     print("\n🥘 재료 조합 레시피 검색 테스트:")
@@ -695,39 +765,44 @@ def test_ingredient_combination_search():
         print(f"\n   🔍 재료 조합: {' + '.join(ingredients)}")
         
         try:
-            # 다중 재료 검색
-            should_queries = []
-            for ingredient in ingredients:
-                should_queries.append({"match": {"ingredients": ingredient}})
+            # 재료명 → 재료 ID (ingredient_ids 배열과 정확히 비교)
+            ingredient_ids = resolve_ingredient_ids(client, INGREDIENT_INDEX, ingredients)
+            missing = [name for name, ingredient_id in zip(ingredients, ingredient_ids) if ingredient_id is None]
+            if missing:
+                print(f"   ⚠️ 재료 인덱스에 없는 재료: {', '.join(missing)}")
+            ingredient_ids = [ingredient_id for ingredient_id in ingredient_ids if ingredient_id is not None]
+            if not ingredient_ids:
+                text_combination_search(ingredients)
+                continue
             
-            combo_results = client.search(
-                index=RECIPE_INDEX,
-                body={
-                    "size": 3,
-                    "query": {
-                        "bool": {
-                            "should": should_queries,
-                            "minimum_should_match": len(ingredients) - 1  # 최소 n-1개 재료 포함
-                        }
-                    }
-                }
+            # 모든 재료를 포함하는 레시피 (filter 전용 term 절, 재료별 비트셋 캐시)
+            combo_results = search(
+                client, RECIPE_INDEX,
+                ingredient_filter_query(ingredient_ids, size=3),
+                includes=RECIPE_LIST_FIELDS + ["ingredient_count"]
             )
+            if not combo_results['hits']['hits']:
+                # ingredient_ids 없이 색인된 레시피(이전 매핑/임베딩 파일)는 텍스트 검색으로 확인
+                print("   ⚠️ 재료 ID로 찾은 레시피가 없습니다 (ingredient_ids 없이 색인되었을 수 있음)")
+                text_combination_search(ingredients)
+                continue
             
-            print(f"   ✅ 추천 레시피 ({len(combo_results['hits']['hits'])}개):")
+            print(f"   ✅ 추천 레시피 ({combo_results['hits'].get('total', {}).get('value', 0)}개 중 재료가 적은 순 "
+                  f"{len(combo_results['hits']['hits'])}개):")
             for i, hit in enumerate(combo_results['hits']['hits'], 1):
                 source = hit["_source"]
-                score = hit["_score"]
-                
-                # 포함된 재료 확인
-                included_ingredients = []
-                for ing in ingredients:
-                    if ing in source.get('ingredients', ''):
-                        included_ingredients.append(ing)
-                
-                print(f"      {i}. {source['name']} - 점수: {score:.3f}")
-                print(f"         포함 재료: {', '.join(included_ingredients) if included_ingredients else '없음'}")
+                print(f"      {i}. {source['name']} - 재료 {source.get('ingredient_count', '?')}개")
                 print(f"         조리법: {source.get('cooking_method', 'N/A')}")
             
+            # 레시피 재료의 절반 이상을 이 조합으로 채우는 레시피 (terms_set coverage 스크립트)
+            coverage_results = search(
+                client, RECIPE_INDEX,
+                ingredient_coverage_query(ingredient_ids, size=3, coverage=0.5),
+                includes=["name"]
+            )
+            names = [hit["_source"].get("name", "N/A") for hit in coverage_results['hits']['hits']]
+            print(f"   ✅ 재료 절반 이상 충족: {', '.join(names) if names else '없음'}")
+            
         except Exception as e:
             print(f"   ❌ 재료 조합 검색 실패: {e}")
 
@@ -759,16 +834,18 @@ def detailed_status_check():
         print("\n   🔍 샘플 검색 테스트:")
         
         # 텍스트 검색
-        text_search = client.search(
-            index=RECIPE_INDEX,
-            body={"query": {"match": {"name": "볶음"}}, "size": 1}
+        text_search = search(
+            client, RECIPE_INDEX,
+            {"query": {"match": {"name": "볶음"}}, "size": 1},
+            includes=["name"]
         )
         print(f"   📝 '볶음' 텍스트 검색: {text_search['hits']['total']['value']}개 결과")
         
         # 카테고리 검색
-        category_search = client.search(
-            index=INGREDIENT_INDEX,
-            body={"query": {"term": {"category": "곡류/분말"}}, "size": 1}
+        category_search = search(
+            client, INGREDIENT_INDEX,
+            {"query": {"term": {"category": "곡류/분말"}}, "size": 1},
+            includes=INGREDIENT_LIST_FIELDS
         )
         print(f"   🏷️ '곡류/분말' 카테고리 검색: {category_search['hits']['total']['value']}개 결과")
         
@@ -801,9 +878,10 @@ def main():
     
     # 3. 인덱스 생성
     print("\n📂 인덱스 생성:")
-    if not create_index(RECIPE_INDEX, recipe_mapping):
+    # 임베딩 파일에 기록된 제공자/차원을 매핑에 반영
+    if not create_index(RECIPE_INDEX, index_mapping(recipe_mapping, embedding_file_candidates("recipe"))):
         return
-    if not create_index(INGREDIENT_INDEX, ingredient_mapping):
+    if not create_index(INGREDIENT_INDEX, index_mapping(ingredient_mapping, embedding_file_candidates("ingredient"))):
         return
     
     # 3.5. 간단한 업로드 테스트
@@ -811,30 +889,18 @@ def main():
         print("❌ 기본 업로드 테스트 실패. 설정을 확인해주세요.")
         return
     
-    # 4. 데이터 파일 경로 설정
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(current_dir)
-    
     print("\n📤 데이터 업로드:")
     
     # 5-1. 레시피 데이터 업로드
-    recipe_files = [
-        os.path.join(project_root, "data", "recipe_embeddings.json"),
-        os.path.join(current_dir, "recipe_embeddings.json"),
-        "../data/recipe_embeddings.json"
-    ]
+    recipe_files = embedding_file_candidates("recipe")
     
     recipe_uploaded = False
     for recipe_file in recipe_files:
         if os.path.exists(recipe_file):
             print(f"📁 레시피 파일 로드: {recipe_file}")
             try:
-                with open(recipe_file, 'r', encoding='utf-8') as f:
-                    recipes = json.load(f)
-                
-                valid_recipes = validate_embedding_data(recipes)
-                if valid_recipes:
-                    processed_recipes = preprocess_recipe_data(valid_recipes)
+                processed_recipes = load_valid_documents(recipe_file, preprocess_recipe_data)
+                if processed_recipes:
                     bulk_upload(RECIPE_INDEX, processed_recipes)
                     recipe_uploaded = True
                     break
@@ -848,23 +914,15 @@ def main():
         print("❌ 레시피 파일을 찾을 수 없습니다")
     
     # 5-2. 재료 데이터 업로드
-    ingredient_files = [
-        os.path.join(project_root, "data", "ingredient_embeddings.json"),
-        os.path.join(current_dir, "ingredient_embeddings.json"),
-        "../data/ingredient_embeddings.json"
-    ]
+    ingredient_files = embedding_file_candidates("ingredient")
     
     ingredient_uploaded = False
     for ingredient_file in ingredient_files:
         if os.path.exists(ingredient_file):
             print(f"📁 재료 파일 로드: {ingredient_file}")
             try:
-                with open(ingredient_file, 'r', encoding='utf-8') as f:
-                    ingredients = json.load(f)
-                
-                valid_ingredients = validate_embedding_data(ingredients)
-                if valid_ingredients:
-                    processed_ingredients = preprocess_ingredient_data(valid_ingredients)
+                processed_ingredients = load_valid_documents(ingredient_file, preprocess_ingredient_data)
+                if processed_ingredients:
                     bulk_upload(INGREDIENT_INDEX, processed_ingredients)
                     ingredient_uploaded = True
                     break
@@ -880,6 +938,9 @@ def main():
     # 6. 업로드 결과 검증
     verify_upload()
     
+    # 7. k-NN 워밍업 (벡터 검색 테스트가 그래프 로딩 시간을 재지 않도록)
+    warm_up_knn()
+    
     # 7. 벡터 검색 테스트
     test_vector_search()
     
@@ -906,14 +967,64 @@ def check_only():
         return
     
     verify_upload()
+    warm_up_knn()
     test_vector_search()
     test_natural_language_search()
     test_ingredient_combination_search()
     detailed_status_check()
 
+def delete_documents(index_name, doc_ids):
+    """문서 ID 목록을 대량 삭제합니다. 이미 없는 문서는 무시합니다."""
+    if not doc_ids:
+        return 0
+    
+    actions = [{"_op_type": "delete", "_index": index_name, "_id": str(doc_id)} for doc_id in doc_ids]
+    with span("opensearch_bulk", index=index_name, op="delete"):
+        success, errors = helpers.bulk(client, actions, raise_on_error=False)
+    not_found = sum(1 for error in errors if error.get('delete', {}).get('status') == 404)
+    print(f"✅ {index_name} 삭제 완료: {success}개 (없는 문서 {not_found}개, 실패 {len(errors) - not_found}개)")
+    return success
+
+def apply_changes(changes_dir=None):
+    """
+    export_changes.py가 만든 변경 세트를 기존 인덱스에 반영합니다 (인덱스 재생성 없음).
+    changes_dir에는 generate_*_embeddings.py --output으로 만든
+    recipe_embeddings.json / ingredient_embeddings.json과 deletes.json이 있어야 합니다.
+    """
+    if changes_dir is None:
+        changes_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "changes")
+    print(f"🔄 변경 세트 반영: {changes_dir}\n")
+    
+    if not test_connection():
+        return
+    
+    recipe_file = os.path.join(changes_dir, "recipe_embeddings.json")
+    if os.path.exists(recipe_file):
+        processed_recipes = load_valid_documents(recipe_file, preprocess_recipe_data)
+        if processed_recipes:
+            bulk_upload(RECIPE_INDEX, processed_recipes)
+    
+    ingredient_file = os.path.join(changes_dir, "ingredient_embeddings.json")
+    if os.path.exists(ingredient_file):
+        processed_ingredients = load_valid_documents(ingredient_file, preprocess_ingredient_data)
+        if processed_ingredients:
+            bulk_upload(INGREDIENT_INDEX, processed_ingredients)
+    
+    deletes_file = os.path.join(changes_dir, "deletes.json")
+    if os.path.exists(deletes_file):
+        with open(deletes_file, 'r', encoding='utf-8') as f:
+            deletes = json.load(f)
+        delete_documents(RECIPE_INDEX, deletes.get('recipes', []))
+        delete_documents(INGREDIENT_INDEX, deletes.get('ingredients', []))
+
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) > 1 and sys.argv[1] == "check":
-        check_only()
-    else:
-        main()
\ No newline at end of file
+    try:
+        if len(sys.argv) > 1 and sys.argv[1] == "check":
+            check_only()
+        elif len(sys.argv) > 1 and sys.argv[1] == "changes":
+            apply_changes(sys.argv[2] if len(sys.argv) > 2 else None)
+        else:
+            main()
+    finally:
+        # 대량 색인 / 검색 구간별 소요 시간
+        print_summary()
\ No newline at end of file
@@ -7,11 +7,34 @@
 # ============================================================================
 
 import json
+import math
 import os
-from opensearchpy import OpenSearch, helpers
+import sys
+from opensearchpy import helpers
 from dotenv import load_dotenv
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.core.metrics import print_summary, span
+from app.services.search_queries import (
+    EMBEDDING_INDEX_META,
+    INGREDIENT_LIST_FIELDS,
+    VECTOR_SPACE_TYPE,
+    exclude_embedding_from_source,
+    script_score_query,
+    search,
+    with_embedding_metadata,
+    with_ingredient_synonyms,
+)
+from app.services.embedding_providers import read_embedding_metadata
+from app.services.autocomplete import suggest_input
+from app.services.ingredient_synonyms import recipe_ingredient_ids, recipe_synonym_rules
+from app.services.knn_warmup import format_report, index_dimension, warmup_indices
+from app.services.embedding_validation import load_embedding_file
+from app.services.opensearch_client import create_client, parse_hosts
+
 # .env 파일에서 환경변수 로드
 load_dotenv()
 
@@ -20,21 +43,13 @@ load_dotenv()
 # ============================================================================
 
 def create_opensearch_client():
-    """로컬 OpenSearch 클라이언트를 생성합니다."""
-    host = os.getenv('OPENSEARCH_HOST', 'localhost')
-    port = int(os.getenv('OPENSEARCH_PORT', '9201'))
-    
-    print("[OpenSearch] 로컬 OpenSearch 접근")
-    print(f"   - 호스트: {host}")
-    print(f"   - 포트: {port}")
-    return OpenSearch(
-        hosts=[{'host': host, 'port': port}],
-        use_ssl=False,
-        verify_certs=False,
-        timeout=60,
-        max_retries=10,
-        retry_on_timeout=True
-    )
+    """대량 색인 프로필(gzip 본문, 큰 연결 풀, 긴 타임아웃) OpenSearch 클라이언트를 생성합니다."""
+    hosts = parse_hosts()
+
+    print("[OpenSearch] 로컬 OpenSearch 접근 (bulk 프로필)")
+    for host in hosts:
+        print(f"   - 호스트: {host['host']}:{host['port']}")
+    return create_client("bulk", hosts)
 
 # OpenSearch 클라이언트 생성
 client = create_opensearch_client()
@@ -46,6 +61,9 @@ client = create_opensearch_client()
 RECIPE_INDEX = 'recipes'
 INGREDIENT_INDEX = 'ingredients'
 
+# true면 embedding을 _source에 저장하지 않음 (k-NN 검색은 그대로, 단 _source로 벡터 조회 불가)
+EXCLUDE_EMBEDDING_SOURCE = os.getenv('OPENSEARCH_EXCLUDE_EMBEDDING_SOURCE', 'false').lower() == 'true'
+
 # 레시피 인덱스 매핑 설정 (로컬 OpenSearch용)
 recipe_mapping = {
     "settings": {
@@ -74,10 +92,14 @@ recipe_mapping = {
         }
     },
     "mappings": {
+        "_meta": EMBEDDING_INDEX_META,
         "properties": {
             "recipe_id": {"type": "keyword"},
             "name": {"type": "text", "analyzer": "korean_analyzer"},
             "ingredients": {"type": "text", "analyzer": "korean_analyzer"},
+            # 재료 조합 검색용 정확한 재료 ID 배열 (term 필터 캐시) / 레시피 재료 수 (terms_set 기준)
+            "ingredient_ids": {"type": "keyword"},
+            "ingredient_count": {"type": "integer"},
             "category": {"type": "keyword"},
             "cooking_method": {"type": "keyword"},
             "hashtag": {"type": "text", "analyzer": "korean_analyzer"},
@@ -86,7 +108,7 @@ recipe_mapping = {
                 "dimension": 1536,
                 "method": {
                     "name": "hnsw",
-                    "space_type": "cosinesimil",
+                    "space_type": VECTOR_SPACE_TYPE,
                     "engine": "nmslib",
                     "parameters": {
                         "ef_construction": 128,
@@ -100,6 +122,11 @@ recipe_mapping = {
     }
 }
 
+# 레시피 재료 필드에 색인 시점 재료 동의어 적용 (ingredient_aliases_nested.json)
+# "강력밀가루"·"전립분" 같은 별칭 검색도 질의 확장 없이 match 한 번으로 찾음
+if config.INGREDIENT_SYNONYMS_ENABLED:
+    recipe_mapping = with_ingredient_synonyms(recipe_mapping, recipe_synonym_rules())
+
 # 재료 인덱스 매핑 설정 (로컬 OpenSearch용)
 ingredient_mapping = {
     "settings": {
@@ -111,6 +138,12 @@ ingredient_mapping = {
                     "type": "custom",
                     "tokenizer": "nori_tokenizer",
                     "filter": ["lowercase", "nori_part_of_speech"]
+                },
+                # 자동완성: 재료명/별칭 전체를 한 토큰으로 (형태소 분석 없이 소문자만)
+                "suggest_analyzer": {
+                    "type": "custom",
+                    "tokenizer": "keyword",
+                    "filter": ["lowercase"]
                 }
             },
             "tokenizer": {
@@ -128,17 +161,20 @@ ingredient_mapping = {
         }
     },
     "mappings": {
+        "_meta": EMBEDDING_INDEX_META,
         "properties": {
             "ingredient_id": {"type": "long"},
             "name": {"type": "text", "analyzer": "korean_analyzer"},
             "aliases": {"type": "text", "analyzer": "korean_analyzer"},
+            # 재료명 + 별칭 자동완성 (completion suggester, 입력은 preprocess_ingredient_data에서)
+            "name_suggest": {"type": "completion", "analyzer": "suggest_analyzer", "max_input_length": 50},
             "category": {"type": "keyword"},
             "embedding": {
                 "type": "knn_vector",
                 "dimension": 1536,
                 "method": {
                     "name": "hnsw",
-                    "space_type": "cosinesimil",
+                    "space_type": VECTOR_SPACE_TYPE,
                     "engine": "nmslib",
                     "parameters": {
                         "ef_construction": 128,
@@ -181,6 +217,8 @@ def delete_index_if_exists(index_name):
 def create_index(index_name, mapping):
     """로컬 OpenSearch에 인덱스를 생성합니다."""
     try:
+        if EXCLUDE_EMBEDDING_SOURCE:
+            mapping = exclude_embedding_from_source(mapping)
         delete_index_if_exists(index_name)
         response = client.indices.create(index=index_name, body=mapping)
         print(f" 인덱스 생성 완료: {index_name}")
@@ -190,23 +228,83 @@ def create_index(index_name, mapping):
         print(f" 인덱스 생성 실패 {index_name}: {e}")
         return False
 
-def validate_embedding_data(data):
-    """임베딩 데이터의 유효성을 검사합니다."""
-    valid_data = []
+def report_invalid(problems, total, valid_count, limit=20):
+    """검증 실패 문서를 사유와 함께 출력합니다 (최대 limit개)."""
+    for name, reason in problems[:limit]:
+        print(f"⚠️ {reason}: {name}")
+    if len(problems) > limit:
+        print(f"⚠️ ... 외 {len(problems) - limit}개")
+    print(f" 유효한 데이터: {valid_count}/{total}")
+
+def embedding_file_candidates(kind):
+    """업로드할 임베딩 파일 후보 경로 (앞에 있을수록 우선)."""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_dir)
+    return [
+        os.path.join(project_root, "data", f"{kind}_embeddings.ndjson"),
+        os.path.join(project_root, "data", f"{kind}_embeddings.json"),
+        os.path.join(current_dir, f"{kind}_embeddings.json"),
+        f"../data/{kind}_embeddings.json"
+    ]
+
+def candidate_metadata(candidates):
+    """처음 발견되는 임베딩 파일의 메타데이터 (제공자/모델/차원)."""
+    embeddings_file = next((path for path in candidates if os.path.exists(path)), None)
+    return read_embedding_metadata(embeddings_file)
+
+def index_mapping(mapping, candidates):
+    """처음 발견되는 임베딩 파일의 메타데이터(제공자/모델/차원)에 맞춘 매핑을 만듭니다."""
+    return with_embedding_metadata(mapping, candidate_metadata(candidates))
+
+def test_vector(kind):
+    """테스트용 단위 벡터. 차원은 인덱스 매핑과 같은 임베딩 메타데이터를 따릅니다 (local 제공자면 384)."""
+    dimension = candidate_metadata(embedding_file_candidates(kind))["dimension"]
+    return [1.0 / math.sqrt(dimension)] * dimension
+
+def load_valid_documents(path, transform=None):
+    """
+    임베딩 파일을 읽고 검증합니다.
+    .ndjson 파일은 프로세스 풀에서 줄 묶음 단위로 파싱·검증·transform까지 처리합니다.
+    저장 벡터는 여기서 한 번 L2 정규화합니다 (인덱스는 innerproduct 공간 사용).
+    검증 차원은 파일 옆 .meta.json에 기록된 값을 따릅니다.
+    """
+    dimension = read_embedding_metadata(path)["dimension"]
+    docs, total, problems = load_embedding_file(path, dimension, transform=transform, normalize=True)
+    report_invalid(problems, total, len(docs))
+    return docs
+
+def preprocess_recipe_data(recipes):
+    """레시피 데이터를 전처리합니다 (ingredient_ids가 없는 기존 임베딩 파일은 재료명을 재료 ID로 채움)."""
+    for recipe in recipes:
+        if not recipe.get('ingredient_ids'):
+            recipe['ingredient_ids'] = recipe_ingredient_ids(recipe, text_field='ingredients')
+            recipe['ingredient_count'] = len(recipe['ingredient_ids'])
+    return recipes
+
+def preprocess_ingredient_data(ingredients):
+    """재료 데이터를 업로드용으로 전처리합니다 (aliases 목록 → 공백 구분 텍스트)."""
+    processed = []
     
-    for item in data:
-        embedding = item.get('embedding')
-        
-        if embedding and isinstance(embedding, list) and len(embedding) == 1536:
-            if all(isinstance(x, (int, float)) for x in embedding):
-                valid_data.append(item)
-            else:
-                print(f"⚠️ 임베딩 값이 숫자가 아님: {item.get('name', item.get('recipe_id', 'Unknown'))}")
+    for ingredient in ingredients:
+        aliases = ingredient.get('aliases', [])
+        if isinstance(aliases, list):
+            aliases_text = ' '.join(str(alias) for alias in aliases)
         else:
-            print(f"⚠️ 잘못된 임베딩 차원: {item.get('name', item.get('recipe_id', 'Unknown'))}")
+            aliases_text = str(aliases)
+        
+        processed_item = {
+            "ingredient_id": ingredient.get('ingredient_id'),
+            "name": ingredient.get('name'),
+            "aliases": aliases_text,
+            "name_suggest": suggest_input(ingredient.get('name'), aliases),
+            "category": ingredient.get('category'),
+            "embedding": ingredient.get('embedding'),
+            "embedding_text": ingredient.get('embedding_text'),
+            "created_at": ingredient.get('created_at')
+        }
+        processed.append(processed_item)
     
-    print(f" 유효한 데이터: {len(valid_data)}/{len(data)}")
-    return valid_data
+    return processed
 
 def bulk_upload(index_name, data, batch_size=50):
     """로컬 OpenSearch에 대량 데이터를 배치 업로드합니다."""
@@ -239,14 +337,15 @@ def bulk_upload(index_name, data, batch_size=50):
         if len(actions) >= batch_size or i == total:
             try:
                 # 대량 업로드 실행
-                success, errors = helpers.bulk(
-                    client, 
-                    actions, 
-                    timeout=300,
-                    max_retries=3,
-                    initial_backoff=1,
-                    max_backoff=60
-                )
+                with span("opensearch_bulk", index=index_name):
+                    success, errors = helpers.bulk(
+                        client, 
+                        actions, 
+                        timeout=300,
+                        max_retries=3,
+                        initial_backoff=1,
+                        max_backoff=60
+                    )
                 
                 # 성공/실패 카운팅
                 success_count += success
@@ -281,11 +380,12 @@ def verify_upload():
         recipe_count = client.count(index=RECIPE_INDEX)["count"]
         print(f"    레시피: {recipe_count}개")
         
-        sample = client.search(index=RECIPE_INDEX, body={"query": {"match_all": {}}, "size": 1})
+        sample = search(client, RECIPE_INDEX, {"query": {"match_all": {}}, "size": 1}, includes=["name"])
         if sample["hits"]["hits"]:
             sample_recipe = sample["hits"]["hits"][0]["_source"]
             print(f"    샘플 레시피: {sample_recipe.get('name', 'N/A')}")
-            print(f"    임베딩 차원: {len(sample_recipe.get('embedding', []))}")
+            # OPENSEARCH_EXCLUDE_EMBEDDING_SOURCE=true면 _source에 embedding이 없으므로 매핑의 차원을 읽음
+            print(f"    임베딩 차원: {index_dimension(client, RECIPE_INDEX)}")
             
     except Exception as e:
         print(f"    레시피 확인 실패: {e}")
@@ -295,7 +395,8 @@ def verify_upload():
         ingredient_count = client.count(index=INGREDIENT_INDEX)["count"]
         print(f"    재료: {ingredient_count}개")
         
-        sample = client.search(index=INGREDIENT_INDEX, body={"query": {"match_all": {}}, "size": 1})
+        sample = search(client, INGREDIENT_INDEX, {"query": {"match_all": {}}, "size": 1},
+                        includes=["name", "category"])
         if sample["hits"]["hits"]:
             sample_ingredient = sample["hits"]["hits"][0]["_source"]
             print(f"    샘플 재료: {sample_ingredient.get('name', 'N/A')}")
@@ -304,28 +405,27 @@ def verify_upload():
     except Exception as e:
         print(f"    재료 확인 실패: {e}")
 
+def warm_up_knn():
+    """HNSW 그래프를 네이티브 메모리에 올리고 합성 질의 p95가 기준 아래로 내려올 때까지 기다립니다."""
+    print("\n🔥 k-NN 워밍업:")
+    try:
+        for report in warmup_indices(client, [RECIPE_INDEX, INGREDIENT_INDEX]):
+            print(f"   {'✅' if report['ready'] else '⚠️'} {format_report(report)}")
+    except Exception as e:
+        print(f"   ⚠️ 워밍업 실패: {e}")
+
 def test_vector_search():
     """벡터 검색 기능을 테스트합니다."""
     print("\\n 벡터 검색 테스트:")
     
     try:
         # 더미 벡터로 기본 기능 확인
-        dummy_vector = [0.1] * 1536
+        dummy_vector = test_vector("ingredient")
         
-        dummy_search = client.search(
-            index=INGREDIENT_INDEX,
-            body={
-                "size": 3,
-                "query": {
-                    "script_score": {
-                        "query": {"match_all": {}},
-                        "script": {
-                            "source": "cosineSimilarity(params.query_vector, doc['embedding']) + 1.0",
-                            "params": {"query_vector": dummy_vector}
-                        }
-                    }
-                }
-            }
+        dummy_search = search(
+            client, INGREDIENT_INDEX,
+            script_score_query(dummy_vector, size=3),
+            includes=INGREDIENT_LIST_FIELDS
         )
 
         
@@ -365,33 +465,23 @@ def main():
     
     # 3. 인덱스 생성
     print("\\n 인덱스 생성:")
-    if not create_index(RECIPE_INDEX, recipe_mapping):
+    # 임베딩 파일에 기록된 제공자/차원을 매핑에 반영
+    if not create_index(RECIPE_INDEX, index_mapping(recipe_mapping, embedding_file_candidates("recipe"))):
         return
-    if not create_index(INGREDIENT_INDEX, ingredient_mapping):
+    if not create_index(INGREDIENT_INDEX, index_mapping(ingredient_mapping, embedding_file_candidates("ingredient"))):
         return
     
-    # 4. 데이터 파일 경로 설정
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(current_dir)
-    
     print("\\n 데이터 업로드:")
     
     # 5-1. 레시피 데이터 업로드
-    recipe_files = [
-        os.path.join(project_root, "data", "recipe_embeddings.json"),
-        os.path.join(current_dir, "recipe_embeddings.json"),
-        "../data/recipe_embeddings.json"
-    ]
+    recipe_files = embedding_file_candidates("recipe")
     
     recipe_uploaded = False
     for recipe_file in recipe_files:
         if os.path.exists(recipe_file):
             print(f" 레시피 파일 로드: {recipe_file}")
             try:
-                with open(recipe_file, 'r', encoding='utf-8') as f:
-                    recipes = json.load(f)
-                
-                valid_recipes = validate_embedding_data(recipes)
+                valid_recipes = load_valid_documents(recipe_file, preprocess_recipe_data)
                 if valid_recipes:
                     bulk_upload(RECIPE_INDEX, valid_recipes)
                     recipe_uploaded = True
@@ -406,42 +496,16 @@ def main():
         print(" 레시피 파일을 찾을 수 없습니다")
     
     # 5-2. 재료 데이터 업로드
-    ingredient_files = [
-        os.path.join(project_root, "data", "ingredient_embeddings.json"),
-        os.path.join(current_dir, "ingredient_embeddings.json"),
-        "../data/ingredient_embeddings.json"
-    ]
+    ingredient_files = embedding_file_candidates("ingredient")
     
     ingredient_uploaded = False
     for ingredient_file in ingredient_files:
         if os.path.exists(ingredient_file):
             print(f" 재료 파일 로드: {ingredient_file}")
             try:
-                with open(ingredient_file, 'r', encoding='utf-8') as f:
-                    ingredients = json.load(f)
-                
-                valid_ingredients = validate_embedding_data(ingredients)
-                if valid_ingredients:
-                    # 재료 데이터 전처리
-                    processed_ingredients = []
-                    for ingredient in valid_ingredients:
-                        aliases = ingredient.get('aliases', [])
-                        if isinstance(aliases, list):
-                            aliases_text = ' '.join(str(alias) for alias in aliases)
-                        else:
-                            aliases_text = str(aliases)
-                        
-                        processed_item = {
-                            "ingredient_id": ingredient.get('ingredient_id'),
-                            "name": ingredient.get('name'),
-                            "aliases": aliases_text,
-                            "category": ingredient.get('category'),
-                            "embedding": ingredient.get('embedding'),
-                            "embedding_text": ingredient.get('embedding_text'),
-                            "created_at": ingredient.get('created_at')
-                        }
-                        processed_ingredients.append(processed_item)
-                    
+                # 검증과 함께 재료 데이터 전처리
+                processed_ingredients = load_valid_documents(ingredient_file, preprocess_ingredient_data)
+                if processed_ingredients:
                     bulk_upload(INGREDIENT_INDEX, processed_ingredients)
                     ingredient_uploaded = True
                     break
@@ -457,6 +521,9 @@ def main():
     # 6. 업로드 결과 검증
     verify_upload()
     
+    # 7. k-NN 워밍업 (벡터 검색 테스트가 그래프 로딩 시간을 재지 않도록)
+    warm_up_knn()
+    
     # 7. 벡터 검색 테스트
     test_vector_search()
     
@@ -474,11 +541,61 @@ def check_only():
         return
     
     verify_upload()
+    warm_up_knn()
     test_vector_search()
 
+def delete_documents(index_name, doc_ids):
+    """문서 ID 목록을 대량 삭제합니다. 이미 없는 문서는 무시합니다."""
+    if not doc_ids:
+        return 0
+    
+    actions = [{"_op_type": "delete", "_index": index_name, "_id": str(doc_id)} for doc_id in doc_ids]
+    with span("opensearch_bulk", index=index_name, op="delete"):
+        success, errors = helpers.bulk(client, actions, raise_on_error=False)
+    not_found = sum(1 for error in errors if error.get('delete', {}).get('status') == 404)
+    print(f" {index_name} 삭제 완료: {success}개 (없는 문서 {not_found}개, 실패 {len(errors) - not_found}개)")
+    return success
+
+def apply_changes(changes_dir=None):
+    """
+    export_changes.py가 만든 변경 세트를 기존 인덱스에 반영합니다 (인덱스 재생성 없음).
+    changes_dir에는 generate_*_embeddings.py --output으로 만든
+    recipe_embeddings.json / ingredient_embeddings.json과 deletes.json이 있어야 합니다.
+    """
+    if changes_dir is None:
+        changes_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "changes")
+    print(f"🔄 변경 세트 반영: {changes_dir}\n")
+    
+    if not test_connection():
+        return
+    
+    recipe_file = os.path.join(changes_dir, "recipe_embeddings.json")
+    if os.path.exists(recipe_file):
+        valid_recipes = load_valid_documents(recipe_file, preprocess_recipe_data)
+        if valid_recipes:
+            bulk_upload(RECIPE_INDEX, valid_recipes)
+    
+    ingredient_file = os.path.join(changes_dir, "ingredient_embeddings.json")
+    if os.path.exists(ingredient_file):
+        processed_ingredients = load_valid_documents(ingredient_file, preprocess_ingredient_data)
+        if processed_ingredients:
+            bulk_upload(INGREDIENT_INDEX, processed_ingredients)
+    
+    deletes_file = os.path.join(changes_dir, "deletes.json")
+    if os.path.exists(deletes_file):
+        with open(deletes_file, 'r', encoding='utf-8') as f:
+            deletes = json.load(f)
+        delete_documents(RECIPE_INDEX, deletes.get('recipes', []))
+        delete_documents(INGREDIENT_INDEX, deletes.get('ingredients', []))
+
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) > 1 and sys.argv[1] == "check":
-        check_only()
-    else:
-        main()
+    try:
+        if len(sys.argv) > 1 and sys.argv[1] == "check":
+            check_only()
+        elif len(sys.argv) > 1 and sys.argv[1] == "changes":
+            apply_changes(sys.argv[2] if len(sys.argv) > 2 else None)
+        else:
+            main()
+    finally:
+        # 대량 색인 / 검색 구간별 소요 시간
+        print_summary()
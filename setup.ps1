@@ -76,17 +76,36 @@ if ($elapsed -ge $timeout) {
     Write-Host "`n⚠️  OpenSearch might still be starting. Continuing anyway..." -ForegroundColor Yellow
 }
 
-# 6. 데이터 업로드
-Write-Host "`n📊 Uploading vector data to OpenSearch..." -ForegroundColor Yellow
+# 6. 데이터 준비: ./snapshots에 스냅샷이 있으면 복원 (수 초), 없으면 JSON 업로드 후 스냅샷 생성
+#    스냅샷이 현재 임베딩 파일(제공자/모델/차원/해시)과 다르면 복원하지 않고 업로드 (종료 코드 2)
 cd scripts
-$uploadResult = python upload_to_opensearch_local.py
-cd ..
+$restored = $false
+if (Test-Path "../snapshots/index-*") {
+    Write-Host "`n📦 Restoring indices from snapshot..." -ForegroundColor Yellow
+    python snapshot_indices.py restore
+    if ($LASTEXITCODE -eq 0) {
+        $restored = $true
+        Write-Host "✅ Indices restored from snapshot (doc counts verified)" -ForegroundColor Green
+    } elseif ($LASTEXITCODE -eq 2) {
+        Write-Host "⚠️  Snapshot is older than the current embedding files, re-uploading..." -ForegroundColor Yellow
+    } else {
+        Write-Host "⚠️  Snapshot restore failed, falling back to upload..." -ForegroundColor Yellow
+    }
+}
 
-if ($LASTEXITCODE -eq 0) {
-    Write-Host "✅ Vector data uploaded successfully" -ForegroundColor Green
-} else {
-    Write-Host "⚠️  Data upload had some issues, but continuing..." -ForegroundColor Yellow
+if (-not $restored) {
+    Write-Host "`n📊 Uploading vector data to OpenSearch..." -ForegroundColor Yellow
+    $uploadResult = python upload_to_opensearch_local.py
+
+    if ($LASTEXITCODE -eq 0) {
+        Write-Host "✅ Vector data uploaded successfully" -ForegroundColor Green
+        Write-Host "`n📸 Saving snapshot for the next setup..." -ForegroundColor Yellow
+        python snapshot_indices.py create
+    } else {
+        Write-Host "⚠️  Data upload had some issues, but continuing..." -ForegroundColor Yellow
+    }
 }
+cd ..
 
 # 7. 최종 확인
 Write-Host "`n🔍 Final health check..." -ForegroundColor Yellow